@@ -0,0 +1,84 @@
+"""Benchmark the wave_backend classification return paths.
+
+Compares, per utterance:
+  * string API  — json.loads(classify_intent(text))
+  * dict API    — classify_intent_dict(text)
+  * batch API   — classify_intent_batch(texts), amortized per item
+  * fused       — IntentClassifier.classify(text) vs dict API + Python
+                  match_intent (tokenize in Rust, score in Python)
+
+Requires the compiled extension (maturin develop / maturin build).
+
+Usage:
+    python benchmarks/bench_classify_ffi.py [--iterations 50000] [--batch 1000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from wave_backend import (
+    IntentClassifier,
+    classify_intent,
+    classify_intent_batch,
+    classify_intent_dict,
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "python"))
+
+from intent_index import DEFAULT_INTENT_KEYWORDS, IntentIndex  # noqa: E402
+
+UTTERANCES = [
+    "angalia salio yangu",
+    "send money to my brother in Dakar",
+    "Je veux envoyer de l'argent à ma mère",
+    "nataka kutuma pesa kwa rafiki yangu tafadhali",
+    "how much is left on my account",
+    "hello",
+]
+
+
+def per_item_us(fn, iterations: int) -> float:  # type: ignore[no-untyped-def]
+    n = len(UTTERANCES)
+    start = time.perf_counter_ns()
+    for i in range(iterations):
+        fn(UTTERANCES[i % n])
+    return (time.perf_counter_ns() - start) / iterations / 1000
+
+
+def batch_us(batch_size: int, rounds: int) -> float:
+    texts = [UTTERANCES[i % len(UTTERANCES)] for i in range(batch_size)]
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        classify_intent_batch(texts)
+    return (time.perf_counter_ns() - start) / (rounds * batch_size) / 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    string_us = per_item_us(lambda t: json.loads(classify_intent(t)), args.iterations)
+    dict_us = per_item_us(classify_intent_dict, args.iterations)
+    batched_us = batch_us(args.batch, max(args.iterations // args.batch, 1))
+
+    index = IntentIndex(DEFAULT_INTENT_KEYWORDS)
+    classifier = IntentClassifier(DEFAULT_INTENT_KEYWORDS)
+    split_us = per_item_us(
+        lambda t: index.match(classify_intent_dict(t)["tokens"], 0.85, 0.4), args.iterations
+    )
+    fused_us = per_item_us(classifier.classify, args.iterations)
+
+    batch_label = f"batch API (n={args.batch})"
+    print(f"{'string API (json.loads)':<24}: {string_us:8.2f} us/utterance")
+    print(f"{'dict API':<24}: {dict_us:8.2f} us/utterance  ({string_us / dict_us:.1f}x)")
+    print(f"{batch_label:<24}: {batched_us:8.2f} us/utterance  ({string_us / batched_us:.1f}x)")
+    print(f"{'dict + match_intent':<24}: {split_us:8.2f} us/utterance")
+    print(f"{'fused IntentClassifier':<24}: {fused_us:8.2f} us/utterance  ({split_us / fused_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Cold-start import cost of each Lambda handler module.
+
+Imports every handler in a fresh interpreter under ``python -X importtime``
+and reports, per handler:
+  * wall    — median wall time of ``import <handler>`` across --runs processes
+  * import  — cumulative import time reported by -X importtime
+  * heavy   — the most expensive top-level dependencies it pulled in
+
+With --budget-ms, exits non-zero if any handler's median wall time is over
+budget, so CI can catch regressions (e.g. an eager boto3/langdetect import).
+Pass --prewarm to measure with WAVE_PREWARM=1 instead.
+
+Requires the compiled extension (maturin develop / maturin build).
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5] [--budget-ms 150] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python")
+HANDLERS = ["handler", "voice_handler", "bedrock_handler", "sagemaker_handler"]
+
+_TIMER = (
+    "import sys, time; sys.path.insert(0, {path!r}); "
+    "t = time.perf_counter_ns(); import {module}; "
+    "print((time.perf_counter_ns() - t) / 1e6)"
+)
+
+
+def run_import(module: str, env: dict[str, str]) -> tuple[float, list[tuple[int, int, str]]]:
+    """Import module in a fresh process -> (wall ms, [(self us, cumulative us, name)])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _TIMER.format(path=PYTHON_DIR, module=module)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return float(proc.stdout.strip().splitlines()[-1]), rows
+
+
+def summarize(module: str, runs: int, env: dict[str, str]) -> dict[str, object]:
+    walls = []
+    rows: list[tuple[int, int, str]] = []
+    for _ in range(runs):
+        wall, rows = run_import(module, env)
+        walls.append(wall)
+
+    own = next((c for _, c, name in rows if name.strip() == module), 0)
+    # Direct dependencies of the handler are indented by two spaces.
+    top = sorted(
+        (r for r in rows if r[2].startswith("  ") and not r[2].startswith("    ")),
+        key=lambda r: r[1],
+        reverse=True,
+    )[:5]
+    return {
+        "handler": module,
+        "wall_ms": round(statistics.median(walls), 1),
+        "import_ms": round(own / 1000, 1),
+        "heavy": [{"module": name.strip(), "ms": round(c / 1000, 1)} for _, c, name in top],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--prewarm", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("handlers", nargs="*", default=HANDLERS)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    env["WAVE_PREWARM"] = "1" if args.prewarm else "0"
+
+    results = [summarize(module, args.runs, env) for module in args.handlers]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'handler':<20}{'wall ms':>10}{'import ms':>12}  heaviest imports")
+        for r in results:
+            heavy = ", ".join(f"{h['module']} {h['ms']}" for h in r["heavy"])  # type: ignore[attr-defined]
+            print(f"{r['handler']:<20}{r['wall_ms']:>10}{r['import_ms']:>12}  {heavy}")
+
+    if args.budget_ms is not None:
+        over = [r for r in results if float(r["wall_ms"]) > args.budget_ms]  # type: ignore[arg-type]
+        for r in over:
+            print(f"OVER BUDGET: {r['handler']} {r['wall_ms']} ms > {args.budget_ms} ms",
+                  file=sys.stderr)
+        sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
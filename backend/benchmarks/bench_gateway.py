@@ -0,0 +1,254 @@
+"""Load test for the self-hosted gateway (python/gateway.py).
+
+Starts the gateway in this process with the same fakes bench_handlers.py
+uses (Bedrock, DynamoDB, EventBridge and the Wave API), then drives it
+with --connections keep-alive HTTP clients, each sending its share of
+--requests requests back to back. The gateway gets its own event loop
+thread; the clients share the main one. Pass --url to load an already
+running gateway instead (its AWS clients are then whatever it was started
+with).
+
+Per route it reports requests, status counts, throughput and
+p50/p95/p99/max latency, plus the gateway's /stats afterwards (how many
+/voice texts were coalesced into how many classify_batch calls, and how
+many requests were rejected with 503).
+
+Usage:
+    python benchmarks/bench_gateway.py [--requests 2000] [--connections 64]
+        [--workers 2] [--batch-window-ms 1] [--max-inflight 256]
+        [--output results.json] [voice detect-language bedrock submit]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from bench_handlers import CORPUS, git_revision, load_corpus, percentile
+
+import fakes
+
+ROUTES = {
+    "voice": "/voice",
+    "detect-language": "/detect-language",
+    "bedrock": "/bedrock",
+    "submit": "/submit",
+}
+
+
+def make_body(route: str, text: str, i: int) -> bytes:
+    unique = f"{text} #{i}"  # keeps the result caches cold
+    if route == "voice":
+        body: dict[str, Any] = {"text": text}
+    elif route == "detect-language":
+        body = {"text": unique}
+    elif route == "bedrock":
+        body = {"text": unique, "language": "auto"}
+    else:
+        body = {"payload": {"name": "Benchmark", "note": text},
+                "token": "bench-token", "submission_id": f"bench-gw-{i}"}
+    return json.dumps(body).encode("utf-8")
+
+
+async def call(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str,
+    method: str, path: str, body: bytes = b"",
+) -> tuple[int, bytes]:
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return int(status_line.split()[1]), await reader.readexactly(length)
+
+
+async def load(
+    host: str, port: int, requests: list[tuple[str, bytes]], connections: int
+) -> tuple[dict[str, list[float]], dict[str, dict[str, int]], float]:
+    """Send requests over connections keep-alive clients; latencies per route."""
+    latencies: dict[str, list[float]] = {}
+    statuses: dict[str, dict[str, int]] = {}
+    queue = list(reversed(requests))
+
+    async def client() -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while queue:
+                route, body = queue.pop()
+                start = time.perf_counter_ns()
+                try:
+                    status, _ = await call(reader, writer, host, "POST", ROUTES[route], body)
+                    outcome = str(status)
+                except (ConnectionError, asyncio.IncompleteReadError) as exc:
+                    outcome = type(exc).__name__
+                    reader, writer = await asyncio.open_connection(host, port)
+                latencies.setdefault(route, []).append((time.perf_counter_ns() - start) / 1e6)
+                counts = statuses.setdefault(route, {})
+                counts[outcome] = counts.get(outcome, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def fetch_stats(host: str, port: int) -> dict[str, Any]:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, body = await call(reader, writer, host, "GET", "/stats")
+    finally:
+        writer.close()
+    return json.loads(body)  # type: ignore[no-any-return]
+
+
+def summarize(route: str, latencies: list[float], statuses: dict[str, int], wall_s: float) -> dict[str, Any]:
+    latencies.sort()
+    return {
+        "route": route,
+        "requests": len(latencies),
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / wall_s, 1) if wall_s else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+def start_gateway(args: argparse.Namespace) -> tuple[int, Any]:
+    """Run a Gateway on its own event loop thread; returns (port, stop)."""
+    import gateway
+
+    server = gateway.Gateway(
+        workers=args.workers,
+        max_inflight=args.max_inflight,
+        max_batch=args.max_batch,
+        batch_window_ms=args.batch_window_ms,
+        max_pending=args.max_pending,
+    )
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="gateway-loop", daemon=True).start()
+    port = asyncio.run_coroutine_threadsafe(server.start("127.0.0.1", 0), loop).result()
+
+    def stop() -> None:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return port, stop
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--url", help="load this running gateway instead of starting one")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=2, help="gateway process pool size")
+    parser.add_argument("--max-inflight", type=int, default=256)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--batch-window-ms", type=float, default=1.0)
+    parser.add_argument("--max-pending", type=int, default=4096)
+    parser.add_argument("--bedrock-latency-ms", type=float, default=300.0)
+    parser.add_argument("--bedrock-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--dynamodb-latency-ms", type=float, default=8.0)
+    parser.add_argument("--events-latency-ms", type=float, default=15.0)
+    parser.add_argument("--api-latency-ms", type=float, default=50.0)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--json", action="store_true", help="print results JSON to stdout")
+    parser.add_argument("routes", nargs="*", default=["voice"], help=f"any of {list(ROUTES)}")
+    args = parser.parse_args()
+    unknown = set(args.routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes: {sorted(unknown)}")
+
+    # Handlers read these at import time.
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ["WAVE_METRICS"] = "0"
+    os.environ["WAVE_PREWARM"] = "0"
+
+    texts = load_corpus(args.corpus)
+    requests = [
+        (route, make_body(route, texts[i % len(texts)], i))
+        for i in range(args.requests)
+        for route in [args.routes[i % len(args.routes)]]
+    ]
+
+    def latency(mean_ms: float, jitter_ms: float, offset: int) -> fakes.Latency:
+        return fakes.Latency(mean_ms, jitter_ms, seed=args.seed + offset)
+
+    bedrock = fakes.FakeBedrock(latency(args.bedrock_latency_ms, args.bedrock_jitter_ms, 1), seed=args.seed)
+    dynamodb = fakes.FakeDynamoDB(latency(args.dynamodb_latency_ms, args.dynamodb_latency_ms / 4, 2))
+    events = fakes.FakeEvents(latency(args.events_latency_ms, args.events_latency_ms / 4, 3))
+    api = fakes.FakeWaveAPI(latency(args.api_latency_ms, args.api_latency_ms / 4, 4))
+
+    stop = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    else:
+        fakes.install(bedrock, dynamodb, events)
+        api.__enter__()
+        os.environ["WAVE_API_URL"] = api.url
+        host = "127.0.0.1"
+        port, stop = start_gateway(args)
+
+    try:
+        latencies, statuses, wall_s = asyncio.run(load(host, port, requests, args.connections))
+        stats = asyncio.run(fetch_stats(host, port))
+    finally:
+        if stop is not None:
+            stop()
+            api.__exit__(None, None, None)
+
+    results = [summarize(r, latencies.get(r, []), statuses.get(r, {}), wall_s) for r in args.routes]
+    report: dict[str, Any] = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "json")},
+            "wall_s": round(wall_s, 3),
+            "throughput_rps": round(len(requests) / wall_s, 1) if wall_s else 0.0,
+            "gateway": stats,
+        },
+        "results": results,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'route':<16}{'reqs':>6}{'non-2xx':>9}{'rps':>9}"
+              f"{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+        for r in results:
+            failed = sum(n for s, n in r["statuses"].items() if not s.startswith("2"))
+            print(f"{r['route']:<16}{r['requests']:>6}{failed:>9}{r['throughput_rps']:>9}"
+                  f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}")
+        coalesced = stats.get("coalesced", {})
+        print(f"\n{report['meta']['throughput_rps']} req/s overall; "
+              f"{coalesced.get('texts')} texts in {coalesced.get('batches')} classify batches "
+              f"(mean {coalesced.get('mean_batch')}); {stats.get('rejected')} rejected")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Offline throughput/latency benchmark for every Lambda handler entry point.
+
+Drives voice_handler.handler, bedrock_handler.handler,
+sagemaker_handler.handler and handler.handler with events built from the
+multilingual corpus (corpus/utterances.jsonl). Bedrock, DynamoDB,
+EventBridge and the Wave API are local fakes (see fakes.py) with seeded,
+configurable latency, so runs need no network access or credentials and
+are repeatable on one machine.
+
+Per handler it reports requests, errors, throughput and p50/p95/p99/max
+latency of warm calls (the first call is reported separately as
+first_ms). --output writes the results as JSON; --baseline compares a run
+against an earlier one so numbers can be diffed between commits.
+
+Bedrock and language-detection texts get a per-request suffix so the
+result caches miss; pass --cache-hits to replay the corpus verbatim.
+
+Requires the compiled extension (maturin develop / maturin build) and
+boto3; sagemaker_handler also needs langdetect for texts the fast path
+can't place.
+
+Usage:
+    python benchmarks/bench_handlers.py [--requests 500] [--concurrency 1]
+        [--bedrock-latency-ms 300] [--throttle-rate 0.02]
+        [--output results.json] [--baseline previous.json] [voice bedrock ...]
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PYTHON_DIR = os.path.join(os.path.dirname(BENCH_DIR), "python")
+CORPUS = os.path.join(BENCH_DIR, "corpus", "utterances.jsonl")
+HANDLERS = ["voice", "bedrock", "sagemaker", "submission"]
+
+sys.path.insert(0, PYTHON_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import fakes  # noqa: E402
+
+
+def load_corpus(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+
+def make_events(name: str, texts: list[str], n: int, cache_hits: bool) -> list[dict[str, Any]]:
+    """n handler events for one handler, cycling through the corpus."""
+    events = []
+    for i in range(n):
+        text = texts[i % len(texts)]
+        unique = text if cache_hits else f"{text} #{i}"
+        if name == "voice":
+            events.append({"body": json.dumps({"text": text})})
+        elif name == "bedrock":
+            events.append({
+                "source": "wave.voice",
+                "detail-type": "VoiceClassification",
+                "detail": {"text": unique, "language": "auto"},
+            })
+        elif name == "sagemaker":
+            events.append({"body": json.dumps({"text": unique})})
+        else:
+            events.append({
+                "payload": {"name": "Benchmark", "note": text},
+                "token": "bench-token",
+                "submission_id": f"bench-{i}",
+            })
+    return events
+
+
+def handler_for(name: str) -> Callable[[dict[str, Any], Any], dict[str, Any]]:
+    module = {
+        "voice": "voice_handler",
+        "bedrock": "bedrock_handler",
+        "sagemaker": "sagemaker_handler",
+        "submission": "handler",
+    }[name]
+    return importlib.import_module(module).handler  # type: ignore[no-any-return]
+
+
+def succeeded(response: Any) -> bool:
+    if "batchItemFailures" in response:
+        return not response["batchItemFailures"]
+    return int(response.get("statusCode", 500)) < 400
+
+
+def percentile(sorted_ms: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_ms:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_ms) + 0.5))
+    return sorted_ms[min(rank, len(sorted_ms)) - 1]
+
+
+def run(name: str, events: list[dict[str, Any]], concurrency: int) -> dict[str, Any]:
+    handler = handler_for(name)
+    errors: dict[str, int] = {}
+
+    def call(event: dict[str, Any]) -> float:
+        start = time.perf_counter_ns()
+        try:
+            ok = succeeded(handler(event, None))
+            kind = "" if ok else "status"
+        except Exception as exc:
+            kind = type(exc).__name__
+        elapsed = (time.perf_counter_ns() - start) / 1e6
+        if kind:
+            errors[kind] = errors.get(kind, 0) + 1
+        return elapsed
+
+    first_ms = call(events[0])
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(call, events[1:]))
+    else:
+        latencies = [call(event) for event in events[1:]]
+    wall_s = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "handler": name,
+        "requests": len(events),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_s, 1) if wall_s else 0.0,
+        "first_ms": round(first_ms, 3),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def compare(results: list[dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["handler"]: r for r in json.load(f)["results"]}
+    print(f"\nvs {baseline_path}")
+    for r in results:
+        before = baseline.get(r["handler"])
+        if before is None:
+            continue
+        deltas = []
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            old, new = before[metric], r[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            deltas.append(f"{metric} {old} -> {new} ({change:+.1f}%)")
+        print(f"  {r['handler']:<12}" + "; ".join(deltas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--cache-hits", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bedrock-latency-ms", type=float, default=300.0)
+    parser.add_argument("--bedrock-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--bedrock-chunk-ms", type=float, default=0.0,
+                        help="generation time per 4 characters of a Claude answer")
+    parser.add_argument("--trailing-text", default="",
+                        help="text the fake model appends after the sentiment JSON")
+    parser.add_argument("--sentiment-streaming", action="store_true",
+                        help="use the streaming sentiment path (SENTIMENT_STREAMING=1)")
+    parser.add_argument("--cascade", action="store_true",
+                        help="answer confident messages locally (CASCADE_ENABLED=1)")
+    parser.add_argument("--dynamodb-latency-ms", type=float, default=8.0)
+    parser.add_argument("--events-latency-ms", type=float, default=15.0)
+    parser.add_argument("--api-latency-ms", type=float, default=50.0)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--json", action="store_true", help="print results JSON to stdout")
+    parser.add_argument("handlers", nargs="*", default=HANDLERS, help=f"any of {HANDLERS}")
+    args = parser.parse_args()
+    unknown = set(args.handlers) - set(HANDLERS)
+    if unknown:
+        parser.error(f"unknown handlers: {sorted(unknown)}")
+
+    # Handlers read these at import time.
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ["WAVE_METRICS"] = "0"
+    os.environ["WAVE_PREWARM"] = "0"
+    os.environ["SENTIMENT_STREAMING"] = "1" if args.sentiment_streaming else "0"
+    os.environ["CASCADE_ENABLED"] = "1" if args.cascade else "0"
+
+    def latency(mean_ms: float, jitter_ms: float, offset: int) -> fakes.Latency:
+        return fakes.Latency(mean_ms, jitter_ms, seed=args.seed + offset)
+
+    bedrock = fakes.FakeBedrock(
+        latency(args.bedrock_latency_ms, args.bedrock_jitter_ms, 1),
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+        chunk_ms=args.bedrock_chunk_ms,
+        trailing_text=args.trailing_text,
+    )
+    dynamodb = fakes.FakeDynamoDB(latency(args.dynamodb_latency_ms, args.dynamodb_latency_ms / 4, 2))
+    events = fakes.FakeEvents(latency(args.events_latency_ms, args.events_latency_ms / 4, 3))
+    fakes.install(bedrock, dynamodb, events)
+
+    texts = load_corpus(args.corpus)
+    results = []
+    with fakes.FakeWaveAPI(latency(args.api_latency_ms, args.api_latency_ms / 4, 4)) as api:
+        os.environ["WAVE_API_URL"] = api.url
+        for name in args.handlers:
+            batch = make_events(name, texts, args.requests, args.cache_hits)
+            results.append(run(name, batch, args.concurrency))
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "json")},
+            "fakes": {
+                "bedrock_calls": bedrock.calls,
+                "bedrock_throttled": bedrock.throttled,
+                "bedrock_stream_chunks": bedrock.stream_chunks,
+                "dynamodb_batch_calls": dynamodb.batch_calls,
+                "events_published": events.entries,
+            },
+        },
+        "results": results,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'handler':<12}{'reqs':>6}{'errors':>8}{'rps':>9}{'first':>9}"
+              f"{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+        for r in results:
+            print(f"{r['handler']:<12}{r['requests']:>6}{sum(r['errors'].values()):>8}"
+                  f"{r['throughput_rps']:>9}{r['first_ms']:>9.1f}{r['p50_ms']:>9.1f}"
+                  f"{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
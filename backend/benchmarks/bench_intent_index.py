@@ -0,0 +1,88 @@
+"""Microbenchmark: precompiled IntentIndex vs the original linear scan.
+
+Grows the keyword table to a few thousand triggers spread over the ten
+languages we serve and times both matchers on the same utterances.
+
+Usage:
+    python benchmarks/bench_intent_index.py [--triggers 5000] [--iterations 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "python"))
+
+from intent_index import IntentIndex  # noqa: E402
+
+LANGUAGES = ["sw", "wo", "ha", "yo", "am", "lg", "fr", "pt", "ar", "en"]
+
+
+def legacy_match(keywords: dict[str, list[str]], tokens: list[str]) -> tuple[str, int]:
+    """The original voice_handler.match_intent scan, kept for comparison."""
+    lower_tokens = [t.lower() for t in tokens]
+    best_intent, best_score = "unknown", 0
+    for intent, kws in keywords.items():
+        hits = sum(1 for kw in kws if kw in lower_tokens)
+        if hits > best_score:
+            best_intent, best_score = intent, hits
+    return best_intent, best_score
+
+
+def build_table(n_triggers: int, n_intents: int, rng: random.Random) -> dict[str, list[str]]:
+    table: dict[str, list[str]] = {f"intent_{i}": [] for i in range(n_intents)}
+    intents = list(table)
+    for i in range(n_triggers):
+        word = f"{LANGUAGES[i % len(LANGUAGES)]}w{i}"
+        if rng.random() < 0.1:
+            word = f"{word} {LANGUAGES[(i + 3) % len(LANGUAGES)]}p{i}"
+        table[rng.choice(intents)].append(word)
+    return table
+
+
+def build_utterances(table: dict[str, list[str]], count: int, rng: random.Random) -> list[list[str]]:
+    vocab = [w for kws in table.values() for kw in kws for w in kw.split()]
+    filler = ["please", "my", "the", "yangu", "pour", "na", "money"]
+    return [
+        [rng.choice(vocab) if rng.random() < 0.3 else rng.choice(filler)
+         for _ in range(rng.randint(2, 6))]
+        for _ in range(count)
+    ]
+
+
+def time_it(fn, utterances: list[list[str]], iterations: int) -> float:  # type: ignore[no-untyped-def]
+    start = time.perf_counter_ns()
+    n = len(utterances)
+    for i in range(iterations):
+        fn(utterances[i % n])
+    return (time.perf_counter_ns() - start) / iterations / 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--triggers", type=int, default=5000)
+    parser.add_argument("--intents", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    table = build_table(args.triggers, args.intents, rng)
+    utterances = build_utterances(table, 1000, rng)
+
+    build_start = time.perf_counter_ns()
+    index = IntentIndex(table)
+    build_ms = (time.perf_counter_ns() - build_start) / 1_000_000
+
+    legacy_iters = max(args.iterations // 20, 100)
+    legacy_us = time_it(lambda t: legacy_match(table, t), utterances, legacy_iters)
+    index_us = time_it(index.best, utterances, args.iterations)
+
+    print(f"triggers={args.triggers} intents={args.intents} index_build={build_ms:.1f}ms")
+    print(f"legacy linear scan : {legacy_us:10.2f} us/utterance")
+    print(f"IntentIndex        : {index_us:10.2f} us/utterance")
+    print(f"speedup            : {legacy_us / index_us:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Accuracy and latency of the fast language detector vs langdetect.
+
+Runs every utterance in corpus/utterances.jsonl (text + ISO 639-1 label)
+through:
+  * fast       — wave_backend.identify_language (answers below the
+                 confidence threshold count as "no answer")
+  * langdetect — seeded langdetect.detect_langs
+  * pipeline   — fast first, langdetect fallback (what sagemaker_handler does)
+
+Note langdetect has no Wolof, Hausa, Yoruba, Amharic or Luganda profiles.
+
+Requires the compiled extension (maturin develop / maturin build).
+
+Usage:
+    python benchmarks/bench_langid.py [--corpus PATH] [--threshold 0.5] [--rounds 200]
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+
+from langdetect import DetectorFactory, detect_langs
+from langdetect.lang_detect_exception import LangDetectException
+from wave_backend import identify_language
+
+DetectorFactory.seed = 0
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "utterances.jsonl")
+
+
+def load_corpus(path: str) -> list[tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["text"], row["language"]) for row in rows]
+
+
+def fast_label(text: str, threshold: float) -> str | None:
+    result = identify_language(text)
+    if result is None or result["confidence"] < threshold:
+        return None
+    return result["code"]
+
+
+def langdetect_label(text: str) -> str | None:
+    try:
+        return detect_langs(text)[0].lang
+    except LangDetectException:
+        return None
+
+
+def per_call_us(fn, texts: list[str], rounds: int) -> float:  # type: ignore[no-untyped-def]
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter_ns() - start) / (rounds * len(texts)) / 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    texts = [text for text, _ in corpus]
+
+    correct: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    totals: dict[str, int] = defaultdict(int)
+    answered = 0
+    for text, label in corpus:
+        fast = fast_label(text, args.threshold)
+        slow = langdetect_label(text)
+        answered += fast is not None
+        totals[label] += 1
+        correct[label]["fast"] += fast == label
+        correct[label]["langdetect"] += slow == label
+        correct[label]["pipeline"] += (fast if fast is not None else slow) == label
+
+    print(f"{len(corpus)} utterances, fast path answered {answered} "
+          f"({answered / len(corpus):.0%}) at threshold {args.threshold}\n")
+    print(f"{'lang':<6}{'n':>4}{'fast':>10}{'langdetect':>12}{'pipeline':>10}")
+    for label in sorted(totals):
+        n = totals[label]
+        row = correct[label]
+        print(f"{label:<6}{n:>4}{row['fast'] / n:>10.0%}"
+              f"{row['langdetect'] / n:>12.0%}{row['pipeline'] / n:>10.0%}")
+    for method in ("fast", "langdetect", "pipeline"):
+        hits = sum(row[method] for row in correct.values())
+        print(f"overall {method:<11} {hits / len(corpus):.1%}")
+
+    fast_us = per_call_us(identify_language, texts, args.rounds)
+    slow_us = per_call_us(langdetect_label, texts, max(1, args.rounds // 20))
+    print(f"\nidentify_language  {fast_us:9.2f} us/call")
+    print(f"langdetect         {slow_us:9.2f} us/call  ({slow_us / fast_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""Local stand-ins for the AWS services and the Wave API, for offline benchmarks.
+
+Each fake sleeps for a configurable, seeded latency per call so handler
+timings include realistic I/O waits without any network access:
+
+  * FakeBedrock    — invoke_model for Claude (single or batched sentiment)
+                     and Titan (embedding), with optional ThrottlingException
+                     rate; invoke_model_with_response_stream for Claude,
+                     emitting the answer a few characters per chunk
+  * FakeDynamoDB   — service resource whose Tables support put_item,
+                     conditional reservations, get_item, delete_item,
+                     ADD-style update_item, query on PK and batch_write_item
+  * FakeEvents     — put_events
+  * FakeWaveAPI    — local HTTP server the Rust submit path posts to
+                     (via WAVE_API_URL)
+
+install() routes aws_clients.get_client / get_resource to the fakes, so
+every LazyClient and LazyTable in the handlers resolves to them. Call it
+before the first AWS call (Table handles are cached for the process).
+"""
+import io
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from botocore.exceptions import ClientError
+
+
+class Latency:
+    """Seeded per-call delay: mean_ms ± uniform jitter_ms."""
+
+    def __init__(self, mean_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0) -> None:
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if self.mean_ms <= 0 and self.jitter_ms <= 0:
+            return
+        with self._lock:
+            delay_ms = self.mean_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(delay_ms, 0.0) / 1000)
+
+
+class FakeEventStream:
+    """Iterable of Bedrock stream events, delivered chunk_ms apart.
+
+    Mirrors botocore's EventStream: iterate for {"chunk": {"bytes": ...}}
+    events, close() to stop early. Counts the chunks actually delivered.
+    """
+
+    def __init__(self, events: list[dict[str, Any]], chunk_ms: float = 0.0) -> None:
+        self._events = events
+        self.chunk_ms = chunk_ms
+        self.delivered = 0
+        self.closed = False
+
+    def __iter__(self) -> Any:
+        for event in self._events:
+            if self.closed:
+                return
+            if self.chunk_ms > 0:
+                time.sleep(self.chunk_ms / 1000)
+            self.delivered += 1
+            yield {"chunk": {"bytes": json.dumps(event).encode("utf-8")}}
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def sentiment_stream_events(text: str, chunk_chars: int = 4) -> list[dict[str, Any]]:
+    """The stream events Claude would send for a response of text."""
+    deltas = [
+        {"type": "content_block_delta", "index": 0,
+         "delta": {"type": "text_delta", "text": text[i:i + chunk_chars]}}
+        for i in range(0, len(text), chunk_chars)
+    ]
+    return [
+        {"type": "message_start", "message": {"role": "assistant", "content": []}},
+        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+        *deltas,
+        {"type": "content_block_stop", "index": 0},
+        {"type": "message_delta", "delta": {"stop_reason": "end_turn"}},
+        {"type": "message_stop"},
+    ]
+
+
+class FakeBedrock:
+    """bedrock-runtime client answering Claude and Titan invoke_model calls.
+
+    chunk_ms models generation time: a Claude answer arrives 4 characters
+    per chunk_ms, all at once from invoke_model, incrementally from
+    invoke_model_with_response_stream. trailing_text is appended after the
+    sentiment JSON, as the model sometimes explains its answer.
+    """
+
+    def __init__(
+        self,
+        latency: Latency | None = None,
+        throttle_rate: float = 0.0,
+        embedding_dim: int = 256,
+        seed: int = 0,
+        chunk_ms: float = 0.0,
+        trailing_text: str = "",
+    ) -> None:
+        self.latency = latency or Latency()
+        self.throttle_rate = throttle_rate
+        self.embedding_dim = embedding_dim
+        self.chunk_ms = chunk_ms
+        self.trailing_text = trailing_text
+        self.calls = 0
+        self.throttled = 0
+        self.streams: list[FakeEventStream] = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self, operation: str) -> None:
+        with self._lock:
+            self.calls += 1
+            throttle = self._rng.random() < self.throttle_rate
+            if throttle:
+                self.throttled += 1
+        self.latency.wait()
+        if throttle:
+            raise ClientError(
+                {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+                operation,
+            )
+
+    def _sentiment_text(self) -> str:
+        sentiment = {"sentiment": "neutral", "category": "inquiry", "confidence": 0.9}
+        return json.dumps(sentiment) + self.trailing_text
+
+    @property
+    def stream_chunks(self) -> int:
+        """Stream events delivered across all streaming calls."""
+        return sum(stream.delivered for stream in self.streams)
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str, **kwargs: Any) -> dict[str, Any]:
+        self._call("InvokeModelWithResponseStream")
+        stream = FakeEventStream(sentiment_stream_events(self._sentiment_text()), self.chunk_ms)
+        with self._lock:
+            self.streams.append(stream)
+        return {"body": stream}
+
+    def invoke_model(self, modelId: str, body: str, **kwargs: Any) -> dict[str, Any]:
+        self._call("InvokeModel")
+
+        if "titan-embed" in modelId:
+            seed = sum(json.loads(body).get("inputText", "").encode("utf-8"))
+            rng = random.Random(seed)
+            payload: dict[str, Any] = {
+                "embedding": [rng.uniform(-1, 1) for _ in range(self.embedding_dim)],
+                "inputTextTokenCount": 8,
+            }
+        else:
+            text = self._sentiment_text()
+            content = json.loads(body)["messages"][0]["content"]
+            if content.startswith("["):
+                # Batched prompt: one answer per message id.
+                sentiment = {"sentiment": "neutral", "category": "inquiry", "confidence": 0.9}
+                text = json.dumps([{"id": m["id"], **sentiment} for m in json.loads(content)])
+            if self.chunk_ms > 0:
+                time.sleep(self.chunk_ms * -(-len(text) // 4) / 1000)
+            payload = {
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+            }
+        return {"body": io.BytesIO(json.dumps(payload).encode("utf-8"))}
+
+
+class FakeTable:
+    """In-memory DynamoDB Table keyed on PK/SK (or submission_id)."""
+
+    def __init__(self, name: str, latency: Latency) -> None:
+        self.name = name
+        self.latency = latency
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(item: dict[str, Any]) -> tuple[str, str]:
+        if "PK" in item:
+            return str(item["PK"]), str(item.get("SK", ""))
+        return str(item.get("submission_id", "")), ""
+
+    def put_item(self, Item: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        self.latency.wait()
+        key = self._key(Item)
+        with self._lock:
+            existing = self.items.get(key)
+            if "ConditionExpression" in kwargs and existing is not None:
+                # Only the idempotency reservation uses conditions here.
+                values = kwargs.get("ExpressionAttributeValues", {})
+                takeover = existing.get("status") == values.get(":failed") or (
+                    existing.get("status") == values.get(":in_progress")
+                    and existing.get("reserved_at", 0) < values.get(":stale", 0)
+                )
+                if not takeover:
+                    raise ClientError(
+                        {"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem"
+                    )
+            self.items[key] = dict(Item)
+        return {}
+
+    def get_item(self, Key: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        self.latency.wait()
+        item = self.items.get(self._key(Key))
+        return {"Item": dict(item)} if item is not None else {}
+
+    def delete_item(self, Key: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        self.latency.wait()
+        with self._lock:
+            self.items.pop(self._key(Key), None)
+        return {}
+
+    def update_item(
+        self,
+        Key: dict[str, Any],
+        UpdateExpression: str,
+        ExpressionAttributeValues: dict[str, Any],
+        ExpressionAttributeNames: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Supports "ADD a :v, ..." and "SET a = if_not_exists(a, :v)" clauses (rollups)."""
+        self.latency.wait()
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues
+        with self._lock:
+            item = self.items.setdefault(self._key(Key), dict(Key))
+            adds = re.search(r"ADD (.*?)(?: SET |$)", UpdateExpression)
+            for pair in adds.group(1).split(", ") if adds else []:
+                name, value = pair.split()
+                name = names.get(name, name)
+                item[name] = item.get(name, 0) + values[value]
+            sets = re.findall(r"(\S+) = if_not_exists\(\S+, (:\w+)\)", UpdateExpression)
+            for name, value in sets:
+                item.setdefault(names.get(name, name), values[value])
+        return {}
+
+    def query(
+        self, KeyConditionExpression: str, ExpressionAttributeValues: dict[str, Any], **kwargs: Any
+    ) -> dict[str, Any]:
+        """Supports "PK = :pk" only."""
+        self.latency.wait()
+        pk = ExpressionAttributeValues[KeyConditionExpression.split(" = ")[1]]
+        with self._lock:
+            items = [dict(item) for (key, _), item in sorted(self.items.items()) if key == pk]
+        return {"Items": items, "Count": len(items)}
+
+
+class FakeDynamoDB:
+    """DynamoDB service resource: Table(name) plus batch_write_item."""
+
+    def __init__(self, latency: Latency | None = None) -> None:
+        self.latency = latency or Latency()
+        self.tables: dict[str, FakeTable] = {}
+        self.batch_calls = 0
+
+    def Table(self, name: str) -> FakeTable:
+        return self.tables.setdefault(name, FakeTable(name, self.latency))
+
+    def batch_write_item(self, RequestItems: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+        self.latency.wait()
+        self.batch_calls += 1
+        for name, requests in RequestItems.items():
+            table = self.Table(name)
+            with table._lock:
+                for request in requests:
+                    item = request["PutRequest"]["Item"]
+                    table.items[table._key(item)] = dict(item)
+        return {"UnprocessedItems": {}}
+
+
+class FakeEvents:
+    """EventBridge client accepting every entry."""
+
+    def __init__(self, latency: Latency | None = None) -> None:
+        self.latency = latency or Latency()
+        self.entries = 0
+
+    def put_events(self, Entries: list[dict[str, Any]]) -> dict[str, Any]:
+        self.latency.wait()
+        self.entries += len(Entries)
+        return {"FailedEntryCount": 0, "Entries": [{"EventId": "fake"} for _ in Entries]}
+
+
+class FakeWaveAPI:
+    """Threaded local HTTP server that accepts submissions with 201 Created.
+
+    Use as a context manager; ``url`` is what WAVE_API_URL should be set to.
+    """
+
+    def __init__(self, latency: Latency | None = None) -> None:
+        latency = latency or Latency()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                latency.wait()
+                body = b'{"status":"received"}'
+                self.send_response(201)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}/submit"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FakeWaveAPI":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def install(bedrock: FakeBedrock, dynamodb: FakeDynamoDB, events: FakeEvents) -> None:
+    """Point aws_clients (and everything built on it) at the fakes."""
+    import aws_clients
+
+    clients = {"bedrock-runtime": bedrock, "events": events}
+
+    def get_client(service: str, region: str | None = None, **config: Any) -> Any:
+        return clients[service]
+
+    def get_resource(service: str, region: str | None = None) -> Any:
+        if service != "dynamodb":
+            raise KeyError(service)
+        return dynamodb
+
+    aws_clients.get_client = get_client  # type: ignore[assignment]
+    aws_clients.get_resource = get_resource  # type: ignore[assignment]
@@ -0,0 +1,96 @@
+"""Lazily created, process-wide AWS clients.
+
+Importing boto3 and building a client costs a few hundred milliseconds, which
+every cold start used to pay at import time — even for requests rejected
+before any AWS call. Clients here are created on first use and then cached
+for the life of the process (one per service/region/config).
+
+``LazyClient`` lets handlers keep module-level client names
+(``BEDROCK_CLIENT.invoke_model(...)``) without paying for them at import.
+
+Pre-warming: set ``WAVE_PREWARM=1`` to build clients (and load models) during
+init, or send ``{"prewarm": true}`` from a scheduled warmer; see each
+handler's ``prewarm()``.
+"""
+import os
+import threading
+from typing import Any
+
+# Creating clients is not thread-safe: boto3's default session races on
+# concurrent boto3.client() calls (KeyError: 'credential_provider'), and a
+# plain cache can't stop two threads from each building a client. Clients
+# and resources are therefore built one at a time, under _lock, from one
+# dedicated session; once built they are shared freely.
+_lock = threading.Lock()
+_session: Any = None
+_cache: dict[tuple[Any, ...], Any] = {}
+
+
+def _get_session() -> Any:
+    # Caller holds _lock.
+    global _session
+    if _session is None:
+        import boto3.session
+
+        _session = boto3.session.Session()
+    return _session
+
+
+def get_client(service: str, region: str | None = None, **config: Any) -> Any:
+    """Cached boto3 client; keyword arguments become a botocore Config."""
+    key = ("client", service, region, tuple(sorted(config.items())))
+    client = _cache.get(key)
+    if client is None:
+        with _lock:
+            client = _cache.get(key)
+            if client is None:
+                from botocore.config import Config
+
+                client = _cache[key] = _get_session().client(
+                    service,
+                    region_name=region,
+                    config=Config(**config) if config else None,
+                )
+    return client
+
+
+def get_resource(service: str, region: str | None = None) -> Any:
+    """Cached boto3 service resource."""
+    key = ("resource", service, region)
+    resource = _cache.get(key)
+    if resource is None:
+        with _lock:
+            resource = _cache.get(key)
+            if resource is None:
+                resource = _cache[key] = _get_session().resource(service, region_name=region)
+    return resource
+
+
+class LazyClient:
+    """Stand-in for a boto3 client that is created on first attribute access."""
+
+    def __init__(self, service: str, region: str | None = None, **config: Any) -> None:
+        self._service = service
+        self._region = region
+        self._config = config
+
+    def resolve(self) -> Any:
+        """Return the real client, creating it if needed."""
+        return get_client(self._service, self._region, **self._config)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+
+def prewarm_requested() -> bool:
+    """True when the function is configured to pre-warm during init."""
+    return os.environ.get("WAVE_PREWARM", "0") == "1"
+
+
+def is_prewarm_event(event: Any) -> bool:
+    """True for warm-up pings ({"prewarm": true}) from a scheduler."""
+    return isinstance(event, dict) and event.get("prewarm") is True
+
+
+def prewarm_response() -> dict[str, Any]:
+    return {"statusCode": 200, "body": '{"prewarmed": true}'}
@@ -4,93 +4,634 @@ Receives events from EventBridge (wave.voice / VoiceClassification), runs
 sentiment analysis via Claude 3 Haiku and semantic embedding via Titan
 Embeddings V2, then persists results to DynamoDB.
 
+With CASCADE_ENABLED=1, messages the local cascade is confident about (see
+cascade) are answered without Bedrock. That trades quality for cost: their
+sentiment comes from a word-list lexicon rather than Claude, and they get no
+Titan embedding, so they are missing from the similarity index
+(embedding_store). It is off by default; turn it on per environment.
+
 Architecture: Rust handles fast serialization/parsing (PyO3), Python handles
 AWS I/O (boto3). Same clean boundary as the rest of the Wave backend.
 """
+import base64
 import json
 import os
+import random
 import time
 import uuid
-from typing import Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, TypeVar
 
-import boto3
+from botocore.exceptions import ClientError
 
 from wave_backend import (
+    SentimentStreamParser,
     build_embedding_request,
+    build_sentiment_batch_requests,
     build_sentiment_request,
-    classify_intent,
+    classify_intent_batch,
+    classify_intent_dict,
+    parse_sentiment_batch_response,
     parse_sentiment_response,
 )
 
-BEDROCK_CLIENT = boto3.client("bedrock-runtime", region_name="us-east-1")
-DYNAMODB = boto3.resource("dynamodb", region_name="us-east-1")
+from aws_clients import LazyClient, is_prewarm_event, prewarm_requested, prewarm_response
+from cascade import LOCAL, Cascade, Route
+from embedding_store import encode_embedding
+from events_schema import classification_of, decode, from_payload
+from instrumentation import (
+    BEDROCK_EMBEDDING,
+    BEDROCK_SENTIMENT,
+    DYNAMODB_WRITE,
+    INTENT_MATCH,
+    JSON_PARSE,
+    RUST_FFI,
+    bind,
+    instrumented,
+    set_property,
+    stage,
+)
+from intent_index import match_intent
+from persistence import BatchWriter, LazyTable, get_table
+from result_cache import ResultCache, cache_key
+from rollups import RollupBuffer
+
+# Per-call timeouts. The client-side read timeout bounds the HTTP wait; the
+# future timeout bounds how long the handler waits for a stage at all.
+SENTIMENT_TIMEOUT_S: float = float(os.environ.get("SENTIMENT_TIMEOUT_S", "20"))
+EMBEDDING_TIMEOUT_S: float = float(os.environ.get("EMBEDDING_TIMEOUT_S", "10"))
+
+# Run sentiment and embedding in parallel (1) or one after the other (0).
+BEDROCK_CONCURRENT: bool = os.environ.get("BEDROCK_CONCURRENT", "1") != "0"
+
+# Created on first use; see aws_clients.
+BEDROCK_CLIENT = LazyClient(
+    "bedrock-runtime",
+    "us-east-1",
+    read_timeout=max(SENTIMENT_TIMEOUT_S, EMBEDDING_TIMEOUT_S),
+    connect_timeout=5,
+    max_pool_connections=10,
+)
+AWS_REGION = "us-east-1"
 TABLE_NAME = os.environ.get("ML_RESULTS_TABLE", "wave-ml-results")
 
 CLAUDE_HAIKU_MODEL = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
 TITAN_EMBED_MODEL = "amazon.titan-embed-text-v2:0"
 
+# How vectors are stored on result items: "float16" (512 B for 256 dims),
+# "int8" (260 B) or "none" to keep only the dimension count.
+EMBEDDING_CODEC = os.environ.get("EMBEDDING_CODEC", "float16")
+
+# Reused across warm invocations. boto3 clients can be shared between threads
+# once built; building them is serialized in aws_clients. Work submitted on
+# behalf of an invocation is wrapped with bind() so its stage timers land
+# in that invocation's EMF line.
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bedrock")
+
+# Result cache: in-process LRU always on; DynamoDB tier opt-in with
+# RESULT_CACHE_DYNAMODB=1 (items live in the ML results table under CACHE#).
+RESULT_CACHE = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_SIZE", "2048")),
+    ttl_s=int(os.environ.get("RESULT_CACHE_TTL_S", str(86400 * 7))),
+    table=(
+        LazyTable(TABLE_NAME, AWS_REGION)
+        if os.environ.get("RESULT_CACHE_DYNAMODB", "0") == "1"
+        else None
+    ),
+)
+
+# Batch mode: bounded worker pool plus throttling-aware retries.
+BATCH_MAX_WORKERS: int = int(os.environ.get("BEDROCK_BATCH_WORKERS", "8"))
+BEDROCK_MAX_ATTEMPTS: int = int(os.environ.get("BEDROCK_MAX_ATTEMPTS", "5"))
+BEDROCK_BACKOFF_BASE_S: float = float(os.environ.get("BEDROCK_BACKOFF_BASE_S", "0.2"))
+BEDROCK_BACKOFF_CAP_S: float = float(os.environ.get("BEDROCK_BACKOFF_CAP_S", "5"))
+_BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="bedrock-batch")
+
+# Batch mode: up to SENTIMENT_BATCH_SIZE messages share one Claude call
+# (1 turns batching off). Messages the model skips are retried one by one.
+SENTIMENT_BATCH_SIZE: int = int(os.environ.get("SENTIMENT_BATCH_SIZE", "25"))
+SENTIMENT_BATCH_MAX_TOKENS: int = int(os.environ.get("SENTIMENT_BATCH_MAX_TOKENS", "6000"))
+
+# Streaming mode: read Claude's sentiment answer with
+# invoke_model_with_response_stream and close the stream as soon as the JSON
+# object is complete, instead of waiting for the whole body.
+SENTIMENT_STREAMING: bool = os.environ.get("SENTIMENT_STREAMING", "0") == "1"
+
+# Cascade: messages with a confident intent and a confident, non-complaint
+# lexicon sentiment are answered locally, without Claude or Titan (see
+# cascade). CASCADE_SHADOW_RATE of them still go to Claude in the background
+# to measure how often the local answer agrees; the handler waits up to
+# CASCADE_SHADOW_TIMEOUT_S for that call before returning, so it is not left
+# running in a frozen Lambda. Opt-in: see the module docstring for what local
+# answers give up.
+CASCADE_ENABLED: bool = os.environ.get("CASCADE_ENABLED", "0") == "1"
+CASCADE_SHADOW_TIMEOUT_S: float = float(os.environ.get("CASCADE_SHADOW_TIMEOUT_S", "2"))
+
+# Analytics rollups: every persisted result also bumps the per-hour/day
+# counters and latency sketches the dashboard reads (see rollups).
+ROLLUPS_ENABLED: bool = os.environ.get("ROLLUPS_ENABLED", "1") != "0"
+
+
+CASCADE = Cascade(
+    intent_threshold=float(os.environ.get("CASCADE_INTENT_THRESHOLD", "0.8")),
+    sentiment_threshold=float(os.environ.get("CASCADE_SENTIMENT_THRESHOLD", "0.75")),
+    shadow_rate=float(os.environ.get("CASCADE_SHADOW_RATE", "0.02")),
+    match_intent=match_intent,
+)
+
+# Bedrock error codes worth retrying; everything else fails fast.
+RETRYABLE_ERROR_CODES = frozenset({
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+})
+
+T = TypeVar("T")
+
+
+def with_backoff(fn: Callable[..., T], *args: Any) -> T:
+    """Call fn(*args), retrying Bedrock throttling with full-jitter backoff."""
+    for attempt in range(BEDROCK_MAX_ATTEMPTS):
+        try:
+            return fn(*args)
+        except ClientError as exc:
+            code = exc.response.get("Error", {}).get("Code", "")
+            # Errors raised mid-stream use camelCase ("throttlingException").
+            code = code[:1].upper() + code[1:]
+            if code not in RETRYABLE_ERROR_CODES or attempt == BEDROCK_MAX_ATTEMPTS - 1:
+                raise
+            delay = min(BEDROCK_BACKOFF_CAP_S, BEDROCK_BACKOFF_BASE_S * (2 ** attempt))
+            time.sleep(random.uniform(0, delay))
+    raise AssertionError("unreachable")
+
 
 def analyze_sentiment(text: str, language: str) -> dict[str, Any]:
-    """Call Claude 3 Haiku via Bedrock for sentiment analysis."""
-    request_body = build_sentiment_request(text, language)
+    """Sentiment for text, served from RESULT_CACHE when seen before."""
+    key = cache_key(text, language, CLAUDE_HAIKU_MODEL)
+    result: dict[str, Any] = RESULT_CACHE.get_or_compute(
+        key, lambda: with_backoff(_sentiment_invoker(), text, language)
+    )
+    return result
+
+
+def generate_embedding(text: str) -> list[float]:
+    """Embedding for text, served from RESULT_CACHE when seen before.
 
-    response = BEDROCK_CLIENT.invoke_model(
-        modelId=CLAUDE_HAIKU_MODEL,
-        contentType="application/json",
-        accept="application/json",
-        body=request_body,
+    Titan embeddings don't depend on the language hint, so it isn't part
+    of the key.
+    """
+    key = cache_key(text, "", TITAN_EMBED_MODEL)
+    result: list[float] = RESULT_CACHE.get_or_compute(
+        key, lambda: with_backoff(invoke_embedding, text)
     )
+    return result
 
-    response_json = response["body"].read().decode("utf-8")
-    return json.loads(parse_sentiment_response(response_json))
 
+def invoke_sentiment(text: str, language: str) -> dict[str, Any]:
+    """Call Claude 3 Haiku via Bedrock for sentiment analysis."""
+    with stage(RUST_FFI):
+        request_body = build_sentiment_request(text, language)
 
-def generate_embedding(text: str) -> list[float]:
-    """Call Titan Embeddings V2 via Bedrock for semantic vector."""
-    request_body = build_embedding_request(text)
+    with stage(BEDROCK_SENTIMENT):
+        response = BEDROCK_CLIENT.invoke_model(
+            modelId=CLAUDE_HAIKU_MODEL,
+            contentType="application/json",
+            accept="application/json",
+            body=request_body,
+        )
+        response_json = response["body"].read().decode("utf-8")
+
+    with stage(RUST_FFI):
+        sentiment_json = parse_sentiment_response(response_json)
+    with stage(JSON_PARSE):
+        return json.loads(sentiment_json)
+
+
+def invoke_sentiment_stream(text: str, language: str) -> dict[str, Any]:
+    """Streaming variant of invoke_sentiment.
+
+    Stream events are fed to the Rust parser as they arrive; once the
+    sentiment object closes the stream is closed, which drops the
+    connection so Bedrock stops generating the rest of the answer.
+    """
+    with stage(RUST_FFI):
+        request_body = build_sentiment_request(text, language)
+
+    parser = SentimentStreamParser()
+    with stage(BEDROCK_SENTIMENT):
+        response = BEDROCK_CLIENT.invoke_model_with_response_stream(
+            modelId=CLAUDE_HAIKU_MODEL,
+            contentType="application/json",
+            accept="application/json",
+            body=request_body,
+        )
+        stream = response["body"]
+        sentiment_json = None
+        try:
+            for event in stream:
+                chunk = event.get("chunk")
+                if chunk is None:
+                    continue
+                sentiment_json = parser.feed_event(chunk["bytes"])
+                if sentiment_json is not None:
+                    break
+        finally:
+            stream.close()
+
+    if sentiment_json is None:
+        sentiment_json = parser.finish()
+    with stage(JSON_PARSE):
+        return json.loads(sentiment_json)
+
+
+def _sentiment_invoker() -> Callable[[str, str], dict[str, Any]]:
+    return invoke_sentiment_stream if SENTIMENT_STREAMING else invoke_sentiment
+
+
+def invoke_sentiment_batch(request_body: str, ids: list[str]) -> tuple[dict[str, Any], list[str]]:
+    """One batched Claude call -> ({id: sentiment}, ids with no usable answer)."""
+    with stage(BEDROCK_SENTIMENT):
+        response = BEDROCK_CLIENT.invoke_model(
+            modelId=CLAUDE_HAIKU_MODEL,
+            contentType="application/json",
+            accept="application/json",
+            body=request_body,
+        )
+        response_json = response["body"].read().decode("utf-8")
+
+    with stage(RUST_FFI):
+        results_json, missing = parse_sentiment_batch_response(response_json, ids)
+    with stage(JSON_PARSE):
+        return json.loads(results_json), missing
+
+
+def _attempt(fn: Callable[..., T], *args: Any) -> T | Exception:
+    """fn(*args), or the exception it raised."""
+    try:
+        return fn(*args)
+    except Exception as exc:
+        return exc
 
-    response = BEDROCK_CLIENT.invoke_model(
-        modelId=TITAN_EMBED_MODEL,
-        contentType="application/json",
-        accept="application/json",
-        body=request_body,
+
+def analyze_sentiments(messages: list[tuple[str, str]]) -> list[Any]:
+    """Sentiment for many (text, language) pairs, in order, with few Bedrock calls.
+
+    Cached messages are answered from RESULT_CACHE. The rest are packed
+    into batched Claude requests (run on the batch pool, with throttling
+    backoff); anything a batch didn't answer, or a batch that failed
+    outright, falls back to one analyze_sentiment call per message. Each
+    entry is the sentiment dict or the exception that message failed with.
+    """
+    keys = [cache_key(text, language, CLAUDE_HAIKU_MODEL) for text, language in messages]
+    results: list[Any] = [RESULT_CACHE.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    retry = pending
+    if SENTIMENT_BATCH_SIZE > 1 and len(pending) > 1:
+        with stage(RUST_FFI):
+            batches = build_sentiment_batch_requests(
+                [(str(i), *messages[i]) for i in pending],
+                SENTIMENT_BATCH_MAX_TOKENS,
+                SENTIMENT_BATCH_SIZE,
+            )
+        retry = []
+        outcomes = _BATCH_EXECUTOR.map(
+            bind(lambda batch: _attempt(with_backoff, invoke_sentiment_batch, *batch)), batches
+        )
+        for (_, ids), outcome in zip(batches, outcomes):
+            if isinstance(outcome, Exception):
+                retry.extend(int(i) for i in ids)
+                continue
+            answered, missing = outcome
+            for i, sentiment in answered.items():
+                results[int(i)] = sentiment
+                RESULT_CACHE.put(keys[int(i)], sentiment)
+            retry.extend(int(i) for i in missing)
+
+    singles = _BATCH_EXECUTOR.map(
+        bind(lambda i: _attempt(analyze_sentiment, *messages[i])), retry
     )
+    for i, outcome in zip(retry, singles):
+        results[i] = outcome
+    return results
+
+
+def invoke_embedding(text: str) -> list[float]:
+    """Call Titan Embeddings V2 via Bedrock for semantic vector."""
+    with stage(RUST_FFI):
+        request_body = build_embedding_request(text)
+
+    with stage(BEDROCK_EMBEDDING):
+        response = BEDROCK_CLIENT.invoke_model(
+            modelId=TITAN_EMBED_MODEL,
+            contentType="application/json",
+            accept="application/json",
+            body=request_body,
+        )
+        raw = response["body"].read()
 
-    response_json = json.loads(response["body"].read().decode("utf-8"))
+    with stage(JSON_PARSE):
+        response_json = json.loads(raw.decode("utf-8"))
     return response_json.get("embedding", [])
 
 
+def _timed(fn: Callable[..., T], *args: Any) -> tuple[T, int]:
+    """Run fn(*args) and return (result, elapsed_ms)."""
+    start = time.monotonic_ns()
+    result = fn(*args)
+    return result, (time.monotonic_ns() - start) // 1_000_000
+
+
+def run_inference(
+    text: str, language: str
+) -> tuple[dict[str, Any], list[float], dict[str, int], dict[str, str]]:
+    """Run sentiment and embedding, concurrently unless BEDROCK_CONCURRENT=0.
+
+    Returns (sentiment, embedding, stage_latency_ms, errors). An embedding
+    failure or timeout degrades to an empty vector and is reported in
+    errors; a sentiment failure is re-raised because there is nothing
+    useful to persist without it.
+    """
+    stage_ms: dict[str, int] = {}
+    errors: dict[str, str] = {}
+
+    if BEDROCK_CONCURRENT:
+        sentiment_future = _EXECUTOR.submit(bind(_timed), analyze_sentiment, text, language)
+        embedding_future = _EXECUTOR.submit(bind(_timed), generate_embedding, text)
+        sentiment, stage_ms["sentiment"] = sentiment_future.result(timeout=SENTIMENT_TIMEOUT_S)
+        try:
+            embedding, stage_ms["embedding"] = embedding_future.result(timeout=EMBEDDING_TIMEOUT_S)
+        except FutureTimeoutError:
+            embedding, errors["embedding"] = [], f"timed out after {EMBEDDING_TIMEOUT_S}s"
+        except Exception as exc:
+            embedding, errors["embedding"] = [], str(exc)
+        return sentiment, embedding, stage_ms, errors
+
+    sentiment, stage_ms["sentiment"] = _timed(analyze_sentiment, text, language)
+    try:
+        embedding, stage_ms["embedding"] = _timed(generate_embedding, text)
+    except Exception as exc:
+        embedding, errors["embedding"] = [], str(exc)
+    return sentiment, embedding, stage_ms, errors
+
+
+def route_message(text: str, classification: dict[str, Any]) -> Route | None:
+    """The cascade tier for a message, or None with the cascade off."""
+    if not CASCADE_ENABLED:
+        return None
+    with stage(INTENT_MATCH):
+        return CASCADE.route(classification.get("tokens") or text.split(), classification)
+
+
+def _shadow(route: Route, text: str, language: str) -> None:
+    """Ask Claude about a locally answered message, for the agreement stats."""
+    try:
+        CASCADE.record(route, analyze_sentiment(text, language))
+    except Exception:
+        pass
+
+
+@stage(DYNAMODB_WRITE)
 def persist_result(
     text: str,
     classification: dict,
     sentiment: dict,
     embedding_dim: int,
     latency_ms: int,
+    stage_latency_ms: dict[str, int] | None = None,
+    writer: BatchWriter | None = None,
+    embedding: list[float] | None = None,
+    tier: str | None = None,
+    rollups: RollupBuffer | None = None,
 ) -> str:
-    """Write ML results to DynamoDB."""
+    """Write ML results to DynamoDB.
+
+    With a writer the item is buffered for a BatchWriteItem call instead of
+    being written immediately. The embedding, if given, is stored as a
+    compact binary attribute (see embedding_store). With rollups the item
+    is also counted there; the caller flushes it once the write is done.
+    """
     result_id = str(uuid.uuid4())[:8]
-    table = DYNAMODB.Table(TABLE_NAME)
-
-    table.put_item(
-        Item={
-            "PK": f"ML#{result_id}",
-            "SK": f"RESULT#{int(time.time())}",
-            "text": text[:500],
-            "language": classification.get("language", "unknown"),
-            "intent": classification.get("intent", "unknown"),
-            "sentiment": sentiment.get("sentiment", "unknown"),
-            "category": sentiment.get("category", "unknown"),
-            "sentiment_confidence": str(sentiment.get("confidence", 0)),
-            "embedding_dimensions": embedding_dim,
-            "latency_ms": latency_ms,
-            "timestamp": int(time.time()),
-            "ExpiresAt": int(time.time()) + 86400 * 30,  # 30 day TTL
-        }
-    )
+
+    item: dict[str, Any] = {
+        "PK": f"ML#{result_id}",
+        "SK": f"RESULT#{int(time.time())}",
+        "text": text[:500],
+        "language": classification.get("language", "unknown"),
+        "intent": classification.get("intent", "unknown"),
+        "sentiment": sentiment.get("sentiment", "unknown"),
+        "category": sentiment.get("category", "unknown"),
+        "sentiment_confidence": str(sentiment.get("confidence", 0)),
+        "embedding_dimensions": embedding_dim,
+        "latency_ms": latency_ms,
+        "timestamp": int(time.time()),
+        "ExpiresAt": int(time.time()) + 86400 * 30,  # 30 day TTL
+    }
+    if stage_latency_ms:
+        item["stage_latency_ms"] = stage_latency_ms
+    if tier:
+        item["tier"] = tier
+    if embedding and EMBEDDING_CODEC != "none":
+        item["embedding"] = encode_embedding(embedding, EMBEDDING_CODEC)
+
+    if writer is not None:
+        writer.put(item)
+    else:
+        get_table(TABLE_NAME, AWS_REGION).put_item(Item=item)
+    if rollups is not None:
+        rollups.add(item)
 
     return result_id
 
 
+def _batch_messages(event: dict[str, Any]) -> list[tuple[str, Any]]:
+    """Normalize a batch event into [(item_id, detail_or_error)].
+
+    Supported shapes:
+        {"Records": [{"messageId": ..., "body": "<EventBridge event or {text, language}>"}]}
+        {"Records": [{"kinesis": {"sequenceNumber": ..., "data": <base64>}}]}
+        {"events": [<EventBridge event or {text, language}>, ...]}
+
+    Record payloads may be JSON or any events_schema encoding.
+    """
+    if "Records" not in event:
+        return [(str(i), e) for i, e in enumerate(event.get("events", []))]
+
+    messages: list[tuple[str, Any]] = []
+    for record in event["Records"]:
+        try:
+            if "kinesis" in record:
+                item_id = record["kinesis"].get("sequenceNumber", "")
+                detail = decode(base64.b64decode(record["kinesis"].get("data", "")))
+            else:
+                item_id = record.get("messageId", "")
+                detail = decode(record.get("body", ""))
+        except (ValueError, TypeError) as exc:
+            messages.append((item_id, ValueError(f"undecodable record: {exc}")))
+            continue
+        messages.append((item_id, detail))
+    return messages
+
+
+def _message_detail(message: Any) -> dict[str, Any]:
+    """Normalized events_schema detail for a message; text must be non-empty."""
+    detail = from_payload(message)
+    if not detail["text"].strip():
+        raise ValueError("text field is required")
+    return detail
+
+
+def _embed(text: str) -> tuple[list[float], dict[str, str]]:
+    """Embedding for one unique message, run inside a batch worker."""
+    try:
+        return generate_embedding(text), {}
+    except Exception as exc:
+        return [], {"embedding": str(exc)}
+
+
+def batch_handler(event: dict[str, Any]) -> dict[str, Any]:
+    """Process many messages in one invocation.
+
+    Messages the cascade can answer locally skip Bedrock entirely; of the
+    rest, identical messages (same normalized text + language) are inferred
+    once. Sentiment for the unique messages is batched into a few Claude calls
+    (see analyze_sentiments) while their embeddings fan out over a bounded
+    worker pool; Bedrock throttling is retried with backoff inside each
+    call. SQS batches get the
+    partial-batch response so only failed messages are redelivered.
+    """
+    start = time.monotonic_ns()
+    failures: dict[str, str] = {}
+    parsed: list[tuple[str, dict[str, Any]]] = []
+
+    for item_id, message in _batch_messages(event):
+        if isinstance(message, Exception):
+            failures[item_id] = str(message)
+            continue
+        try:
+            parsed.append((item_id, _message_detail(message)))
+        except ValueError as exc:
+            failures[item_id] = str(exc)
+
+    # Messages from the voice stage arrive classified; one FFI call
+    # classifies the rest. "auto" languages resolve from the classification.
+    carried = [classification_of(detail) for _, detail in parsed]
+    todo = [detail["text"] for (_, detail), c in zip(parsed, carried) if c is None]
+    with stage(INTENT_MATCH):
+        computed = iter(classify_intent_batch(todo) if todo else [])
+    items: list[tuple[str, str, str, dict[str, Any]]] = []
+    for (item_id, detail), classification in zip(parsed, carried):
+        if classification is None:
+            classification = next(computed)
+        language = detail["language"]
+        if language == "auto":
+            language = classification.get("language", "english")
+        items.append((item_id, detail["text"], language, classification))
+
+    # Route, then deduplicate what still needs Bedrock. Shadowed messages
+    # get a Claude answer for the stats but keep their local result.
+    routes = [route_message(text, classification) for _, text, _, classification in items]
+    unique: dict[str, tuple[str, str]] = {}
+    escalated: set[str] = set()
+    for (_, text, language, _), route in zip(items, routes):
+        if route is None or route.needs_bedrock:
+            key = cache_key(text, language, CLAUDE_HAIKU_MODEL)
+            unique.setdefault(key, (text, language))
+            if route is None or route.tier != LOCAL:
+                escalated.add(key)
+
+    embed = bind(_embed)
+    embeddings = {
+        key: _BATCH_EXECUTOR.submit(embed, text)
+        for key, (text, _) in unique.items() if key in escalated
+    }
+    sentiments = dict(zip(unique, analyze_sentiments(list(unique.values()))))
+
+    results: list[dict[str, Any]] = []
+    writer = BatchWriter(TABLE_NAME, region=AWS_REGION, background=True)
+    rollups = RollupBuffer() if ROLLUPS_ENABLED else None
+    for (item_id, text, language, classification), route in zip(items, routes):
+        key = cache_key(text, language, CLAUDE_HAIKU_MODEL)
+        sentiment = sentiments[key] if key in sentiments else None
+        if route is not None and isinstance(sentiment, dict):
+            CASCADE.record(route, sentiment)
+        if route is not None and route.tier == LOCAL:
+            sentiment = route.sentiment
+        if not isinstance(sentiment, dict):
+            failures[item_id] = f"sentiment analysis failed: {sentiment}"
+            continue
+        embedding, errors = embeddings[key].result() if key in embeddings else ([], {})
+
+        elapsed_ms = (time.monotonic_ns() - start) // 1_000_000
+        result_id = persist_result(
+            text=text,
+            classification=classification,
+            sentiment=sentiment,
+            embedding_dim=len(embedding),
+            latency_ms=elapsed_ms,
+            writer=writer,
+            embedding=embedding,
+            tier=route.tier if route is not None else None,
+            rollups=rollups,
+        )
+        result: dict[str, Any] = {
+            "id": item_id,
+            "result_id": result_id,
+            "language": language,
+            "sentiment": sentiment,
+            "embedding_dimensions": len(embedding),
+        }
+        if route is not None:
+            result["tier"] = route.tier
+        if errors:
+            result["degraded"] = errors
+        results.append(result)
+
+    # Results are written 25 per BatchWriteItem; anything DynamoDB still
+    # refused after retries fails its message so SQS redelivers it.
+    # Messages that fail here are redelivered, so they must not be counted
+    # in the rollups yet.
+    with stage(DYNAMODB_WRITE):
+        writer.flush()
+        if rollups is not None:
+            for item in writer.failed_items:
+                rollups.remove(item)
+            rollups.flush(executor=_BATCH_EXECUTOR)
+    unwritten = {item["PK"] for item in writer.failed_items}
+    for result in results:
+        if f"ML#{result['result_id']}" in unwritten:
+            failures[result["id"]] = "persist failed: unprocessed after retries"
+    results = [r for r in results if r["id"] not in failures]
+
+    if "Records" in event:
+        return {"batchItemFailures": [{"itemIdentifier": i} for i in failures]}
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps({
+            "results": results,
+            "failures": [{"id": i, "error": e} for i, e in failures.items()],
+            "unique_messages": len(unique),
+            "latency_ms": (time.monotonic_ns() - start) // 1_000_000,
+            "cache": RESULT_CACHE.stats(),
+            "cascade": CASCADE.stats(),
+        }),
+    }
+
+
+def prewarm() -> None:
+    """Build the Bedrock client and results table handle ahead of the first request."""
+    BEDROCK_CLIENT.resolve()
+    get_table(TABLE_NAME, AWS_REGION)
+
+
+if prewarm_requested():
+    prewarm()
+
+
+@instrumented("bedrock")
 def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """EventBridge / direct invocation handler for Bedrock sentiment pipeline.
 
@@ -100,45 +641,94 @@ def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
 
     Direct invocation shape:
         {"text": "I love Wave!"}
+
+    Batches (SQS records or {"events": [...]}) go to batch_handler.
     """
+    if is_prewarm_event(event):
+        prewarm()
+        return prewarm_response()
+
+    if "Records" in event or "events" in event:
+        return batch_handler(event)
+
     start = time.monotonic_ns()
 
     # Extract text from EventBridge detail or direct payload
-    if "detail" in event:
-        detail = event["detail"]
-        text = detail.get("text", "")
-        language = detail.get("language", "english")
-    else:
-        text = event.get("text", "")
-        language = event.get("language", "auto")
-
-    if not text.strip():
+    try:
+        detail = _message_detail(event)
+    except ValueError as exc:
         return {
             "statusCode": 400,
-            "body": json.dumps({"error": "text field is required"}),
+            "body": json.dumps({"error": str(exc)}),
         }
+    text, language = detail["text"], detail["language"]
 
-    # Step 1: Rust tokenization + classification
-    classification = json.loads(classify_intent(text))
+    # Step 1: Rust tokenization + classification, unless the voice stage
+    # already sent it (events_schema v2).
+    carried = classification_of(detail)
+    if carried is None:
+        with stage(INTENT_MATCH):
+            classification, classify_ms = _timed(classify_intent_dict, text)
+    else:
+        classification, classify_ms = carried, 0
     if language == "auto":
         language = classification.get("language", "english")
 
-    # Step 2: Bedrock sentiment analysis
-    sentiment = analyze_sentiment(text, language)
-
-    # Step 3: Bedrock embedding
-    embedding = generate_embedding(text)
+    # Steps 2 + 3: Bedrock sentiment analysis and embedding (independent
+    # calls), unless the cascade can answer locally.
+    route = route_message(text, classification)
+    embedding: list[float]
+    stage_ms: dict[str, int]
+    errors: dict[str, str]
+    shadow: Future[None] | None = None
+    if route is not None and route.tier == LOCAL:
+        sentiment, embedding, stage_ms, errors = route.sentiment, [], {}, {}
+        if route.shadow:
+            shadow = _EXECUTOR.submit(bind(_shadow), route, text, language)
+    else:
+        try:
+            sentiment, embedding, stage_ms, errors = run_inference(text, language)
+        except FutureTimeoutError:
+            return {
+                "statusCode": 504,
+                "body": json.dumps({"error": f"sentiment timed out after {SENTIMENT_TIMEOUT_S}s"}),
+            }
+        except Exception as exc:
+            return {
+                "statusCode": 502,
+                "body": json.dumps({"error": f"sentiment analysis failed: {exc}"}),
+            }
+        if route is not None:
+            CASCADE.record(route, sentiment)
+    stage_ms["classify"] = classify_ms
+    tier = route.tier if route is not None else None
+    if tier:
+        set_property("Tier", tier)
 
     elapsed_ms = (time.monotonic_ns() - start) // 1_000_000
 
     # Step 4: Persist to DynamoDB
+    persist_start = time.monotonic_ns()
+    rollups = RollupBuffer() if ROLLUPS_ENABLED else None
     result_id = persist_result(
         text=text,
         classification=classification,
         sentiment=sentiment,
         embedding_dim=len(embedding),
         latency_ms=elapsed_ms,
+        stage_latency_ms=stage_ms,
+        embedding=embedding,
+        tier=tier,
+        rollups=rollups,
     )
+    if rollups is not None:
+        rollups.flush(executor=_EXECUTOR)
+    stage_ms["persist"] = (time.monotonic_ns() - persist_start) // 1_000_000
+    if shadow is not None:
+        try:
+            shadow.result(timeout=CASCADE_SHADOW_TIMEOUT_S)
+        except FutureTimeoutError:
+            pass
 
     result = {
         "result_id": result_id,
@@ -148,7 +738,14 @@ def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
         "sentiment": sentiment,
         "embedding_dimensions": len(embedding),
         "latency_ms": elapsed_ms,
+        "stage_latency_ms": stage_ms,
+        "cache": RESULT_CACHE.stats(),
     }
+    if tier:
+        result["tier"] = tier
+        result["cascade"] = CASCADE.stats()
+    if errors:
+        result["degraded"] = errors
 
     return {
         "statusCode": 200,
@@ -0,0 +1,267 @@
+"""Bulk intent + language classification for large transcript exports.
+
+Runs the same pipelines as the Lambdas (voice_handler's fused Rust
+classifier and sagemaker_handler's fast-path/langdetect detector) over a
+JSONL or CSV file of any size, locally:
+
+    python python/bulk_classify.py transcripts.jsonl -o results.jsonl
+    python python/bulk_classify.py export.csv --text-field message --workers 4
+
+* The input is memory-mapped and read as a stream of lines by generators,
+  so nothing holds more than a few chunks of records at a time.
+* Chunks of --chunk-size records are classified on a process pool with a
+  bounded number of chunks in flight; results are written in input order
+  as each chunk finishes. Memory stays flat regardless of file size.
+* Throughput (records/s, MB/s) is reported on stderr while running and at
+  the end.
+
+Each output line is one JSON object:
+    {"id": ..., "language": ..., "intent": ..., "confidence": ...,
+     "detected_language": ..., "language_confidence": ..., "detector": ...}
+or {"id": ..., "error": ...} for records without usable text.
+"""
+import argparse
+import csv
+import json
+import mmap
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import IO, Any, Iterable, Iterator
+
+DEFAULT_CHUNK_SIZE: int = 512
+PROGRESS_INTERVAL_S: float = 5.0
+
+
+class ByteCounter:
+    """Bytes consumed from the input so far, for MB/s reporting."""
+
+    def __init__(self) -> None:
+        self.n = 0
+
+
+def iter_lines(path: str, counter: ByteCounter | None = None) -> Iterator[bytes]:
+    """Yield the file's lines (newline included) through a read-only mmap.
+
+    Pages are faulted in as the scan advances and can be dropped by the OS
+    behind it, so resident memory doesn't grow with the file. "-" reads
+    stdin instead; empty files yield nothing.
+    """
+    if path == "-":
+        for line in sys.stdin.buffer:
+            if counter is not None:
+                counter.n += len(line)
+            yield line
+        return
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            pos, size = 0, mm.size()
+            while pos < size:
+                end = mm.find(b"\n", pos)
+                end = size if end == -1 else end + 1
+                if counter is not None:
+                    counter.n += end - pos
+                yield mm[pos:end]
+                pos = end
+
+
+def iter_jsonl(lines: Iterable[bytes], text_field: str, id_field: str) -> Iterator[tuple[str, Any]]:
+    """(record id, text or error message) per non-blank JSONL line."""
+    for lineno, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield str(lineno), ValueError(f"invalid JSON: {exc}")
+            continue
+        if not isinstance(row, dict):
+            yield str(lineno), ValueError("record must be an object")
+            continue
+        yield str(row.get(id_field, lineno)), row.get(text_field)
+
+
+def iter_csv(lines: Iterable[bytes], text_field: str, id_field: str) -> Iterator[tuple[str, Any]]:
+    """(record id, text) per CSV row; quoted fields may span lines."""
+    decoded = (line.decode("utf-8", errors="replace") for line in lines)
+    for rowno, row in enumerate(csv.DictReader(decoded), start=1):
+        yield str(row.get(id_field) or rowno), row.get(text_field)
+
+
+def chunked(records: Iterable[tuple[str, Any]], size: int) -> Iterator[list[tuple[str, Any]]]:
+    chunk: list[tuple[str, Any]] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _init_worker() -> None:
+    """Load the classifiers once per worker process."""
+    import sagemaker_handler
+    import voice_handler  # noqa: F401
+
+    # The pool already provides the parallelism; don't nest another one.
+    sagemaker_handler.MAX_WORKERS = 1
+
+
+def classify_chunk(chunk: list[tuple[str, Any]], detect: bool = True) -> list[dict[str, Any]]:
+    """Classify one chunk; output rows are in input order."""
+    from sagemaker_handler import detect_languages
+    from voice_handler import classify_batch
+
+    # Positions, not record ids, key the results: ids may repeat in a file.
+    results, failures, _ = classify_batch([(str(i), text) for i, (_, text) in enumerate(chunk)])
+    rows: list[dict[str, Any] | None] = [None] * len(chunk)
+    for failure in failures:
+        i = int(failure["id"])
+        rows[i] = {"id": chunk[i][0], "error": failure["error"]}
+
+    detections: list[dict[str, Any] | None] = [None] * len(results)
+    if detect and results:
+        detections = list(detect_languages([chunk[int(r["id"])][1] for r in results]))
+    for result, detection in zip(results, detections):
+        i = int(result["id"])
+        row = {
+            "id": chunk[i][0],
+            "language": result["language"],
+            "intent": result["intent"],
+            "confidence": result["confidence"],
+        }
+        if detection is not None:
+            row["detected_language"] = detection["detected_language"]
+            row["language_confidence"] = detection["confidence"]
+            row["detector"] = detection["detector"]
+        rows[i] = row
+    return [row for row in rows if row is not None]
+
+
+def run(
+    records: Iterable[tuple[str, Any]],
+    out: IO[str],
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    detect: bool = True,
+) -> int:
+    """Classify records and write JSONL rows to out as chunks complete.
+
+    At most 2 * workers chunks are in flight; the next chunk is only read
+    once the oldest one has been written. Falls back to running in-process
+    if a pool can't be started. Returns the number of rows written.
+    """
+    chunks = chunked(records, chunk_size)
+    written = 0
+
+    def write(rows: list[dict[str, Any]]) -> None:
+        nonlocal written
+        out.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+        out.flush()
+        written += len(rows)
+
+    pool = None
+    if workers > 1:
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        except (OSError, NotImplementedError):
+            pool = None
+
+    if pool is None:
+        _init_worker()
+        for chunk in chunks:
+            write(classify_chunk(chunk, detect))
+        return written
+
+    in_flight: deque[tuple[list[tuple[str, Any]], Future[list[dict[str, Any]]]]] = deque()
+    try:
+        with pool:
+            for chunk in chunks:
+                in_flight.append((chunk, pool.submit(classify_chunk, chunk, detect)))
+                if len(in_flight) >= 2 * workers:
+                    write(in_flight[0][1].result())
+                    in_flight.popleft()
+            while in_flight:
+                write(in_flight[0][1].result())
+                in_flight.popleft()
+    except (OSError, BrokenProcessPool):
+        # Finish what's left in-process; rows already written stay written.
+        _init_worker()
+        for chunk, _ in in_flight:
+            write(classify_chunk(chunk, detect))
+        for chunk in chunks:
+            write(classify_chunk(chunk, detect))
+    return written
+
+
+class Progress:
+    """Periodic throughput lines on stderr."""
+
+    def __init__(self, counter: ByteCounter, interval_s: float = PROGRESS_INTERVAL_S) -> None:
+        self.counter = counter
+        self.interval_s = interval_s
+        self.start = time.monotonic()
+        self._last = self.start
+        self.records = 0
+
+    def track(self, records: Iterable[tuple[str, Any]]) -> Iterator[tuple[str, Any]]:
+        for record in records:
+            self.records += 1
+            yield record
+            now = time.monotonic()
+            if now - self._last >= self.interval_s:
+                self._last = now
+                self.report()
+
+    def report(self, final: bool = False) -> None:
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        print(
+            f"{'done' if final else 'read'}: {self.records} records, "
+            f"{self.counter.n / 1e6:.1f} MB in {elapsed:.1f}s "
+            f"({self.records / elapsed:,.0f} records/s, {self.counter.n / 1e6 / elapsed:.1f} MB/s)",
+            file=sys.stderr,
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", help='JSONL or CSV file, or "-" for stdin')
+    parser.add_argument("-o", "--output", default="-", help="JSONL results (default stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="default: from the file extension")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--no-detect", action="store_true", help="skip sagemaker language detection")
+    parser.add_argument("--quiet", action="store_true", help="no progress lines")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    counter = ByteCounter()
+    lines = iter_lines(args.input, counter)
+    parse = iter_csv if fmt == "csv" else iter_jsonl
+    progress = Progress(counter, float("inf") if args.quiet else PROGRESS_INTERVAL_S)
+    records = progress.track(parse(lines, args.text_field, args.id_field))
+
+    out: IO[str] = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        run(records, out, max(args.workers, 1), max(args.chunk_size, 1), detect=not args.no_detect)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if not args.quiet:
+        progress.report(final=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Confidence-gated routing between local scoring and Bedrock.
+
+Most traffic is greetings and plain "check my balance" requests, for which
+Claude's answer is predictable. The cascade scores every message with
+signals that cost microseconds, and only sends what they can't settle to
+Bedrock:
+
+  tier "local"    the keyword intent is confident and a small lexicon
+                  sentiment model is confident the message is neutral or
+                  positive; its answer is used and Bedrock isn't called
+  tier "bedrock"  everything else: unknown or low-confidence intents,
+                  anything complaint-like, negative or urgent, and long
+                  messages the lexicon has nothing to say about
+
+Thresholds are tunable per environment. Stats are kept per container:
+how many messages each tier answered, why messages escalated, and how
+often the local guess agreed with Claude when both were computed (every
+escalated message, plus a shadow_rate sample of locally answered ones, to
+check the local tier itself).
+
+>>> cascade = Cascade(shadow_rate=0.0)
+>>> route = cascade.route(["habari", "yako"], {"intent": "greeting", "confidence": 0.85})
+>>> route.tier, route.sentiment["sentiment"]
+('local', 'neutral')
+>>> cascade.route(["my", "transfer", "failed"], {"intent": "send_money", "confidence": 0.85}).reason
+'complaint'
+"""
+import random
+import threading
+from typing import Any, Callable, Iterable
+
+LOCAL = "local"
+BEDROCK = "bedrock"
+
+# Escalation reasons.
+LOW_INTENT_CONFIDENCE = "low_intent_confidence"
+COMPLAINT = "complaint"
+LOW_SENTIMENT_CONFIDENCE = "low_sentiment_confidence"
+
+# Word -> polarity. English plus the Swahili/Sheng the voice stage sees.
+POSITIVE_WORDS: dict[str, float] = {
+    "thanks": 1.0, "thank": 1.0, "great": 1.0, "good": 0.5, "love": 1.0,
+    "excellent": 1.0, "awesome": 1.0, "nice": 0.5, "happy": 1.0, "perfect": 1.0,
+    "fast": 0.5, "easy": 0.5, "helpful": 1.0,
+    "asante": 1.0, "nzuri": 1.0, "poa": 0.5, "safi": 1.0, "furaha": 1.0,
+    "vizuri": 1.0, "shukrani": 1.0,
+}
+NEGATIVE_WORDS: dict[str, float] = {
+    "bad": 1.0, "slow": 0.5, "terrible": 1.0, "angry": 1.0, "disappointed": 1.0,
+    "annoyed": 1.0, "hate": 1.0, "worst": 1.0, "problem": 0.5, "issue": 0.5,
+    "mbaya": 1.0, "hasira": 1.0, "tatizo": 0.5, "shida": 0.5, "nimechoka": 1.0,
+}
+# Any of these escalates regardless of scores: Claude has to categorise them.
+COMPLAINT_WORDS: frozenset[str] = frozenset({
+    "failed", "fail", "failing", "wrong", "missing", "lost", "never", "refund",
+    "charged", "twice", "stuck", "pending", "declined", "error", "scam", "fraud",
+    "stolen", "hacked", "locked", "blocked", "complaint", "cheated",
+    "imeshindwa", "haijafika", "hazijafika", "sijapokea", "sijapata", "imekwama",
+    "imepotea", "wizi", "ulaghai", "imefungwa", "rudisha", "malalamiko",
+})
+URGENT_WORDS: frozenset[str] = frozenset({
+    "urgent", "urgently", "emergency", "immediately", "asap",
+    "haraka", "dharura",
+})
+NEGATORS: frozenset[str] = frozenset({
+    "not", "no", "never", "don't", "didn't", "isn't", "si", "sio", "hapana",
+})
+
+# Texts longer than this with no sentiment words are left to Claude.
+MAX_UNSCORED_TOKENS = 12
+
+
+def lexicon_sentiment(tokens: Iterable[str]) -> dict[str, Any]:
+    """Sentiment in Claude's response shape, from word lists alone.
+
+    A negator up to two words before a polar word flips it ("not happy").
+    Confidence grows with the net score; messages without sentiment words
+    are neutral inquiries, confident only while they are short.
+
+    >>> lexicon_sentiment(["asante", "sana"])["sentiment"]
+    'positive'
+    >>> lexicon_sentiment(["not", "happy"])["sentiment"]
+    'negative'
+    """
+    words = [t.lower() for t in tokens]
+    score = 0.0
+    hits = 0
+    complaint = urgent = False
+    for i, word in enumerate(words):
+        complaint = complaint or word in COMPLAINT_WORDS
+        urgent = urgent or word in URGENT_WORDS
+        polarity = POSITIVE_WORDS.get(word, 0.0) - NEGATIVE_WORDS.get(word, 0.0)
+        if not polarity:
+            continue
+        hits += 1
+        if any(w in NEGATORS for w in words[max(i - 2, 0):i]):
+            polarity = -polarity
+        score += polarity
+
+    if score > 0:
+        sentiment, category = "positive", "praise"
+    elif score < 0 or complaint:
+        sentiment, category = "negative", "complaint"
+    else:
+        sentiment, category = "neutral", "inquiry"
+    if urgent:
+        category = "urgent"
+
+    if hits:
+        confidence = min(0.6 + 0.15 * abs(score), 0.95)
+    elif complaint:
+        confidence = 0.7
+    else:
+        confidence = 0.8 if len(words) <= MAX_UNSCORED_TOKENS else 0.5
+    return {"sentiment": sentiment, "category": category, "confidence": round(confidence, 2)}
+
+
+class Route:
+    """The cascade's decision for one message.
+
+    sentiment is the local guess; for tier "bedrock" it's only kept to be
+    compared with Claude's answer (see Cascade.record). shadow marks a
+    locally answered message that is also sent to Bedrock for comparison.
+    """
+
+    __slots__ = ("tier", "sentiment", "reason", "shadow")
+
+    def __init__(self, tier: str, sentiment: dict[str, Any], reason: str = "", shadow: bool = False) -> None:
+        self.tier = tier
+        self.sentiment = sentiment
+        self.reason = reason
+        self.shadow = shadow
+
+    @property
+    def needs_bedrock(self) -> bool:
+        return self.tier == BEDROCK or self.shadow
+
+
+class Cascade:
+    """Routes messages to a tier and keeps the tuning stats. Thread-safe.
+
+    match_intent scores tokens when a message arrives without an intent
+    (intent_index.match_intent's signature).
+    """
+
+    def __init__(
+        self,
+        intent_threshold: float = 0.8,
+        sentiment_threshold: float = 0.75,
+        shadow_rate: float = 0.0,
+        match_intent: Callable[[list[str]], tuple[str, float]] | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.intent_threshold = intent_threshold
+        self.sentiment_threshold = sentiment_threshold
+        self.shadow_rate = shadow_rate
+        self.match_intent = match_intent
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tiers = {LOCAL: 0, BEDROCK: 0}
+            self._reasons: dict[str, int] = {}
+            self._shadowed = 0
+            # label the local tier guessed -> [compared, agreed]
+            self._sentiment_agreement: dict[str, list[int]] = {}
+            self._category_agreement: dict[str, list[int]] = {}
+
+    def route(self, tokens: list[str], classification: dict[str, Any]) -> Route:
+        """Pick the tier for one message from its tokens and classification."""
+        intent, confidence = classification.get("intent"), classification.get("confidence")
+        if intent is None and self.match_intent is not None:
+            intent, confidence = self.match_intent(tokens)
+        local = lexicon_sentiment(tokens)
+
+        reason = ""
+        if intent in (None, "unknown") or (confidence or 0.0) < self.intent_threshold:
+            reason = LOW_INTENT_CONFIDENCE
+        elif local["sentiment"] == "negative" or local["category"] in ("complaint", "urgent"):
+            reason = COMPLAINT
+        elif local["confidence"] < self.sentiment_threshold:
+            reason = LOW_SENTIMENT_CONFIDENCE
+
+        with self._lock:
+            if reason:
+                self._tiers[BEDROCK] += 1
+                self._reasons[reason] = self._reasons.get(reason, 0) + 1
+                return Route(BEDROCK, local, reason)
+            self._tiers[LOCAL] += 1
+            shadow = self.shadow_rate > 0 and self._rng.random() < self.shadow_rate
+            self._shadowed += shadow
+        return Route(LOCAL, local, shadow=shadow)
+
+    def record(self, route: Route, bedrock_sentiment: dict[str, Any]) -> None:
+        """Compare the local guess with Claude's answer for the same message."""
+        guess = route.sentiment
+        with self._lock:
+            for table, field in (
+                (self._sentiment_agreement, "sentiment"),
+                (self._category_agreement, "category"),
+            ):
+                counts = table.setdefault(str(guess.get(field)), [0, 0])
+                counts[0] += 1
+                counts[1] += guess.get(field) == bedrock_sentiment.get(field)
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of tier hit rates, escalation reasons and agreement."""
+
+        def agreement(table: dict[str, list[int]]) -> dict[str, Any]:
+            compared = sum(c for c, _ in table.values())
+            agreed = sum(a for _, a in table.values())
+            return {
+                "compared": compared,
+                "agreed": agreed,
+                "rate": round(agreed / compared, 4) if compared else None,
+                "by_label": {
+                    label: {"compared": c, "agreed": a} for label, (c, a) in table.items()
+                },
+            }
+
+        with self._lock:
+            total = sum(self._tiers.values())
+            return {
+                "messages": total,
+                "tiers": dict(self._tiers),
+                "local_rate": round(self._tiers[LOCAL] / total, 4) if total else None,
+                "escalations": dict(self._reasons),
+                "shadowed": self._shadowed,
+                "agreement": {
+                    "sentiment": agreement(self._sentiment_agreement),
+                    "category": agreement(self._category_agreement),
+                },
+            }
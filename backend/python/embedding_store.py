@@ -0,0 +1,156 @@
+"""Compact embedding storage and local nearest-neighbour search.
+
+Titan vectors are persisted next to each ML result as a small binary
+attribute instead of being thrown away:
+
+* ``float16`` (default) — 2 bytes/dim, 512 bytes for a 256-dim vector.
+* ``int8`` — 1 byte/dim plus a float32 scale, symmetric quantization.
+
+Each blob starts with a one-byte codec tag, so readers don't need to know
+how it was written. Encoding uses only the standard library, so the
+Lambda write path doesn't need NumPy.
+
+``EmbeddingIndex`` is an in-process, NumPy-vectorized cosine index built
+from those blobs. It supports top-k queries, incremental adds, and
+on-disk snapshots that load through a memory map. NumPy is only imported
+when the index is used.
+
+>>> blob = encode_embedding([0.5, -0.25, 1.0])
+>>> len(blob), decode_embedding(blob)
+(7, [0.5, -0.25, 1.0])
+>>> [round(x, 2) for x in decode_embedding(encode_embedding([0.5, -1.0], "int8"))]
+[0.5, -1.0]
+"""
+import json
+import os
+import struct
+from typing import Any, Iterable, Sequence
+
+CODEC_FLOAT16 = 1
+CODEC_INT8 = 2
+_CODECS = {"float16": CODEC_FLOAT16, "int8": CODEC_INT8}
+
+
+def encode_embedding(vector: Sequence[float], codec: str = "float16") -> bytes:
+    """Pack a vector into a tagged binary blob."""
+    if codec not in _CODECS:
+        raise ValueError(f"unknown embedding codec: {codec}")
+    n = len(vector)
+    if codec == "float16":
+        return struct.pack(f"<B{n}e", CODEC_FLOAT16, *vector)
+
+    scale = max((abs(v) for v in vector), default=0.0) / 127 or 1.0
+    quantized = [max(-127, min(127, round(v / scale))) for v in vector]
+    return struct.pack(f"<Bf{n}b", CODEC_INT8, scale, *quantized)
+
+
+def decode_embedding(blob: Any) -> list[float]:
+    """Unpack a blob written by encode_embedding (bytes or a boto3 Binary)."""
+    data = bytes(blob.value if hasattr(blob, "value") else blob)
+    if not data:
+        return []
+    codec = data[0]
+    if codec == CODEC_FLOAT16:
+        return list(struct.unpack(f"<{(len(data) - 1) // 2}e", data[1:]))
+    if codec == CODEC_INT8:
+        (scale,) = struct.unpack("<f", data[1:5])
+        return [q * scale for q in struct.unpack(f"<{len(data) - 5}b", data[5:])]
+    raise ValueError(f"unknown embedding codec tag: {codec}")
+
+
+class EmbeddingIndex:
+    """Exact cosine-similarity index over unit-normalized vectors.
+
+    Vectors are held in one contiguous matrix (grown geometrically on add),
+    so a query is a single matrix-vector product plus an argpartition.
+    """
+
+    def __init__(self, dim: int, dtype: str = "float32") -> None:
+        import numpy as np
+
+        self.dim = dim
+        self.ids: list[str] = []
+        self._np = np
+        self._matrix = np.empty((0, dim), dtype=dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def from_items(cls, items: Iterable[dict[str, Any]], dim: int = 256) -> "EmbeddingIndex":
+        """Build an index from persisted result items (PK + embedding blob)."""
+        index = cls(dim)
+        ids: list[str] = []
+        vectors: list[list[float]] = []
+        for item in items:
+            if "embedding" not in item:
+                continue
+            ids.append(item["PK"])
+            vectors.append(decode_embedding(item["embedding"]))
+        if ids:
+            index.add(ids, vectors)
+        return index
+
+    def add(self, ids: Sequence[str], vectors: Any) -> None:
+        """Append vectors (normalized on the way in) under the given ids."""
+        np = self._np
+        batch = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != len(batch):
+            raise ValueError("ids and vectors must have the same length")
+        norms = np.linalg.norm(batch, axis=1, keepdims=True)
+        batch = batch / np.where(norms == 0, 1, norms)
+
+        needed = self._size + len(batch)
+        if needed > len(self._matrix) or not self._matrix.flags.writeable:
+            capacity = max(needed, 2 * len(self._matrix), 64)
+            grown = np.empty((capacity, self.dim), dtype=self._matrix.dtype)
+            grown[: self._size] = self._matrix[: self._size]
+            self._matrix = grown
+
+        self._matrix[self._size:needed] = batch
+        self._size = needed
+        self.ids.extend(ids)
+
+    def search(self, query: Sequence[float], k: int = 10) -> list[tuple[str, float]]:
+        """Return up to k (id, cosine similarity) pairs, best first."""
+        np = self._np
+        if self._size == 0 or k <= 0:
+            return []
+        q = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm:
+            q = q / norm
+
+        scores = self._matrix[: self._size] @ q.astype(self._matrix.dtype)
+        k = min(k, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def save(self, path: str, dtype: str = "float16") -> None:
+        """Write ``<path>.npy`` (vectors) and ``<path>.ids.json`` (ids)."""
+        np = self._np
+        np.save(f"{path}.npy", self._matrix[: self._size].astype(dtype))
+        tmp = f"{path}.ids.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        os.replace(tmp, f"{path}.ids.json")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "EmbeddingIndex":
+        """Load a snapshot. With mmap the vectors stay on disk until touched;
+        the first add() copies them into memory."""
+        import numpy as np
+
+        matrix = np.load(f"{path}.npy", mmap_mode="r" if mmap else None)
+        with open(f"{path}.ids.json", encoding="utf-8") as f:
+            ids = json.load(f)
+        if len(ids) != len(matrix):
+            raise ValueError(f"{path}: {len(ids)} ids for {len(matrix)} vectors")
+
+        index = cls(matrix.shape[1], dtype=str(matrix.dtype))
+        index._matrix = matrix
+        index._size = len(matrix)
+        index.ids = ids
+        return index
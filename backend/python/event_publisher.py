@@ -0,0 +1,206 @@
+"""Buffered, batched EventBridge publisher.
+
+Handlers enqueue entries and return; a daemon thread packs them into
+PutEvents calls (at most 10 entries / 256 KB per call) and retries only
+the entries EventBridge reports as failed. Nothing here raises into the
+request path — undeliverable events are counted as dropped instead.
+
+Works against any object with a boto3-compatible ``put_events`` method,
+so tests can pass a local stub.
+
+>>> class StubClient:
+...     def __init__(self): self.calls = []
+...     def put_events(self, Entries):
+...         self.calls.append(len(Entries))
+...         return {"FailedEntryCount": 0, "Entries": [{"EventId": "x"}] * len(Entries)}
+>>> stub = StubClient()
+>>> publisher = EventPublisher(stub, background=False)
+>>> publisher.publish_many([{"Source": "s", "DetailType": "d", "Detail": "{}"}] * 12)
+>>> publisher.flush()
+True
+>>> stub.calls
+[10, 2]
+>>> publisher.stats()["published"]
+12
+"""
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator
+
+MAX_ENTRIES_PER_PUT: int = 10
+MAX_BYTES_PER_PUT: int = 256 * 1024
+
+
+def entry_size(entry: dict[str, Any]) -> int:
+    """Approximate PutEvents entry size, per the EventBridge sizing rules."""
+    size = 14 if "Time" in entry else 0
+    for key in ("Source", "DetailType", "Detail"):
+        value = entry.get(key)
+        if value:
+            size += len(value.encode("utf-8"))
+    for resource in entry.get("Resources", []):
+        size += len(resource.encode("utf-8"))
+    return size
+
+
+def pack_entries(entries: list[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+    """Split entries into PutEvents-sized chunks. Oversized entries are skipped."""
+    chunk: list[dict[str, Any]] = []
+    chunk_bytes = 0
+    for entry in entries:
+        size = entry_size(entry)
+        if size > MAX_BYTES_PER_PUT:
+            continue
+        if chunk and (len(chunk) == MAX_ENTRIES_PER_PUT or chunk_bytes + size > MAX_BYTES_PER_PUT):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(entry)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+class EventPublisher:
+    """Queue EventBridge entries and deliver them in packed PutEvents calls.
+
+    With ``background=True`` (the default) a daemon thread delivers entries
+    while the handler builds its response; call ``flush()`` to wait for the
+    queue to drain. With ``background=False`` entries are only sent by an
+    explicit ``flush()``.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        background: bool = True,
+        max_retries: int = 3,
+        backoff_s: float = 0.05,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.client = client
+        self.background = background
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_queue = max_queue
+
+        self._queue: deque[dict[str, Any]] = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._worker: threading.Thread | None = None
+        self._counters = {
+            "published": 0,
+            "retried": 0,
+            "dropped": 0,
+            "put_calls": 0,
+        }
+
+    def stats(self) -> dict[str, int]:
+        """Return a snapshot of the delivery counters."""
+        with self._cond:
+            return {**self._counters, "queued": len(self._queue) + self._in_flight}
+
+    def publish(self, entry: dict[str, Any]) -> None:
+        """Enqueue one entry."""
+        self.publish_many([entry])
+
+    def publish_many(self, entries: list[dict[str, Any]]) -> None:
+        """Enqueue entries. Entries beyond ``max_queue`` are dropped, not blocked on."""
+        if not entries:
+            return
+        with self._cond:
+            room = self.max_queue - len(self._queue)
+            accepted = entries[:max(room, 0)]
+            self._counters["dropped"] += len(entries) - len(accepted)
+            self._queue.extend(accepted)
+            if self.background:
+                self._ensure_worker()
+                self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Deliver (or wait for delivery of) everything queued so far.
+
+        Returns False if ``timeout`` expired before the queue drained.
+        """
+        if not self.background:
+            self._drain()
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _ensure_worker(self) -> None:
+        # Caller holds self._cond.
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="event-publisher", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+            self._drain()
+
+    def _drain(self) -> None:
+        with self._cond:
+            batch = list(self._queue)
+            self._queue.clear()
+            self._in_flight += len(batch)
+
+        try:
+            sendable = list(pack_entries(batch))
+            oversized = len(batch) - sum(len(c) for c in sendable)
+            if oversized:
+                self._count("dropped", oversized)
+            for chunk in sendable:
+                self._send(chunk)
+        finally:
+            with self._cond:
+                self._in_flight -= len(batch)
+                self._cond.notify_all()
+
+    def _send(self, entries: list[dict[str, Any]]) -> None:
+        pending = entries
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retried", len(pending))
+                time.sleep(self.backoff_s * (2 ** (attempt - 1)))
+            try:
+                self._count("put_calls", 1)
+                response = self.client.put_events(Entries=pending)
+            except Exception:
+                # Network/throttling error on the whole call — retry all of it.
+                continue
+
+            if not response.get("FailedEntryCount"):
+                self._count("published", len(pending))
+                return
+
+            results = response.get("Entries", [])
+            failed = [e for e, r in zip(pending, results) if r.get("ErrorCode")]
+            self._count("published", len(pending) - len(failed))
+            pending = failed
+            if not pending:
+                return
+
+        self._count("dropped", len(pending))
+
+    def _count(self, key: str, n: int) -> None:
+        with self._cond:
+            self._counters[key] += n
+
+
+def flush_at_exit(publisher: EventPublisher, timeout: float = 2.0) -> None:
+    """Best-effort delivery of anything still queued when the runtime shuts down."""
+    atexit.register(publisher.flush, timeout)
@@ -0,0 +1,181 @@
+"""Versioned payload for VoiceClassification events.
+
+The voice stage already knows each utterance's tokens, language, intent
+and confidence; the detail it publishes carries all of them so Bedrock (and
+anything else downstream) can use them instead of classifying the text
+again.
+
+Schema v2 (JSON, as published to EventBridge):
+
+    {"v": 2, "text": ..., "language": ..., "intent": ..., "confidence": ...,
+     "tokens": [...], "token_count": ...}
+
+It is a superset of the original (v1, unversioned) detail, so existing
+consumers keep working. Payloads without "v" are read as v1: the text and
+any language hint are used, and the consumer classifies as before.
+
+For SQS and Kinesis producers there is a compact binary form: a marker
+byte (0xC1, never emitted by msgpack itself), the schema version, then a
+msgpack array [text, language, intent, confidence, tokens]. Positional
+fields roughly halve the size of a typical event. msgpack is an optional
+dependency; without it encode() falls back to compact JSON, and decode()
+reports binary payloads as undecodable. SQS bodies must be text, so
+binary payloads travel there base64-encoded; decode() accepts either.
+
+>>> detail = voice_detail("angalia salio", {"language": "swahili", "intent": "check_balance",
+...                                          "confidence": 0.85, "tokens": ["angalia", "salio"]})
+>>> from_payload(json.loads(encode(detail, "json"))) == detail
+True
+>>> from_payload({"text": "hello"})["v"]
+1
+"""
+import base64
+import binascii
+import json
+from typing import Any
+
+SCHEMA_VERSION: int = 2
+LEGACY_VERSION: int = 1
+
+# 0xC1 is reserved ("never used") in msgpack, and isn't valid UTF-8 either,
+# so it can't be confused with a JSON payload or bare msgpack.
+BINARY_MARKER: int = 0xC1
+
+CODECS = ("json", "msgpack")
+
+
+def voice_detail(text: str, result: dict[str, Any]) -> dict[str, Any]:
+    """The v2 detail for one classified utterance."""
+    tokens = list(result.get("tokens", []))
+    return {
+        "v": SCHEMA_VERSION,
+        "text": text,
+        "language": result["language"],
+        "intent": result["intent"],
+        "confidence": result["confidence"],
+        "tokens": tokens,
+        "token_count": len(tokens),
+    }
+
+
+def from_payload(payload: Any) -> dict[str, Any]:
+    """Normalize an EventBridge event, v2 detail, v1 detail or direct payload.
+
+    Always returns "v", "text" and "language"; the classification fields
+    are only present for v2 payloads. A missing language is "auto" for
+    direct payloads and "english" inside EventBridge events, as the voice
+    stage has always labelled them. A bare string is taken as the text.
+    """
+    default_language = "auto"
+    if isinstance(payload, str):
+        payload = {"text": payload}
+    if not isinstance(payload, dict):
+        raise ValueError("payload must be an object")
+    if isinstance(payload.get("detail"), dict):
+        payload, default_language = payload["detail"], "english"
+
+    text = payload.get("text", "")
+    if not isinstance(text, str):
+        raise ValueError("text must be a string")
+
+    version = payload.get("v", LEGACY_VERSION)
+    if not isinstance(version, int) or version < SCHEMA_VERSION:
+        return {"v": LEGACY_VERSION, "text": text, "language": payload.get("language", default_language)}
+
+    tokens = payload.get("tokens") or []
+    return {
+        "v": version,
+        "text": text,
+        "language": payload.get("language", default_language),
+        "intent": payload.get("intent"),
+        "confidence": payload.get("confidence"),
+        "tokens": tokens,
+        "token_count": len(tokens),
+    }
+
+
+def classification_of(detail: dict[str, Any]) -> dict[str, Any] | None:
+    """The upstream classification carried by a normalized detail, if any.
+
+    Shaped like classify_intent_dict's result, so it can stand in for it.
+    """
+    if detail.get("v", LEGACY_VERSION) < SCHEMA_VERSION or detail.get("intent") is None:
+        return None
+    return {
+        "language": detail["language"],
+        "intent": detail["intent"],
+        "confidence": detail.get("confidence"),
+        "tokens": detail["tokens"],
+        "token_count": detail["token_count"],
+    }
+
+
+def encode(detail: dict[str, Any], codec: str = "msgpack") -> bytes:
+    """Serialize a v2 detail: compact binary, or compact JSON."""
+    if codec not in CODECS:
+        raise ValueError(f"unknown codec {codec!r}; expected one of {CODECS}")
+    if codec == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            codec = "json"
+        else:
+            fields = [
+                detail["text"],
+                detail["language"],
+                detail["intent"],
+                detail["confidence"],
+                detail.get("tokens", []),
+            ]
+            return bytes([BINARY_MARKER, detail.get("v", SCHEMA_VERSION)]) + msgpack.packb(fields)
+    return json.dumps(detail, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def encode_text(detail: dict[str, Any], codec: str = "msgpack") -> str:
+    """encode() for text-only transports (SQS message bodies)."""
+    data = encode(detail, codec)
+    if data[0] == BINARY_MARKER:
+        return base64.b64encode(data).decode("ascii")
+    return data.decode("utf-8")
+
+
+def decode(data: bytes | str) -> dict[str, Any]:
+    """Parse any payload produced by encode(), encode_text() or a v1 producer.
+
+    Returns the normalized detail (see from_payload). Raises ValueError for
+    anything undecodable.
+    """
+    if isinstance(data, str):
+        stripped = data.lstrip()
+        if stripped.startswith(("{", "[", '"')):
+            return from_payload(json.loads(stripped))
+        try:
+            data = base64.b64decode(stripped, validate=True)
+        except (binascii.Error, ValueError) as exc:
+            raise ValueError(f"payload is neither JSON nor base64: {exc}") from exc
+
+    if data[:1] == bytes([BINARY_MARKER]):
+        return _decode_binary(data)
+    return from_payload(json.loads(data))
+
+
+def _decode_binary(data: bytes) -> dict[str, Any]:
+    try:
+        import msgpack
+    except ImportError as exc:
+        raise ValueError("binary event payload but msgpack is not installed") from exc
+
+    if len(data) < 2 or data[1] < SCHEMA_VERSION:
+        raise ValueError("binary event payload without a supported schema version")
+    try:
+        text, language, intent, confidence, tokens = msgpack.unpackb(data[2:])
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"malformed binary event payload: {exc}") from exc
+    return from_payload({
+        "v": data[1],
+        "text": text,
+        "language": language,
+        "intent": intent,
+        "confidence": confidence,
+        "tokens": tokens,
+    })
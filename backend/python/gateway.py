@@ -0,0 +1,493 @@
+"""Self-hosted HTTP gateway serving every handler from one process.
+
+For on-prem deployments and local load tests: one asyncio HTTP/1.1 server
+in front of the same handler code the Lambdas run, without per-request
+Lambda overhead.
+
+    python python/gateway.py --port 8080 --workers 4
+
+Routes (POST, JSON bodies):
+
+  /voice            voice_handler      API Gateway (HTTP API v2) event
+  /detect-language  sagemaker_handler  API Gateway (HTTP API v2) event
+  /bedrock          bedrock_handler    body passed as a direct-invoke event
+  /submit           handler            body passed as a direct-invoke event
+
+plus GET /health and GET /stats. Responses carry the handler's statusCode,
+headers and body; handler results without a statusCode (SQS-style batch
+responses) are returned as a 200 JSON body.
+
+* Connections are kept alive (HTTP/1.1 default, or "Connection:
+  keep-alive" on 1.0) until the client closes, sends "Connection: close",
+  or idles for --keepalive-s. Pipelined requests are answered in order.
+* Single-text /voice requests arriving within --batch-window-ms of each
+  other are coalesced into one classify_batch call (up to --max-batch
+  texts) on a process pool; their EventBridge events are published from
+  this process. Anything else on /voice goes to the handler unchanged.
+* /detect-language (langdetect is CPU-bound) runs on the process pool too;
+  /bedrock and /submit are I/O-bound and run on a thread pool.
+* Backpressure: beyond --max-inflight concurrent requests, or
+  --max-pending texts waiting to be coalesced, requests get 503 with
+  Retry-After instead of queueing without bound. Bodies over
+  --max-body-bytes get 413.
+
+With --workers 0 (or where processes can't be started) CPU-bound work runs
+on the thread pool instead.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+from process_pool import worker_context
+
+DEFAULT_MAX_BODY_BYTES: int = 6 * 1024 * 1024  # the Lambda payload limit
+MAX_HEADER_BYTES: int = 64 * 1024
+
+API_GATEWAY = "api_gateway"
+DIRECT = "direct"
+
+# path -> (handler module, event shape, CPU-bound)
+ROUTES: dict[str, tuple[str, str, bool]] = {
+    "/voice": ("voice_handler", API_GATEWAY, True),
+    "/detect-language": ("sagemaker_handler", API_GATEWAY, True),
+    "/bedrock": ("bedrock_handler", DIRECT, False),
+    "/submit": ("handler", DIRECT, False),
+}
+
+
+class Overloaded(Exception):
+    """A backpressure limit was hit; the client should retry later."""
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _init_worker() -> None:
+    """Load the classifiers once per worker process."""
+    import sagemaker_handler
+    import voice_handler  # noqa: F401
+
+    # The pool already provides the parallelism; don't nest another one.
+    sagemaker_handler.MAX_WORKERS = 1
+
+
+def invoke(module: str, event: dict[str, Any], request_id: str) -> Any:
+    """Run one handler as Lambda would (picklable, for the process pool)."""
+    context = SimpleNamespace(aws_request_id=request_id, function_name=f"gateway-{module}")
+    return importlib.import_module(module).handler(event, context)
+
+
+def classify_texts(texts: list[str]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """(results, EventBridge entries) for one coalesced /voice batch."""
+    from voice_handler import classify_batch
+
+    results, _, entries = classify_batch([(str(i), text) for i, text in enumerate(texts)])
+    return results, entries
+
+
+def api_gateway_event(
+    method: str, path: str, query: str, headers: dict[str, str], body: str, source_ip: str
+) -> dict[str, Any]:
+    """An HTTP API (payload format 2.0) proxy event for the request."""
+    now = time.time()
+    return {
+        "version": "2.0",
+        "routeKey": f"{method} {path}",
+        "rawPath": path,
+        "rawQueryString": query,
+        "headers": headers,
+        "requestContext": {
+            "http": {"method": method, "path": path, "protocol": "HTTP/1.1", "sourceIp": source_ip},
+            "requestId": str(uuid.uuid4()),
+            "timeEpoch": int(now * 1000),
+        },
+        "body": body,
+        "isBase64Encoded": False,
+    }
+
+
+class Coalescer:
+    """Gathers concurrent single texts into one batch call.
+
+    A batch is flushed when it reaches max_batch texts or window_s after
+    its first text arrived, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[list[str]], Awaitable[list[dict[str, Any]]]],
+        max_batch: int = 64,
+        window_s: float = 0.001,
+        max_pending: int = 4096,
+    ) -> None:
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.window_s = window_s
+        self.max_pending = max_pending
+        self.batches = 0
+        self.texts = 0
+        self._pending: list[tuple[str, asyncio.Future[dict[str, Any]]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, text: str) -> dict[str, Any]:
+        if len(self._pending) >= self.max_pending:
+            raise Overloaded(f"{self.max_pending} texts already waiting")
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[dict[str, Any]] = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.window_s, self._flush)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future[dict[str, Any]]]]) -> None:
+        self.batches += 1
+        self.texts += len(batch)
+        try:
+            results = await self.run_batch([text for text, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class Gateway:
+    """The HTTP server, its executors and its limits."""
+
+    def __init__(
+        self,
+        workers: int = os.cpu_count() or 1,
+        threads: int = 32,
+        max_inflight: int = 256,
+        max_batch: int = 64,
+        batch_window_ms: float = 1.0,
+        max_pending: int = 4096,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        keepalive_s: float = 5.0,
+    ) -> None:
+        self.max_inflight = max_inflight
+        self.max_body_bytes = max_body_bytes
+        self.keepalive_s = keepalive_s
+        self.threads: Executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="gateway")
+        self.processes: Executor = self.threads
+        if workers > 0:
+            try:
+                self.processes = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=worker_context(), initializer=_init_worker
+                )
+            except (OSError, NotImplementedError):
+                pass
+        self.coalescer = Coalescer(
+            self._classify, max_batch, batch_window_ms / 1000, max_pending
+        )
+        self.inflight = 0
+        self.connections = 0
+        self.counters: dict[str, int] = {"requests": 0, "rejected": 0, "errors": 0}
+        self.routes: dict[str, int] = {}
+        self._server: asyncio.Server | None = None
+        self._open: dict[asyncio.StreamWriter, asyncio.Task[Any]] = {}
+
+    # -- serving -----------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> int:
+        """Start listening; returns the bound port (useful with port=0)."""
+        self._server = await asyncio.start_server(
+            self._connection, host, port, limit=MAX_HEADER_BYTES
+        )
+        return int(self._server.sockets[0].getsockname()[1])
+
+    async def serve_forever(self) -> None:
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        # Closing the transports ends each connection's read loop.
+        tasks = list(self._open.values())
+        for writer in list(self._open):
+            writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        self.threads.shutdown(wait=False)
+        if self.processes is not self.threads:
+            self.processes.shutdown(wait=False)
+
+    def stats(self) -> dict[str, Any]:
+        batches = self.coalescer.batches
+        return {
+            **self.counters,
+            "inflight": self.inflight,
+            "connections": self.connections,
+            "routes": dict(self.routes),
+            "coalesced": {
+                "batches": batches,
+                "texts": self.coalescer.texts,
+                "mean_batch": round(self.coalescer.texts / batches, 2) if batches else None,
+                "pending": len(self.coalescer._pending),
+            },
+            "process_pool": self.processes is not self.threads,
+        }
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        task = asyncio.current_task()
+        if task is not None:
+            self._open[writer] = task
+        peer = writer.get_extra_info("peername")
+        source_ip = peer[0] if isinstance(peer, tuple) else ""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_s)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {"error": "headers too large"}, keep_alive=False)
+                    return
+                keep_alive = await self._request(head, reader, writer, source_ip)
+                if not keep_alive:
+                    return
+        finally:
+            self.connections -= 1
+            self._open.pop(writer, None)
+            writer.close()
+
+    async def _request(
+        self,
+        head: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        source_ip: str,
+    ) -> bool:
+        """Read, dispatch and answer one request; returns whether to keep the connection."""
+        try:
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, target, version = request_line.split(" ", 2)
+            headers: dict[str, str] = {}
+            for line in header_lines:
+                if line:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+        except ValueError:
+            await self._respond(writer, 400, {"error": "malformed request"}, keep_alive=False)
+            return False
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            await self._respond(writer, 411, {"error": "Content-Length required"}, keep_alive=False)
+            return False
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            await self._respond(writer, 400, {"error": "bad Content-Length"}, keep_alive=False)
+            return False
+        if length > self.max_body_bytes:
+            await self._respond(writer, 413, {"error": f"body exceeds {self.max_body_bytes} bytes"},
+                                keep_alive=False)
+            return False
+        if length and headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        try:
+            body = (await reader.readexactly(length)).decode("utf-8") if length else ""
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return False
+        except UnicodeDecodeError:
+            await self._respond(writer, 400, {"error": "body must be UTF-8"}, keep_alive=keep_alive)
+            return keep_alive
+
+        path, _, query = target.partition("?")
+        self.counters["requests"] += 1
+        self.routes[path] = self.routes.get(path, 0) + 1
+        status, response_headers, response = await self._dispatch(
+            method, path, query, headers, body, source_ip
+        )
+        await self._respond(writer, status, response, keep_alive, response_headers)
+        return keep_alive
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: Any,
+        keep_alive: bool,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        payload = (body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        out = {"Content-Type": "application/json", **(headers or {})}
+        out["Content-Length"] = str(len(payload))
+        out["Connection"] = "keep-alive" if keep_alive else "close"
+        if keep_alive:
+            out["Keep-Alive"] = f"timeout={int(self.keepalive_s)}"
+        lines += [f"{name}: {value}" for name, value in out.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    # -- dispatch ----------------------------------------------------------
+
+    async def _dispatch(
+        self, method: str, path: str, query: str, headers: dict[str, str], body: str, source_ip: str
+    ) -> tuple[int, dict[str, str], Any]:
+        if method == "GET" and path == "/health":
+            return 200, {}, {"status": "ok"}
+        if method == "GET" and path == "/stats":
+            return 200, {}, self.stats()
+        if path not in ROUTES:
+            return 404, {}, {"error": f"no route for {path}"}
+        if method != "POST":
+            return 405, {"Allow": "POST"}, {"error": "method not allowed"}
+
+        if self.inflight >= self.max_inflight:
+            self.counters["rejected"] += 1
+            return 503, {"Retry-After": "1"}, {"error": "overloaded"}
+        self.inflight += 1
+        try:
+            return await self._handle(path, query, headers, body, source_ip)
+        except Overloaded as exc:
+            self.counters["rejected"] += 1
+            return 503, {"Retry-After": "1"}, {"error": f"overloaded: {exc}"}
+        except HTTPError as exc:
+            return exc.status, {}, {"error": str(exc)}
+        except Exception as exc:
+            self.counters["errors"] += 1
+            return 500, {}, {"error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            self.inflight -= 1
+
+    async def _handle(
+        self, path: str, query: str, headers: dict[str, str], body: str, source_ip: str
+    ) -> tuple[int, dict[str, str], Any]:
+        module, shape, cpu_bound = ROUTES[path]
+        start = time.monotonic_ns()
+
+        if path == "/voice":
+            text = _single_text(body)
+            if text is not None:
+                result = dict(await self.coalescer.submit(text))
+                result.pop("id", None)
+                result["latency_ms"] = (time.monotonic_ns() - start) // 1_000_000
+                return 200, {}, result
+
+        if shape == API_GATEWAY:
+            event = api_gateway_event("POST", path, query, headers, body, source_ip)
+            request_id = event["requestContext"]["requestId"]
+        else:
+            try:
+                event = json.loads(body) if body else {}
+            except ValueError as exc:
+                raise HTTPError(400, f"invalid JSON body: {exc}") from exc
+            if not isinstance(event, dict):
+                raise HTTPError(400, "body must be a JSON object")
+            request_id = str(uuid.uuid4())
+
+        executor = self.processes if cpu_bound else self.threads
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(executor, invoke, module, event, request_id)
+        if isinstance(result, dict) and "statusCode" in result:
+            return int(result["statusCode"]), result.get("headers") or {}, result.get("body", "")
+        return 200, {}, result
+
+    async def _classify(self, texts: list[str]) -> list[dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        results, entries = await loop.run_in_executor(self.processes, classify_texts, texts)
+        if entries:
+            from voice_handler import publish_events
+
+            # The background publisher only enqueues; a sync one does I/O.
+            await loop.run_in_executor(self.threads, publish_events, entries)
+        return results
+
+
+def _single_text(body: str) -> str | None:
+    """The text of a plain single-utterance /voice body, else None."""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or "texts" in payload or "Records" in payload:
+        return None
+    text = payload.get("text")
+    return text if isinstance(text, str) and text.strip() else None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="classification processes (0 = threads only)")
+    parser.add_argument("--threads", type=int, default=32, help="I/O handler threads")
+    parser.add_argument("--max-inflight", type=int, default=256)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--batch-window-ms", type=float, default=1.0)
+    parser.add_argument("--max-pending", type=int, default=4096)
+    parser.add_argument("--max-body-bytes", type=int, default=DEFAULT_MAX_BODY_BYTES)
+    parser.add_argument("--keepalive-s", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    gateway = Gateway(
+        workers=args.workers,
+        threads=args.threads,
+        max_inflight=args.max_inflight,
+        max_batch=args.max_batch,
+        batch_window_ms=args.batch_window_ms,
+        max_pending=args.max_pending,
+        max_body_bytes=args.max_body_bytes,
+        keepalive_s=args.keepalive_s,
+    )
+
+    async def serve() -> None:
+        port = await gateway.start(args.host, args.port)
+        print(f"listening on http://{args.host}:{port}", file=sys.stderr)
+        try:
+            await gateway.serve_forever()
+        finally:
+            await gateway.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
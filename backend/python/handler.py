@@ -3,29 +3,61 @@
 Bridges the PyO3 Rust backend with AWS Lambda + DynamoDB. The Rust layer
 handles HTTP and JSON validation; this layer handles orchestration and
 persistence.
+
+Submissions are idempotent: each (submission_id, payload hash) is reserved
+with a conditional write before anything is posted, so a retried schedule
+or Lambda retry replays the stored response instead of re-submitting.
 """
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any
 
-import boto3
-
 # PyO3 Rust bindings — compiled via maturin.
-from wave_backend import submit_resume
+from wave_backend import submit_many, submit_resume
+
+from aws_clients import is_prewarm_event, prewarm_requested, prewarm_response
+from instrumentation import DYNAMODB_WRITE, WAVE_API, instrumented, stage
+from idempotency import COMPLETED, UNCONFIRMED, IdempotencyStore, payload_digest
+from persistence import BatchWriter, LazyTable, get_table
 
 TABLE_NAME: str = os.environ.get("TABLE_NAME", "WaveSubmissions")
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(TABLE_NAME)
+
+IDEMPOTENCY = IdempotencyStore(
+    LazyTable(TABLE_NAME),
+    ttl_s=int(os.environ.get("IDEMPOTENCY_TTL_S", str(86400 * 7))),
+    # Matches the 5 minute function timeout: older claims belong to a dead run.
+    in_progress_s=int(os.environ.get("IDEMPOTENCY_IN_PROGRESS_S", "300")),
+)
+
+# submit_many marks a request that went out without a usable response with
+# this prefix (submit_resume raises TimeoutError); it may have been accepted.
+NO_RESPONSE = "no response"
+
+# Batch mode: concurrent Wave API requests per submit_many call.
+SUBMIT_CONCURRENCY: int = int(os.environ.get("SUBMIT_CONCURRENCY", "8"))
+_RESERVE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="reserve")
 
 
 def record_submission(
     submission_id: str,
     status_code: int,
     response_body: str,
+    writer: BatchWriter | None = None,
+    digest: str = "",
+    confirmed: bool = True,
 ) -> dict[str, Any]:
     """Write a submission record to DynamoDB.
 
+    The record replaces the idempotency reservation for (submission_id,
+    digest). Transport failures (status 0) and 5xx responses are stored as
+    failed so the next delivery can retry, except requests that got no
+    response (confirmed=False): those may have been accepted, so they are
+    stored as unconfirmed and never re-posted. With a writer the record is
+    buffered for a BatchWriteItem call.
+
     >>> record = record_submission("test-123", 200, '{"ok": true}')
     >>> record["submission_id"]
     'test-123'
@@ -34,16 +66,32 @@ def record_submission(
     >>> "timestamp" in record
     True
     """
-    item: dict[str, Any] = {
+    fields: dict[str, Any] = {
         "submission_id": submission_id,
         "status_code": status_code,
         "response_body": response_body,
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
-    table.put_item(Item=item)
+    ok = 0 < status_code < 500
+    item = IDEMPOTENCY.record(submission_id, digest, fields, ok=ok, confirmed=confirmed)
+    if writer is not None:
+        writer.put(item)
+    else:
+        with stage(DYNAMODB_WRITE):
+            get_table(TABLE_NAME).put_item(Item=item)
     return item
 
 
+def prewarm() -> None:
+    """Build the DynamoDB table handle ahead of the first request."""
+    get_table(TABLE_NAME)
+
+
+if prewarm_requested():
+    prewarm()
+
+
+@instrumented("submission")
 def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """Submit resume to Wave API and record result in DynamoDB.
 
@@ -54,6 +102,13 @@ def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
             "submission_id": "unique-id"
         }
     """
+    if is_prewarm_event(event):
+        prewarm()
+        return prewarm_response()
+
+    if "Records" in event or "submissions" in event:
+        return batch_handler(event)
+
     token: str = event.get("token", "")
     submission_id: str = event.get("submission_id", "unknown")
 
@@ -67,15 +122,37 @@ def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
 
     payload_json: str = json.dumps(payload) if isinstance(payload, dict) else str(payload)
 
+    digest = payload_digest(payload_json)
+    with stage(DYNAMODB_WRITE):
+        existing = IDEMPOTENCY.reserve(submission_id, digest)
+    if existing is not None:
+        return _duplicate_response(submission_id, existing)
+
     try:
-        status_code, response_body = submit_resume(payload_json, token)
+        with stage(WAVE_API):
+            status_code, response_body = submit_resume(payload_json, token)
     except ValueError as exc:
+        # Rejected before sending (bad token or payload): nothing to guard.
+        IDEMPOTENCY.release(submission_id, digest)
         return {
             "statusCode": 422,
             "body": json.dumps({"error": str(exc)}),
         }
+    except (ConnectionError, TimeoutError) as exc:
+        # ConnectionError: never sent, so the next delivery may retry.
+        # TimeoutError: sent without an answer; it must not be posted again.
+        timed_out = isinstance(exc, TimeoutError)
+        record_submission(submission_id, 0, str(exc), digest=digest, confirmed=not timed_out)
+        return {
+            "statusCode": 504 if timed_out else 502,
+            "body": json.dumps({"submission_id": submission_id, "error": str(exc)}),
+        }
+    except Exception as exc:
+        # Don't leave the claim in progress (blocking retries) after a crash.
+        record_submission(submission_id, 0, f"{type(exc).__name__}: {exc}", digest=digest)
+        raise
 
-    record = record_submission(submission_id, status_code, response_body)
+    record = record_submission(submission_id, status_code, response_body, digest=digest)
 
     return {
         "statusCode": status_code,
@@ -85,3 +162,165 @@ def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
             "timestamp": record["timestamp"],
         }),
     }
+
+
+def _duplicate_response(submission_id: str, existing: dict[str, Any]) -> dict[str, Any]:
+    """Replay a completed submission, or report one still in flight."""
+    if existing.get("status") == UNCONFIRMED:
+        return {
+            "statusCode": 409,
+            "body": json.dumps({
+                "submission_id": submission_id,
+                "error": "an earlier attempt got no response; not posting it again",
+            }),
+        }
+    if existing.get("status") != COMPLETED:
+        return {
+            "statusCode": 409,
+            "body": json.dumps({
+                "submission_id": submission_id,
+                "error": "submission already in progress",
+            }),
+        }
+    status_code = int(existing["status_code"])
+    return {
+        "statusCode": status_code,
+        "body": json.dumps({
+            "submission_id": submission_id,
+            "api_status": status_code,
+            "timestamp": existing.get("timestamp"),
+            "duplicate": True,
+        }),
+    }
+
+
+def _batch_submissions(event: dict[str, Any]) -> list[tuple[str, Any]]:
+    """Normalize a batch event into [(item_id, submission_or_error)].
+
+    Supported shapes:
+      * {"submissions": [{"submission_id", "payload", "token"?}, ...], "token": ...}
+      * SQS: {"Records": [{"messageId", "body": "<json submission>"}]}
+    A submission without its own token uses the event-level one.
+    """
+    default_token = event.get("token", "")
+    if "Records" in event:
+        raw = []
+        for record in event["Records"]:
+            try:
+                raw.append((record["messageId"], json.loads(record["body"])))
+            except (KeyError, TypeError, ValueError) as exc:
+                raw.append((record.get("messageId", "?"), f"unreadable record: {exc}"))
+    else:
+        raw = [(str(i), sub) for i, sub in enumerate(event["submissions"])]
+
+    items: list[tuple[str, Any]] = []
+    for item_id, sub in raw:
+        if isinstance(sub, str):
+            items.append((item_id, sub))
+        elif not isinstance(sub, dict) or sub.get("payload") is None:
+            items.append((item_id, "missing payload"))
+        else:
+            payload = sub["payload"]
+            items.append((item_id, {
+                "submission_id": str(sub.get("submission_id", item_id)),
+                "payload_json": json.dumps(payload) if isinstance(payload, dict) else str(payload),
+                "token": sub.get("token", default_token),
+            }))
+    return items
+
+
+def batch_handler(event: dict[str, Any]) -> dict[str, Any]:
+    """Submit many queued payloads in one invocation.
+
+    Duplicates (within the batch or already recorded) are answered without
+    posting. The rest are reserved concurrently, posted with submit_many
+    (SUBMIT_CONCURRENCY in flight per token), and recorded through one
+    BatchWriter. SQS input returns a partial-batch response so only
+    transport failures that never reached the API are redelivered.
+    """
+    start = time.monotonic_ns()
+    failures: dict[str, str] = {}
+    pending: list[tuple[str, dict[str, Any]]] = []
+    for item_id, sub in _batch_submissions(event):
+        if isinstance(sub, str):
+            failures[item_id] = sub
+        elif not sub["token"]:
+            failures[item_id] = "token must not be empty"
+        else:
+            sub["digest"] = payload_digest(sub["payload_json"])
+            pending.append((item_id, sub))
+
+    # One reservation (and at most one POST) per unique submission.
+    unique: dict[tuple[str, str], dict[str, Any]] = {}
+    for _, sub in pending:
+        unique.setdefault((sub["submission_id"], sub["digest"]), sub)
+    with stage(DYNAMODB_WRITE):
+        reservations = dict(zip(
+            unique,
+            _RESERVE_EXECUTOR.map(lambda key: IDEMPOTENCY.reserve(*key), unique),
+        ))
+
+    by_token: dict[str, list[tuple[str, str]]] = {}
+    for key, sub in unique.items():
+        if reservations[key] is None:
+            by_token.setdefault(sub["token"], []).append(key)
+
+    outcomes: dict[tuple[str, str], tuple[int, str]] = {}
+    with BatchWriter(TABLE_NAME) as writer:
+        for token, keys in by_token.items():
+            with stage(WAVE_API):
+                responses = submit_many(
+                    [unique[key]["payload_json"] for key in keys], token, SUBMIT_CONCURRENCY
+                )
+            for key, (status_code, response_body) in zip(keys, responses):
+                outcomes[key] = (status_code, response_body)
+                if status_code == 0 and response_body.startswith("invalid JSON payload"):
+                    IDEMPOTENCY.release(*key)
+                else:
+                    confirmed = not (status_code == 0 and response_body.startswith(NO_RESPONSE))
+                    record_submission(key[0], status_code, response_body, writer,
+                                      digest=key[1], confirmed=confirmed)
+
+    results: list[dict[str, Any]] = []
+    retry: list[str] = []
+    for item_id, sub in pending:
+        key = (sub["submission_id"], sub["digest"])
+        existing = reservations[key]
+        if existing is not None:
+            if existing.get("status") == UNCONFIRMED:
+                failures[item_id] = "an earlier attempt got no response"
+                continue
+            if existing.get("status") != COMPLETED:
+                failures[item_id] = "submission already in progress"
+                retry.append(item_id)
+                continue
+            status_code, duplicate = int(existing["status_code"]), True
+        else:
+            status_code, response_body = outcomes[key]
+            duplicate = unique[key] is not sub
+            if status_code == 0:
+                failures[item_id] = response_body
+                if not response_body.startswith(("invalid JSON payload", NO_RESPONSE)):
+                    retry.append(item_id)
+                continue
+            if status_code >= 500:
+                retry.append(item_id)
+        results.append({
+            "id": item_id,
+            "submission_id": sub["submission_id"],
+            "api_status": status_code,
+            "duplicate": duplicate,
+        })
+
+    if "Records" in event:
+        return {"batchItemFailures": [{"itemIdentifier": i} for i in retry]}
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps({
+            "results": results,
+            "failures": failures,
+            "count": len(results),
+            "latency_ms": (time.monotonic_ns() - start) // 1_000_000,
+        }),
+    }
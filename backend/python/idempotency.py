@@ -0,0 +1,138 @@
+"""Idempotency reservations for side-effecting handlers.
+
+Before doing non-repeatable work (posting a submission to the Wave API), a
+handler claims ``(request id, payload digest)`` with a conditional
+PutItem. The first caller wins; a retried EventBridge schedule or Lambda
+retry finds the existing record instead and returns its stored response
+without any network I/O to the API.
+
+Record states:
+
+* ``in_progress`` — claimed; another invocation is doing the work.
+  Claims older than ``in_progress_s`` are assumed crashed and can be taken
+  over.
+* ``completed`` — work done; the record carries the response to replay.
+* ``failed`` — work attempted but not successful (e.g. 5xx after retries);
+  the next delivery may try again.
+* ``unconfirmed`` — the request went out but no answer came back (timed
+  out), so it may have taken effect. It is not taken over like a failure;
+  deliveries are refused until someone reconciles it or it expires.
+
+Completed records are also kept in an in-process LRU, so duplicates hitting
+a warm container skip DynamoDB entirely.
+"""
+import hashlib
+import json
+import time
+from typing import Any
+
+from result_cache import ResultCache
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+FAILED = "failed"
+UNCONFIRMED = "unconfirmed"
+
+
+def payload_digest(payload: Any) -> str:
+    """SHA-256 of the payload's canonical JSON (key order doesn't matter)."""
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            pass
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """Conditional-write reservations in a PK/SK table with an ExpiresAt TTL."""
+
+    def __init__(
+        self,
+        table: Any,
+        *,
+        prefix: str = "SUBMISSION",
+        ttl_s: int = 86400 * 7,
+        in_progress_s: int = 300,
+        cache_size: int = 1024,
+    ) -> None:
+        self.table = table
+        self.prefix = prefix
+        self.ttl_s = ttl_s
+        self.in_progress_s = in_progress_s
+        self._completed = ResultCache(max_entries=cache_size, ttl_s=ttl_s)
+
+    def key(self, request_id: str, digest: str) -> dict[str, str]:
+        return {"PK": f"{self.prefix}#{request_id}", "SK": f"PAYLOAD#{digest}"}
+
+    def stats(self) -> dict[str, int]:
+        """In-process cache counters."""
+        return self._completed.stats()
+
+    def reserve(self, request_id: str, digest: str) -> dict[str, Any] | None:
+        """Claim the key.
+
+        Returns None if the caller now owns the work, otherwise the existing
+        record (completed, or in progress elsewhere).
+        """
+        cached = self._completed.get(f"{request_id}#{digest}")
+        if cached is not None:
+            return cached
+
+        from botocore.exceptions import ClientError
+
+        now = int(time.time())
+        try:
+            self.table.put_item(
+                Item={
+                    **self.key(request_id, digest),
+                    "status": IN_PROGRESS,
+                    "reserved_at": now,
+                    "ExpiresAt": now + self.ttl_s,
+                },
+                ConditionExpression=(
+                    "attribute_not_exists(PK) OR #status = :failed OR "
+                    "(#status = :in_progress AND reserved_at < :stale)"
+                ),
+                ExpressionAttributeNames={"#status": "status"},
+                ExpressionAttributeValues={
+                    ":failed": FAILED,
+                    ":in_progress": IN_PROGRESS,
+                    ":stale": now - self.in_progress_s,
+                },
+            )
+            return None
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+
+        existing = self.table.get_item(
+            Key=self.key(request_id, digest), ConsistentRead=True
+        ).get("Item") or {"status": IN_PROGRESS}
+        if existing.get("status") == COMPLETED:
+            self._completed.put(f"{request_id}#{digest}", existing)
+        return existing
+
+    def record(
+        self, request_id: str, digest: str, fields: dict[str, Any], ok: bool, confirmed: bool = True
+    ) -> dict[str, Any]:
+        """Build the final record for a claimed key.
+
+        Completed if ok, else failed, or unconfirmed when the outcome isn't
+        known (confirmed=False).
+        """
+        now = int(time.time())
+        item = {
+            **self.key(request_id, digest),
+            **fields,
+            "status": COMPLETED if ok else FAILED if confirmed else UNCONFIRMED,
+            "ExpiresAt": now + self.ttl_s,
+        }
+        if ok:
+            self._completed.put(f"{request_id}#{digest}", item)
+        return item
+
+    def release(self, request_id: str, digest: str) -> None:
+        """Drop a claim whose work never happened (e.g. rejected input)."""
+        self.table.delete_item(Key=self.key(request_id, digest))
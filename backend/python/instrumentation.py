@@ -0,0 +1,206 @@
+"""Per-stage latency metrics in CloudWatch Embedded Metric Format (EMF).
+
+Each handler invocation collects how long it spent in each stage (Rust FFI,
+JSON parsing, intent matching, Bedrock calls, DynamoDB writes, EventBridge
+publishing) and prints one EMF JSON line when it finishes. CloudWatch Logs
+turns that line into metrics, so there is no PutMetricData call and no
+extra latency on the request path.
+
+    @instrumented("bedrock")
+    def handler(event, context):
+        with stage(BEDROCK_SENTIMENT):
+            ...
+
+    @stage(DYNAMODB_WRITE)
+    def persist_result(...):
+        ...
+
+Stage timers are cheap (two perf_counter_ns calls and a dict update) and
+are no-ops outside an instrumented invocation, so library code can be timed
+unconditionally. A stage entered several times is summed.
+
+The current invocation is context-local, so handlers running concurrently
+on one process's threads (the gateway) each get their own record. Work
+handed to a thread pool records into the caller's invocation when it is
+wrapped with bind():
+
+    _EXECUTOR.submit(bind(analyze_sentiment), text, language)
+
+Every line is tagged ColdStart=true|false (first invocation in this
+process or not) so cold-start latency can be split out of the p99.
+
+Set WAVE_METRICS=0 to disable output; WAVE_METRICS_NAMESPACE picks the
+CloudWatch namespace (default "Wave").
+
+Instrumented handlers can also be profiled on demand (WAVE_PROFILE or a
+"wave_profile" event key); see profiling.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+import profiling
+
+# Stage names. Metric names are "<stage>_ms".
+RUST_FFI = "rust_ffi"
+JSON_PARSE = "json_parse"
+INTENT_MATCH = "intent_match"
+BEDROCK_SENTIMENT = "bedrock_sentiment"
+BEDROCK_EMBEDDING = "bedrock_embedding"
+DYNAMODB_WRITE = "dynamodb_write"
+EVENTBRIDGE_PUBLISH = "eventbridge_publish"
+WAVE_API = "wave_api"
+LANGUAGE_DETECT = "language_detect"
+
+NAMESPACE: str = os.environ.get("WAVE_METRICS_NAMESPACE", "Wave")
+ENABLED: bool = os.environ.get("WAVE_METRICS", "1") != "0"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# The first invocation in the process is the cold one, whichever thread
+# gets there first.
+_cold_start = True
+_cold_start_lock = threading.Lock()
+_current: contextvars.ContextVar["Invocation | None"] = contextvars.ContextVar(
+    "wave_invocation", default=None
+)
+
+
+class Invocation:
+    """Stage timings for one handler invocation."""
+
+    def __init__(self, handler: str, cold_start: bool) -> None:
+        self.handler = handler
+        self.cold_start = cold_start
+        self.stages_ms: dict[str, float] = {}
+        self.properties: dict[str, Any] = {}
+        self.total_ms = 0.0
+        self._start = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.stages_ms[name] = self.stages_ms.get(name, 0.0) + elapsed_ms
+
+    def finish(self) -> None:
+        self.total_ms = (time.perf_counter_ns() - self._start) / 1e6
+
+    def to_emf(self) -> dict[str, Any]:
+        """The EMF document for this invocation."""
+        metrics = {f"{name}_ms": round(ms, 3) for name, ms in self.stages_ms.items()}
+        metrics["total_ms"] = round(self.total_ms, 3)
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": NAMESPACE,
+                    "Dimensions": [["Handler"], ["Handler", "ColdStart"]],
+                    "Metrics": [{"Name": name, "Unit": "Milliseconds"} for name in metrics],
+                }],
+            },
+            "Handler": self.handler,
+            "ColdStart": "true" if self.cold_start else "false",
+            **self.properties,
+            **metrics,
+        }
+
+
+class stage(contextlib.ContextDecorator):
+    """Time a block (``with stage(name):``) or every call (``@stage(name)``)."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._start = 0
+        self._tracked = False
+
+    def _recreate_cm(self) -> "stage":
+        # A fresh timer per decorated call, so concurrent calls don't share state.
+        return stage(self.name)
+
+    def __enter__(self) -> "stage":
+        if profiling.TRACKING:
+            profiling.enter_stage(self.name)
+            self._tracked = True
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._tracked:
+            profiling.exit_stage()
+            self._tracked = False
+        invocation = _current.get()
+        if invocation is not None:
+            invocation.add(self.name, (time.perf_counter_ns() - self._start) / 1e6)
+
+
+def current() -> "Invocation | None":
+    """The invocation being recorded, if any."""
+    return _current.get()
+
+
+def set_property(name: str, value: Any) -> None:
+    """Attach a searchable (non-metric) field to the current EMF line."""
+    record = _current.get()
+    if record is not None:
+        record.properties[name] = value
+
+
+def bind(fn: F) -> F:
+    """Wrap fn so that, on any thread, it records into the caller's invocation."""
+    record = _current.get()
+
+    @functools.wraps(fn)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        token = _current.set(record)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run  # type: ignore[return-value]
+
+
+@contextlib.contextmanager
+def invocation(handler: str) -> Any:
+    """Record one invocation and emit its EMF line on exit (even on error)."""
+    global _cold_start
+    with _cold_start_lock:
+        cold_start, _cold_start = _cold_start, False
+    record = Invocation(handler, cold_start)
+    token = _current.set(record)
+    try:
+        yield record
+    finally:
+        _current.reset(token)
+        record.finish()
+        if ENABLED:
+            emit(record)
+
+
+def instrumented(handler: str) -> Callable[[F], F]:
+    """Decorate a Lambda handler so each call is one recorded invocation."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(event: Any, context: Any) -> Any:
+            request_id = getattr(context, "aws_request_id", None)
+            with invocation(handler) as record, \
+                    profiling.session(handler, profiling.requested(event), request_id):
+                if request_id:
+                    record.properties["RequestId"] = request_id
+                return fn(event, context)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def emit(record: Invocation) -> None:
+    """Write the EMF line to stdout, where Lambda ships it to CloudWatch Logs."""
+    sys.stdout.write(json.dumps(record.to_emf(), separators=(",", ":")) + "\n")
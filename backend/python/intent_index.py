@@ -0,0 +1,174 @@
+"""Precompiled keyword index for intent classification.
+
+Built once from an intent -> trigger-words table and reused for every
+request. Single-word triggers live in a flat token -> intents map;
+multi-word triggers ("how much") live in a token-level trie so a single
+left-to-right pass over the input finds every phrase that starts at each
+position. Cost per request is O(tokens x longest phrase), independent of
+how many intents or triggers the table holds.
+
+>>> index = IntentIndex({"check_balance": ["balance", "how much"], "help": ["help"]})
+>>> index.scores(["How", "much", "is", "my", "balance"])
+{'check_balance': 2}
+>>> index.match(["help", "me"], default=0.85, low=0.4)
+('help', 0.85)
+
+The module also holds the deployed intent table (INTENT_KEYWORDS, from
+INTENT_KEYWORDS_PATH or the built-in default) and match_intent() over it.
+Importing it only reads that table, so any handler can score intents
+without pulling in voice_handler's classifier and event publisher.
+"""
+import json
+import os
+from typing import Iterable, Mapping
+
+
+def normalize_token(token: str) -> str:
+    """Normalize a token the same way for the index and the input."""
+    return token.lower()
+
+
+class _TrieNode:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self) -> None:
+        self.children: dict[str, "_TrieNode"] = {}
+        # (intent_id, keyword_id) pairs completed at this node.
+        self.terminal: list[tuple[int, int]] = []
+
+
+class IntentIndex:
+    """Inverted token/phrase index over an intent keyword table.
+
+    Scoring matches the original linear scan: an intent scores one point per
+    distinct trigger found in the input, and ties go to the intent listed
+    first in the table.
+    """
+
+    __slots__ = ("intents", "_single", "_phrases")
+
+    def __init__(self, keywords: Mapping[str, Iterable[str]]) -> None:
+        self.intents: list[str] = list(keywords)
+        self._single: dict[str, list[tuple[int, int]]] = {}
+        self._phrases: dict[str, _TrieNode] = {}
+
+        keyword_id = 0
+        for intent_id, intent in enumerate(self.intents):
+            seen: set[tuple[str, ...]] = set()
+            for keyword in keywords[intent]:
+                parts = tuple(normalize_token(p) for p in keyword.split())
+                if not parts or parts in seen:
+                    continue
+                seen.add(parts)
+                entry = (intent_id, keyword_id)
+                keyword_id += 1
+
+                if len(parts) == 1:
+                    self._single.setdefault(parts[0], []).append(entry)
+                    continue
+
+                node = self._phrases.setdefault(parts[0], _TrieNode())
+                for part in parts[1:]:
+                    node = node.children.setdefault(part, _TrieNode())
+                node.terminal.append(entry)
+
+    def scores(self, tokens: Iterable[str]) -> dict[str, int]:
+        """Return {intent: distinct trigger hits} for every intent that scored."""
+        lower = [normalize_token(t) for t in tokens]
+        hits: set[tuple[int, int]] = set()
+
+        for pos, token in enumerate(lower):
+            single = self._single.get(token)
+            if single:
+                hits.update(single)
+
+            node = self._phrases.get(token)
+            end = pos + 1
+            while node is not None and end < len(lower):
+                node = node.children.get(lower[end])
+                end += 1
+                if node is not None and node.terminal:
+                    hits.update(node.terminal)
+
+        counts: dict[int, int] = {}
+        for intent_id, _ in hits:
+            counts[intent_id] = counts.get(intent_id, 0) + 1
+        return {self.intents[i]: counts[i] for i in sorted(counts)}
+
+    def best(self, tokens: Iterable[str]) -> tuple[str, int]:
+        """Return (intent, hits) for the top-scoring intent, or ("unknown", 0)."""
+        best_intent = "unknown"
+        best_score = 0
+        # scores() is ordered by table position, so strict ">" keeps the
+        # first-listed intent on ties.
+        for intent, score in self.scores(tokens).items():
+            if score > best_score:
+                best_score = score
+                best_intent = intent
+        return best_intent, best_score
+
+    def match(self, tokens: Iterable[str], default: float, low: float) -> tuple[str, float]:
+        """Return (intent, confidence) using the voice handler's confidence curve."""
+        intent, score = self.best(tokens)
+        if score == 0:
+            return "unknown", low
+        return intent, min(default + (score - 1) * 0.05, 0.99)
+
+
+# Intent keyword map. Keys are intents, values are trigger words.
+# Intentionally flat — this is a demo, not a production NLU pipeline.
+DEFAULT_INTENT_KEYWORDS: dict[str, list[str]] = {
+    "check_balance": ["balance", "salio", "angalia", "check", "how much"],
+    "send_money": ["send", "tuma", "kutuma", "transfer", "pesa"],
+    "account_info": ["account", "akaunti", "info", "details", "profile"],
+    "help": ["help", "msaada", "support", "assist"],
+    "greeting": ["hello", "hi", "habari", "jambo", "hey", "mambo"],
+}
+
+DEFAULT_CONFIDENCE: float = 0.85
+LOW_CONFIDENCE: float = 0.4
+
+
+def load_intent_keywords(path: str | None = None) -> dict[str, list[str]]:
+    """Load the intent table from a JSON file, or fall back to the built-in one.
+
+    The file holds the same shape as DEFAULT_INTENT_KEYWORDS:
+    {"intent": ["trigger", "multi word trigger", ...], ...}. Key order is
+    priority order for ties.
+    """
+    path = path or os.environ.get("INTENT_KEYWORDS_PATH")
+    if not path:
+        return {intent: list(kws) for intent, kws in DEFAULT_INTENT_KEYWORDS.items()}
+
+    with open(path, encoding="utf-8") as f:
+        table = json.load(f)
+    if not isinstance(table, dict) or not all(
+        isinstance(kws, list) and all(isinstance(k, str) for k in kws)
+        for kws in table.values()
+    ):
+        raise ValueError(f"{path}: expected an object of intent -> list of trigger strings")
+    return table
+
+
+INTENT_KEYWORDS: dict[str, list[str]] = load_intent_keywords()
+
+# Compiled once per process; rebuild with rebuild_index() after editing
+# INTENT_KEYWORDS at runtime.
+_INTENT_INDEX = IntentIndex(INTENT_KEYWORDS)
+
+
+def rebuild_index() -> None:
+    """Recompile the index from INTENT_KEYWORDS."""
+    global _INTENT_INDEX
+    _INTENT_INDEX = IntentIndex(INTENT_KEYWORDS)
+
+
+def match_intent(tokens: list[str]) -> tuple[str, float]:
+    """Match already-tokenized input against known intents. Returns (intent, confidence).
+
+    Same scoring as the fused Rust classifier, for callers that hold tokens.
+
+    >>> match_intent(["How", "much", "do", "I", "have"])
+    ('check_balance', 0.85)
+    """
+    return _INTENT_INDEX.match(tokens, DEFAULT_CONFIDENCE, LOW_CONFIDENCE)
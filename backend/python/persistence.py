@@ -0,0 +1,169 @@
+"""Shared DynamoDB persistence layer.
+
+* ``get_table`` caches Table handles per (table, region) so handlers stop
+  re-resolving them on every write. boto3 is only imported on first use
+  (see aws_clients); ``LazyTable`` defers even that for module-level handles.
+* ``BatchWriter`` buffers puts into ``BatchWriteItem`` calls of up to 25
+  items, retries ``UnprocessedItems`` with backoff, and can flush on a
+  background thread while the caller keeps working.
+
+Batch and backfill paths use ``BatchWriter``; single-item paths keep
+using ``put_item`` on the cached table.
+"""
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Sequence
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+import aws_clients
+
+# DynamoDB's BatchWriteItem limit.
+MAX_BATCH_WRITE_ITEMS: int = 25
+
+
+def get_resource(region: str | None = None) -> Any:
+    """Process-wide DynamoDB service resource (one connection pool per region)."""
+    return aws_clients.get_resource("dynamodb", region)
+
+
+@functools.lru_cache(maxsize=None)
+def get_table(table_name: str, region: str | None = None) -> Any:
+    """Cached Table handle."""
+    return get_resource(region).Table(table_name)
+
+
+class LazyTable:
+    """Stand-in for a Table handle that is resolved on first attribute access."""
+
+    def __init__(self, table_name: str, region: str | None = None) -> None:
+        self._table_name = table_name
+        self._region = region
+
+    def resolve(self) -> Any:
+        return get_table(self._table_name, self._region)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+
+class BatchWriter:
+    """Buffered BatchWriteItem writer for one table.
+
+    Items sharing a primary key within one buffer are collapsed (last write
+    wins), since BatchWriteItem rejects duplicate keys in a request.
+    Items still unprocessed after ``max_retries`` end up in ``failed_items``.
+
+    With ``background=True`` full batches are sent on a worker thread;
+    ``flush()`` sends the remainder, waits for everything in flight and
+    stops the worker (the next batch starts a new one).
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        *,
+        region: str | None = None,
+        resource: Any = None,
+        key_attrs: Sequence[str] = ("PK", "SK"),
+        max_retries: int = 5,
+        backoff_s: float = 0.05,
+        background: bool = False,
+    ) -> None:
+        self.table_name = table_name
+        self.resource = resource if resource is not None else get_resource(region)
+        self.key_attrs = tuple(key_attrs)
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+
+        self.background = background
+
+        self.failed_items: list[dict[str, Any]] = []
+        self._buffer: dict[tuple[Any, ...], dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Started with the first background batch and shut down by flush(),
+        # so writers created per invocation don't leave idle threads behind.
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: list[Future[None]] = []
+        self._counters = {"written": 0, "retried": 0, "failed": 0, "calls": 0}
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.flush()
+
+    def stats(self) -> dict[str, int]:
+        """Return a snapshot of the write counters."""
+        with self._lock:
+            return {**self._counters, "buffered": len(self._buffer)}
+
+    def put(self, item: dict[str, Any]) -> None:
+        """Buffer one item, sending a batch once 25 are buffered."""
+        key = tuple(item.get(attr) for attr in self.key_attrs)
+        with self._lock:
+            self._buffer[key] = item
+            if len(self._buffer) < MAX_BATCH_WRITE_ITEMS:
+                return
+            batch = list(self._buffer.values())
+            self._buffer.clear()
+        self._dispatch(batch)
+
+    def flush(self) -> None:
+        """Send everything buffered and wait for in-flight batches."""
+        with self._lock:
+            batch = list(self._buffer.values())
+            self._buffer.clear()
+        if batch:
+            self._dispatch(batch)
+
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _dispatch(self, batch: list[dict[str, Any]]) -> None:
+        if not self.background:
+            self._write(batch)
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ddb-writer")
+            self._pending.append(self._executor.submit(self._write, batch))
+
+    def _write(self, items: list[dict[str, Any]]) -> None:
+        requests = [{"PutRequest": {"Item": item}} for item in items]
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retried", len(requests))
+                time.sleep(self.backoff_s * (2 ** (attempt - 1)))
+            try:
+                self._count("calls", 1)
+                response = self.resource.batch_write_item(
+                    RequestItems={self.table_name: requests}
+                )
+            except ClientError as exc:
+                code = exc.response.get("Error", {}).get("Code", "")
+                if code != "ProvisionedThroughputExceededException":
+                    break
+                continue
+            except BotoCoreError:
+                continue
+
+            unprocessed = response.get("UnprocessedItems", {}).get(self.table_name, [])
+            self._count("written", len(requests) - len(unprocessed))
+            requests = unprocessed
+            if not requests:
+                return
+
+        with self._lock:
+            self._counters["failed"] += len(requests)
+            self.failed_items.extend(r["PutRequest"]["Item"] for r in requests)
+
+    def _count(self, key: str, n: int) -> None:
+        with self._lock:
+            self._counters[key] += n
@@ -0,0 +1,15 @@
+"""Start method for the process pools (gateway, sagemaker_handler).
+
+ProcessPoolExecutor starts workers on demand, while other threads may be
+holding locks (logging, boto3, the fakes in benchmarks); a plain fork copies
+those locks held and the worker can hang on its first import. Workers are
+started from a clean forkserver process instead, where the platform has one.
+"""
+import multiprocessing
+from typing import Any
+
+
+def worker_context() -> Any:
+    """The multiprocessing context to pass as a pool's ``mp_context``."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
@@ -0,0 +1,314 @@
+"""On-demand profiling of single handler invocations.
+
+Off by default. Switch it on for every invocation with an environment
+variable, or for one invocation with a top-level event key (only direct
+invokers can set one; API Gateway and SQS events don't carry client keys
+at the top level):
+
+    WAVE_PROFILE=sample|cprofile           every invocation in this container
+    {"wave_profile": "sample", ...}        just this event ("true" = sample)
+
+Modes:
+
+  sample    a background thread snapshots every thread's stack each
+            WAVE_PROFILE_INTERVAL_MS (default 2). Output is collapsed
+            stacks ("frame;frame;frame count" lines) that flamegraph.pl,
+            speedscope or inferno read directly. Overhead is roughly one
+            sys._current_frames() call per interval.
+  cprofile  deterministic cProfile of the invoking thread; exact call
+            counts, but noticeably slower. Writes a .prof file for
+            snakeviz/pstats when an output directory is set.
+
+Both report wall time split into categories:
+
+  rust_ffi  inside wave_backend calls
+  json      the json module and its C accelerator
+  boto3_io  boto3, botocore, urllib3, ssl and socket
+  wait      threads blocked on locks, queues and futures
+  python    everything else
+
+Native frames are invisible to a sampler, so the sampler attributes time
+with the instrumentation stages: a sample whose innermost Python frame is
+the one that opened a RUST_FFI (or INTENT_MATCH, LANGUAGE_DETECT,
+WAVE_API) stage is inside Rust. Such samples get a "[rust_ffi]" leaf
+frame so the flamegraph shows where the FFI calls are.
+
+Reports go to stdout as one JSON line ({"profile": handler, ...}), or, with
+WAVE_PROFILE_OUTPUT=<directory>, to <handler>-<time>-<request id>.collapsed
+(or .prof) files there, with only the summary logged.
+
+When off, the cost per invocation is a dict lookup on the event and a
+module-level flag check in each stage timer.
+"""
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Iterator
+
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+MODES = (SAMPLE, CPROFILE)
+
+EVENT_KEY = "wave_profile"
+
+RUST_FFI = "rust_ffi"
+JSON = "json"
+BOTO3_IO = "boto3_io"
+WAIT = "wait"
+PYTHON = "python"
+CATEGORIES = (RUST_FFI, JSON, BOTO3_IO, WAIT, PYTHON)
+
+
+def _mode(value: Any) -> str | None:
+    if value is True or value in ("1", "true", "on"):
+        return SAMPLE
+    return value if value in MODES else None
+
+
+MODE: str | None = _mode(os.environ.get("WAVE_PROFILE", "").lower())
+INTERVAL_S: float = float(os.environ.get("WAVE_PROFILE_INTERVAL_MS", "2")) / 1000
+OUTPUT: str = os.environ.get("WAVE_PROFILE_OUTPUT", "log")
+# Collapsed stacks kept in a log line, most frequent first; files get all.
+MAX_LOGGED_STACKS: int = int(os.environ.get("WAVE_PROFILE_MAX_STACKS", "200"))
+
+# Stage -> category for samples that are sitting in native code called
+# straight from the frame that opened the stage.
+STAGE_CATEGORIES: dict[str, str] = {
+    "rust_ffi": RUST_FFI,
+    "intent_match": RUST_FFI,
+    "language_detect": RUST_FFI,
+    "wave_api": RUST_FFI,
+    "json_parse": JSON,
+    "bedrock_sentiment": BOTO3_IO,
+    "bedrock_embedding": BOTO3_IO,
+    "dynamodb_write": BOTO3_IO,
+    "eventbridge_publish": BOTO3_IO,
+}
+_IO_PATHS = ("botocore", "boto3", "urllib3", "s3transfer", "/ssl.py", "/socket.py", "/http/")
+_WAIT_PATHS = ("/threading.py", "/queue.py", "/concurrent/futures/", "/selectors.py")
+
+# True while a session is running; instrumentation.stage checks it before
+# doing any tracking work.
+TRACKING = False
+# thread id -> open stages as (stage name, frame that opened it)
+_stages: dict[int, list[tuple[str, Any]]] = {}
+_session_lock = threading.Lock()
+
+
+def requested(event: Any) -> str | None:
+    """The profiling mode for this invocation, or None."""
+    if isinstance(event, dict) and EVENT_KEY in event:
+        return _mode(event[EVENT_KEY]) or MODE
+    return MODE
+
+
+def enter_stage(name: str) -> None:
+    """Called by instrumentation.stage on entry while a session runs."""
+    # Frames: 0 here, 1 stage.__enter__, 2 the code that opened the stage.
+    _stages.setdefault(threading.get_ident(), []).append((name, sys._getframe(2)))
+
+
+def exit_stage() -> None:
+    stack = _stages.get(threading.get_ident())
+    if stack:
+        stack.pop()
+
+
+def _label(frame: Any) -> str:
+    code = frame.f_code
+    module = os.path.basename(code.co_filename).removesuffix(".py")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def categorize(frame: Any, stages: list[tuple[str, Any]] | None = None) -> str:
+    """Category for a sample whose innermost Python frame is frame."""
+    filename = frame.f_code.co_filename
+    if any(p in filename for p in _WAIT_PATHS):
+        return WAIT
+    f = frame
+    while f is not None:
+        name = f.f_code.co_filename
+        if any(p in name for p in _IO_PATHS):
+            return BOTO3_IO
+        if "/json/" in name:
+            return JSON
+        f = f.f_back
+    try:
+        # Another thread's list; it may shrink while we look.
+        name, opened_by = stages[-1] if stages else ("", None)
+    except IndexError:
+        return PYTHON
+    if opened_by is frame:
+        return STAGE_CATEGORIES.get(name, PYTHON)
+    return PYTHON
+
+
+class Sampler:
+    """Background thread collecting collapsed stacks of every other thread."""
+
+    def __init__(self, interval_s: float = INTERVAL_S) -> None:
+        self.interval_s = interval_s
+        self.stacks: Counter[str] = Counter()
+        self.categories: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="wave-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval_s):
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self.sample(frame, names.get(ident) or str(ident), _stages.get(ident))
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+
+    def sample(self, frame: Any, thread: str, stages: list[tuple[str, Any]] | None = None) -> None:
+        category = categorize(frame, stages)
+        # Idle pool workers would swamp the profile; only count them when busy.
+        if category == WAIT and thread != "MainThread" and not stages:
+            return
+        labels = []
+        f = frame
+        while f is not None:
+            labels.append(_label(f))
+            f = f.f_back
+        labels.append(thread)
+        labels.reverse()
+        if category == RUST_FFI:
+            labels.append(f"[{RUST_FFI}]")
+        self.samples += 1
+        self.stacks[";".join(labels)] += 1
+        self.categories[category] += 1
+
+    def collapsed(self, limit: int | None = None) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common(limit))
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval_s * 1000,
+            "categories_ms": {
+                c: round(self.categories[c] * self.interval_s * 1000, 1)
+                for c in CATEGORIES if self.categories[c]
+            },
+        }
+
+
+def _ffi_markers() -> tuple[str, ...]:
+    """Substrings identifying wave_backend functions in cProfile entries."""
+    try:
+        import wave_backend
+    except ImportError:
+        return ("wave_backend.",)
+    classes = [f"'{n}'" for n, v in vars(wave_backend).items() if isinstance(v, type)]
+    return ("wave_backend.", *classes)
+
+
+def cprofile_categories(stats: pstats.Stats) -> dict[str, float]:
+    """Own time (ms) per category from a cProfile run."""
+    ffi = _ffi_markers()
+    totals: Counter[str] = Counter()
+    for (filename, _, function), (_, _, tottime, _, _) in stats.stats.items():  # type: ignore[attr-defined]
+        if any(m in function for m in ffi):
+            category = RUST_FFI
+        elif "/json/" in filename or "_json." in function:
+            category = JSON
+        elif any(p in filename for p in _IO_PATHS) or "_ssl." in function or "socket" in function:
+            category = BOTO3_IO
+        elif "acquire" in function or any(p in filename for p in _WAIT_PATHS):
+            category = WAIT
+        else:
+            category = PYTHON
+        totals[category] += tottime * 1000
+    return {c: round(totals[c], 1) for c in CATEGORIES if totals[c]}
+
+
+def _output_path(report: dict[str, Any], suffix: str) -> str:
+    os.makedirs(OUTPUT, exist_ok=True)
+    stamp = int(time.time() * 1000)
+    return os.path.join(OUTPUT, f"{report['profile']}-{stamp}-{report['request_id'] or 'local'}{suffix}")
+
+
+def _log(report: dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(report, separators=(",", ":")) + "\n")
+
+
+def _report_cprofile(report: dict[str, Any], stats: pstats.Stats) -> None:
+    report["categories_ms"] = cprofile_categories(stats)
+    if OUTPUT == "log":
+        text = io.StringIO()
+        stats.stream = text  # type: ignore[attr-defined]
+        stats.sort_stats("cumulative").print_stats(25)
+        report["top"] = text.getvalue()
+    else:
+        report["path"] = _output_path(report, ".prof")
+        stats.dump_stats(report["path"])
+    _log(report)
+
+
+def _report_samples(report: dict[str, Any], sampler: Sampler) -> None:
+    report.update(sampler.summary())
+    if OUTPUT == "log":
+        report["collapsed"] = sampler.collapsed(MAX_LOGGED_STACKS)
+    else:
+        report["path"] = _output_path(report, ".collapsed")
+        with open(report["path"], "w", encoding="utf-8") as f:
+            f.write(sampler.collapsed())
+    _log(report)
+
+
+@contextlib.contextmanager
+def session(handler: str, mode: str | None, request_id: str | None = None) -> Iterator[None]:
+    """Profile the enclosed block when mode is set; otherwise do nothing.
+
+    One session runs at a time per process; overlapping invocations (only
+    possible outside Lambda) run unprofiled.
+    """
+    global TRACKING
+    if mode is None or not _session_lock.acquire(blocking=False):
+        yield
+        return
+
+    start = time.perf_counter()
+    report: dict[str, Any] = {"profile": handler, "mode": mode, "request_id": request_id}
+    try:
+        if mode == CPROFILE:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                report["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                _report_cprofile(report, pstats.Stats(profiler))
+            return
+
+        sampler = Sampler()
+        TRACKING = True
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            TRACKING = False
+            _stages.clear()
+            report["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            _report_samples(report, sampler)
+    finally:
+        _session_lock.release()
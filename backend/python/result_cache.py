@@ -0,0 +1,166 @@
+"""Content-addressed cache for Bedrock model results.
+
+Keys are a SHA-256 of (model ID, language, normalized text), so the same
+support message — modulo case and whitespace — maps to the same entry no
+matter who sent it. Two tiers:
+
+* an in-process LRU that survives warm Lambda invocations, and
+* an optional DynamoDB tier (items ``PK=CACHE#<key>`` in wave-ml-results,
+  expired through the table's ``ExpiresAt`` TTL attribute).
+
+>>> cache = ResultCache(max_entries=2)
+>>> key = cache_key("Angalia  SALIO", "swahili", "model-a")
+>>> key == cache_key("angalia salio", "swahili", "model-a")
+True
+>>> cache.get_or_compute(key, lambda: {"sentiment": "neutral"})
+{'sentiment': 'neutral'}
+>>> cache.get_or_compute(key, lambda: {"sentiment": "changed"})
+{'sentiment': 'neutral'}
+>>> cache.stats()["hits"], cache.stats()["misses"]
+(1, 1)
+"""
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold, NFKC-normalize and collapse whitespace."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def cache_key(text: str, language: str, model_id: str) -> str:
+    """Content address for a model result."""
+    material = "\x1f".join((model_id, language, normalize_text(text)))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Two-tier (LRU + optional DynamoDB) cache for JSON-serializable results.
+
+    Thread-safe; the Bedrock handler calls it from its worker pool.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_s: int = 86400 * 7,
+        table: Any = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.table = table
+
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "dynamodb_hits": 0,
+            "dynamodb_misses": 0,
+            "dynamodb_errors": 0,
+        }
+
+    def stats(self) -> dict[str, int]:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return {**self._counters, "size": len(self._entries)}
+
+    def get(self, key: str) -> Any | None:
+        """Look up key in the LRU tier, then the DynamoDB tier."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return value
+                del self._entries[key]
+                self._counters["expirations"] += 1
+
+        if self.table is not None:
+            value, expires_at = self._get_remote(key, now)
+            if value is not None:
+                with self._lock:
+                    self._counters["hits"] += 1
+                self._put_local(key, value, expires_at)
+                return value
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store value in both tiers."""
+        expires_at = time.time() + self.ttl_s
+        self._put_local(key, value, expires_at)
+        if self.table is not None:
+            self._put_remote(key, value, expires_at)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss.
+
+        Empty results (e.g. a response without an embedding) are returned
+        but not cached.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value:
+                self.put(key, value)
+        return value
+
+    def _put_local(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _get_remote(self, key: str, now: float) -> tuple[Any | None, float]:
+        # Imported here so callers without a DynamoDB tier (the language
+        # detection Lambda) never load botocore.
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        try:
+            item = self.table.get_item(Key={"PK": f"CACHE#{key}", "SK": "CACHE"}).get("Item")
+        except (BotoCoreError, ClientError):
+            with self._lock:
+                self._counters["dynamodb_errors"] += 1
+            return None, 0.0
+
+        # TTL deletion is lazy, so expired items can still be read back.
+        if not item or int(item.get("ExpiresAt", 0)) <= now:
+            with self._lock:
+                self._counters["dynamodb_misses"] += 1
+            return None, 0.0
+
+        with self._lock:
+            self._counters["dynamodb_hits"] += 1
+        return json.loads(item["value"]), float(item["ExpiresAt"])
+
+    def _put_remote(self, key: str, value: Any, expires_at: float) -> None:
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        try:
+            self.table.put_item(
+                Item={
+                    "PK": f"CACHE#{key}",
+                    "SK": "CACHE",
+                    "value": json.dumps(value),
+                    "ExpiresAt": int(expires_at),
+                }
+            )
+        except (BotoCoreError, ClientError):
+            # A cache write failure must never fail the request.
+            with self._lock:
+                self._counters["dynamodb_errors"] += 1
@@ -0,0 +1,378 @@
+"""Incremental analytics rollups in the ML results table.
+
+Result items live under random ML#<id> keys, so any distribution or
+percentile over them needs a full table scan. Rollups keep those aggregates
+up to date as results are written, in a few small items per time bucket:
+
+  PK                           SK                                     attributes
+  ROLLUP#hour#2026-10-17T14    COUNT#<language>#<intent>#<sentiment>  n
+  ROLLUP#hour#2026-10-17T14    LATENCY                                <metric>_n, <metric>_sum,
+                                                                      <metric>_<bucket>, ...
+  ROLLUP#day#2026-10-17        (the same, per UTC day)
+
+Counters are bumped with UpdateItem ADD, so any number of writers can update
+the same bucket without reading it first. Latencies (end-to-end "total" and
+each stage) go into log-bucketed histograms: bucket i counts values in
+(gamma^(i-1), gamma^i] with gamma = (1 + a) / (1 - a), so every quantile
+estimate is within relative error a (ROLLUP_SKETCH_ACCURACY, default 2%).
+Merging two such sketches is adding their counts bucket by bucket, which is
+what ADD does in DynamoDB and what query() does across buckets.
+
+Writers aggregate an invocation's results in a RollupBuffer and flush one
+UpdateItem per touched item; query() reads the buckets covering a time
+range, so its cost depends on the range, not on the message volume.
+
+>>> sketch = LatencySketch()
+>>> for ms in range(1, 101):
+...     sketch.add(ms)
+>>> [abs(sketch.quantile(q) - exact) / exact <= 0.02 for q, exact in [(0.5, 50), (0.99, 99)]]
+[True, True]
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Iterable
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from instrumentation import instrumented
+from persistence import LazyTable
+
+HOUR = "hour"
+DAY = "day"
+# granularity -> (seconds per bucket, strftime format of the bucket label)
+GRANULARITIES: dict[str, tuple[int, str]] = {
+    HOUR: (3600, "%Y-%m-%dT%H"),
+    DAY: (86400, "%Y-%m-%d"),
+}
+
+TOTAL = "total"
+LATENCY_SK = "LATENCY"
+
+ROLLUP_GRANULARITIES: tuple[str, ...] = tuple(
+    g for g in os.environ.get("ROLLUP_GRANULARITIES", "hour,day").split(",") if g in GRANULARITIES
+)
+ROLLUP_TTL_S: int = int(os.environ.get("ROLLUP_TTL_DAYS", "400")) * 86400
+SKETCH_ACCURACY: float = float(os.environ.get("ROLLUP_SKETCH_ACCURACY", "0.02"))
+# query() refuses ranges that would read more buckets than this.
+MAX_QUERY_BUCKETS: int = 1000
+
+TABLE_NAME = os.environ.get("ML_RESULTS_TABLE", "wave-ml-results")
+AWS_REGION = "us-east-1"
+ROLLUP_TABLE = LazyTable(TABLE_NAME, AWS_REGION)
+
+_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rollups")
+
+
+class LatencySketch:
+    """Mergeable log-bucketed histogram of millisecond latencies.
+
+    Values up to 1 ms share the first bucket.
+    """
+
+    def __init__(self, accuracy: float = SKETCH_ACCURACY) -> None:
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Counter[int] = Counter()
+        self.count = 0
+        self.sum = 0
+
+    def index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma) if value > 1 else 0
+
+    def add(self, value: float, n: int = 1) -> None:
+        """Count value n times (negative n takes earlier adds back out)."""
+        self.buckets[self.index(value)] += n
+        self.count += n
+        self.sum += round(value) * n
+
+    def merge(self, other: "LatencySketch") -> None:
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q: float) -> float | None:
+        """Estimated q-quantile, or None for an empty sketch."""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                break
+        # The middle of the bucket in relative terms.
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def summary(self) -> dict[str, Any]:
+        def ms(q: float) -> float | None:
+            value = self.quantile(q)
+            return round(value, 1) if value is not None else None
+
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 1) if self.count > 0 else None,
+            "p50": ms(0.5),
+            "p90": ms(0.9),
+            "p95": ms(0.95),
+            "p99": ms(0.99),
+            "max": ms(1.0),
+        }
+
+    def attributes(self, metric: str) -> dict[str, int]:
+        """This sketch as rollup item attributes (metric_n, metric_sum, metric_<i>)."""
+        attrs = {f"{metric}_{i}": n for i, n in self.buckets.items() if n}
+        if self.count:
+            attrs[f"{metric}_n"] = self.count
+            attrs[f"{metric}_sum"] = self.sum
+        return attrs
+
+    @classmethod
+    def from_attributes(
+        cls, item: dict[str, Any], accuracy: float = SKETCH_ACCURACY
+    ) -> dict[str, "LatencySketch"]:
+        """The sketches stored on a LATENCY item, by metric."""
+        sketches: dict[str, LatencySketch] = {}
+        for name, value in item.items():
+            metric, _, suffix = name.rpartition("_")
+            if not metric or not (suffix in ("n", "sum") or suffix.isdigit()):
+                continue
+            sketch = sketches.get(metric)
+            if sketch is None:
+                sketch = sketches[metric] = cls(accuracy)
+            if suffix == "n":
+                sketch.count += int(value)
+            elif suffix == "sum":
+                sketch.sum += int(value)
+            else:
+                sketch.buckets[int(suffix)] += int(value)
+        return sketches
+
+
+def bucket_label(timestamp: float, granularity: str) -> str:
+    return time.strftime(GRANULARITIES[granularity][1], time.gmtime(timestamp))
+
+
+def bucket_key(timestamp: float, granularity: str) -> str:
+    """PK of the rollup bucket containing timestamp."""
+    return f"ROLLUP#{granularity}#{bucket_label(timestamp, granularity)}"
+
+
+def _dimension(value: Any) -> str:
+    return str(value or "unknown").replace("#", "_")
+
+
+def _metric(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name.lower())
+
+
+class RollupBuffer:
+    """One invocation's rollup increments, flushed as one update per item. Thread-safe."""
+
+    def __init__(
+        self,
+        granularities: Iterable[str] = ROLLUP_GRANULARITIES,
+        accuracy: float = SKETCH_ACCURACY,
+        ttl_s: int = ROLLUP_TTL_S,
+    ) -> None:
+        self.granularities = tuple(granularities)
+        self.accuracy = accuracy
+        self.ttl_s = ttl_s
+        self.errors = 0
+        self._counts: Counter[tuple[str, str]] = Counter()
+        self._latency: dict[str, dict[str, LatencySketch]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, item: dict[str, Any], n: int = 1) -> None:
+        """Count one result item (as persist_result writes it)."""
+        timestamp = item.get("timestamp") or time.time()
+        sk = "COUNT#" + "#".join(
+            _dimension(item.get(d)) for d in ("language", "intent", "sentiment")
+        )
+        latencies = {_metric(k): v for k, v in (item.get("stage_latency_ms") or {}).items()}
+        if item.get("latency_ms") is not None:
+            latencies[TOTAL] = item["latency_ms"]
+        with self._lock:
+            for granularity in self.granularities:
+                pk = bucket_key(timestamp, granularity)
+                self._counts[(pk, sk)] += n
+                sketches = self._latency.setdefault(pk, {})
+                for metric, value in latencies.items():
+                    if metric not in sketches:
+                        sketches[metric] = LatencySketch(self.accuracy)
+                    sketches[metric].add(float(value), n)
+
+    def remove(self, item: dict[str, Any]) -> None:
+        """Take back an add(), e.g. for an item whose write failed."""
+        self.add(item, -1)
+
+    def updates(self) -> list[dict[str, Any]]:
+        """UpdateItem arguments for everything buffered."""
+        expires_at = int(time.time()) + self.ttl_s
+        updates = []
+        with self._lock:
+            for (pk, sk), n in self._counts.items():
+                if n:
+                    updates.append(_update(pk, sk, {"n": n}, expires_at))
+            for pk, sketches in self._latency.items():
+                attrs: dict[str, int] = {}
+                for metric, sketch in sketches.items():
+                    attrs.update(sketch.attributes(metric))
+                if attrs:
+                    updates.append(_update(pk, LATENCY_SK, attrs, expires_at))
+        return updates
+
+    def flush(self, table: Any = None, executor: Executor | None = None) -> int:
+        """Apply the buffered increments; returns how many updates failed.
+
+        Failures are counted, not raised: analytics must never fail the
+        write path. The buffer is empty afterwards either way.
+        """
+        table = table if table is not None else ROLLUP_TABLE
+        updates = self.updates()
+        with self._lock:
+            self._counts.clear()
+            self._latency.clear()
+
+        def apply(update: dict[str, Any]) -> bool:
+            try:
+                table.update_item(**update)
+            except (BotoCoreError, ClientError):
+                return False
+            return True
+
+        if executor is not None and len(updates) > 1:
+            failed = sum(not ok for ok in executor.map(apply, updates))
+        else:
+            failed = sum(not apply(u) for u in updates)
+        self.errors += failed
+        return failed
+
+
+def _update(pk: str, sk: str, increments: dict[str, int], expires_at: int) -> dict[str, Any]:
+    names = {f"#a{i}": name for i, name in enumerate(increments)}
+    values: dict[str, Any] = {f":v{i}": n for i, n in enumerate(increments.values())}
+    values[":expires"] = expires_at
+    adds = ", ".join(f"#a{i} :v{i}" for i in range(len(increments)))
+    return {
+        "Key": {"PK": pk, "SK": sk},
+        "UpdateExpression": f"ADD {adds} SET ExpiresAt = if_not_exists(ExpiresAt, :expires)",
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }
+
+
+def _read_bucket(table: Any, pk: str) -> list[dict[str, Any]]:
+    items: list[dict[str, Any]] = []
+    kwargs: dict[str, Any] = {
+        "KeyConditionExpression": "PK = :pk",
+        "ExpressionAttributeValues": {":pk": pk},
+    }
+    while True:
+        page = table.query(**kwargs)
+        items.extend(page.get("Items", []))
+        if "LastEvaluatedKey" not in page:
+            return items
+        kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+
+def query(
+    start: float,
+    end: float,
+    granularity: str | None = None,
+    table: Any = None,
+    accuracy: float = SKETCH_ACCURACY,
+) -> dict[str, Any]:
+    """Distributions and latency percentiles for results in [start, end).
+
+    Reads every bucket overlapping the range, so the edges are rounded out
+    to whole buckets. granularity defaults to hours for ranges up to two
+    days and days beyond that.
+    """
+    if not (math.isfinite(start) and math.isfinite(end)):
+        raise ValueError("start and end must be finite")
+    if end <= start:
+        raise ValueError("end must be after start")
+    if granularity is None:
+        granularity = HOUR if end - start <= 2 * 86400 else DAY
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"unknown granularity: {granularity}")
+    width = GRANULARITIES[granularity][0]
+    first = int(start) // width * width
+    # Checked before building the list, so a huge range can't allocate one.
+    buckets = -(-(math.ceil(end) - first) // width)
+    if buckets > MAX_QUERY_BUCKETS:
+        raise ValueError(f"range covers {buckets} {granularity} buckets (max {MAX_QUERY_BUCKETS})")
+    bucket_starts = list(range(first, math.ceil(end), width))
+
+    table = table if table is not None else ROLLUP_TABLE
+    pks = [bucket_key(t, granularity) for t in bucket_starts]
+    pages = _QUERY_EXECUTOR.map(lambda pk: _read_bucket(table, pk), pks)
+
+    counts: Counter[tuple[str, str, str]] = Counter()
+    latency: dict[str, LatencySketch] = {}
+    series = []
+    items_read = 0
+    for t, items in zip(bucket_starts, pages):
+        items_read += len(items)
+        messages = 0
+        for item in items:
+            if item["SK"] == LATENCY_SK:
+                for metric, sketch in LatencySketch.from_attributes(item, accuracy).items():
+                    latency.setdefault(metric, LatencySketch(accuracy)).merge(sketch)
+                continue
+            language, intent, sentiment = item["SK"].split("#")[1:4]
+            n = int(item.get("n", 0))
+            counts[(language, intent, sentiment)] += n
+            messages += n
+        series.append({"bucket": bucket_label(t, granularity), "messages": messages})
+
+    def distribution(position: int) -> dict[str, int]:
+        totals: Counter[str] = Counter()
+        for key, n in counts.items():
+            totals[key[position]] += n
+        return dict(totals.most_common())
+
+    return {
+        "start": int(start),
+        "end": int(end),
+        "granularity": granularity,
+        "buckets": len(pks),
+        "items_read": items_read,
+        "messages": sum(counts.values()),
+        "languages": distribution(0),
+        "intents": distribution(1),
+        "sentiments": distribution(2),
+        "counts": [
+            {"language": language, "intent": intent, "sentiment": sentiment, "n": n}
+            for (language, intent, sentiment), n in counts.most_common() if n
+        ],
+        "series": series,
+        "latency_ms": {metric: sketch.summary() for metric, sketch in sorted(latency.items())},
+    }
+
+
+@instrumented("analytics")
+def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """API Gateway handler: GET /analytics?hours=24 or ?start=<epoch s>&end=<epoch s>.
+
+    Optional granularity=hour|day; see query().
+    """
+    params = event.get("queryStringParameters") or {}
+    try:
+        now = time.time()
+        end = float(params.get("end", now))
+        hours = float(params.get("hours", 24))
+        start = float(params["start"]) if "start" in params else end - hours * 3600
+        result = query(start, end, params.get("granularity"))
+    except ValueError as exc:
+        return {"statusCode": 400, "body": json.dumps({"error": str(exc)})}
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(result),
+    }
@@ -6,55 +6,246 @@ Exposed via API Gateway POST /detect-language.
 
 Replaces the previous SageMaker XLM-RoBERTa endpoint (~$86/mo) with
 an in-process library call ($0/mo within Lambda free tier).
+
+Short utterances go through the Rust fast detector (wave_backend
+`identify_language`) first; only texts it isn't confident about reach
+langdetect. langdetect is seeded (LANGDETECT_SEED) so the same text always
+gets the same answer, and results are cached on normalized text so repeated
+short phrases skip detection. Batches ({"texts": [...]}) are deduplicated
+and, when large enough, spread over a process pool.
+
+langdetect is imported, and its profiles loaded (~0.5 s), only when a text
+actually needs it — or up front via prewarm() (WAVE_PREWARM=1 or a
+{"prewarm": true} event).
 """
 import json
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Any
 
-from langdetect import detect_langs
-from langdetect.lang_detect_exception import LangDetectException
+from wave_backend import identify_language, identify_language_batch
 
+from aws_clients import is_prewarm_event, prewarm_requested, prewarm_response
+from instrumentation import LANGUAGE_DETECT, RUST_FFI, instrumented, stage
+from process_pool import worker_context
+from result_cache import ResultCache, cache_key
+
+# langdetect samples n-grams at random; a fixed seed makes it deterministic.
+DETECT_SEED: int = int(os.environ.get("LANGDETECT_SEED", "0"))
+
+# Fast-path answers below this confidence fall back to langdetect; set
+# above 1 to always use langdetect.
+FAST_DETECT_MIN_CONFIDENCE: float = float(os.environ.get("FAST_DETECT_MIN_CONFIDENCE", "0.5"))
+
+DETECTION_CACHE = ResultCache(
+    max_entries=int(os.environ.get("LANGDETECT_CACHE_SIZE", "4096")),
+    ttl_s=int(os.environ.get("LANGDETECT_CACHE_TTL_S", str(86400))),
+)
+
+MAX_BATCH_SIZE: int = int(os.environ.get("LANGDETECT_MAX_BATCH_SIZE", "5000"))
+# Uncached texts needed before a batch is worth a process pool.
+PARALLEL_THRESHOLD: int = int(os.environ.get("LANGDETECT_PARALLEL_THRESHOLD", "64"))
+MAX_WORKERS: int = int(os.environ.get("LANGDETECT_WORKERS", str(os.cpu_count() or 1)))
+
+_POOL: ProcessPoolExecutor | None = None
+# Lambda has no /dev/shm, so multiprocessing fails there; remember that.
+_POOL_UNAVAILABLE = False
+
+_CACHE_MODEL = f"langdetect:{DETECT_SEED}"
+
+
+def _load_langdetect() -> None:
+    """Import and seed langdetect and load its language profiles (idempotent)."""
+    from langdetect import DetectorFactory
+    from langdetect.detector_factory import init_factory
+
+    DetectorFactory.seed = DETECT_SEED
+    init_factory()
+
+
+def _predict(text: str) -> list[list[Any]]:
+    """Uncached langdetect call -> [[label, score], ...], best first."""
+    _load_langdetect()
+    from langdetect import detect_langs
+    from langdetect.lang_detect_exception import LangDetectException
 
-def detect_language(text: str) -> dict[str, Any]:
-    """Detect language using langdetect library."""
     try:
         results = detect_langs(text)
     except LangDetectException:
+        return []
+    return [[r.lang, round(r.prob, 4)] for r in results]
+
+
+def _to_result(predictions: list[list[Any]], detector: str = "langdetect") -> dict[str, Any]:
+    if not predictions:
         return {
             "detected_language": "unknown",
             "confidence": 0.0,
             "all_predictions": [],
+            "detector": detector,
         }
 
-    all_predictions = [
-        {"label": r.lang, "score": round(r.prob, 4)} for r in results
-    ]
-
-    top = all_predictions[0] if all_predictions else {"label": "unknown", "score": 0.0}
+    all_predictions = [{"label": label, "score": score} for label, score in predictions]
+    top = all_predictions[0]
 
     return {
         "detected_language": top["label"],
         "confidence": top["score"],
         "all_predictions": all_predictions,
+        "detector": detector,
     }
 
 
+def _fast_result(fast: dict[str, Any] | None) -> dict[str, Any] | None:
+    if fast is None or fast["confidence"] < FAST_DETECT_MIN_CONFIDENCE:
+        return None
+    return _to_result([[fast["code"], round(fast["confidence"], 4)]], detector="fast")
+
+
+def detect_language(text: str) -> dict[str, Any]:
+    """Detect language: Rust fast path, then (cached) langdetect."""
+    with stage(RUST_FFI):
+        fast = _fast_result(identify_language(text))
+    if fast is not None:
+        return fast
+
+    key = cache_key(text, "", _CACHE_MODEL)
+    with stage(LANGUAGE_DETECT):
+        return _to_result(DETECTION_CACHE.get_or_compute(key, lambda: _predict(text)))
+
+
+def _get_pool() -> ProcessPoolExecutor | None:
+    global _POOL, _POOL_UNAVAILABLE
+    if _POOL is None and not _POOL_UNAVAILABLE and MAX_WORKERS > 1:
+        try:
+            _POOL = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=worker_context(),
+                initializer=_load_langdetect,
+            )
+        except (OSError, NotImplementedError):
+            _POOL_UNAVAILABLE = True
+    return _POOL
+
+
+def _predict_many(texts: list[str]) -> list[list[list[Any]]]:
+    """Run _predict over texts, on the process pool when it pays off."""
+    global _POOL, _POOL_UNAVAILABLE
+    pool = _get_pool() if len(texts) >= PARALLEL_THRESHOLD else None
+    if pool is not None:
+        try:
+            chunksize = max(1, len(texts) // (MAX_WORKERS * 4))
+            return list(pool.map(_predict, texts, chunksize=chunksize))
+        except (OSError, BrokenProcessPool):
+            _POOL, _POOL_UNAVAILABLE = None, True
+    return [_predict(text) for text in texts]
+
+
+def detect_languages(texts: list[str]) -> list[dict[str, Any]]:
+    """Detect languages for a batch.
+
+    The fast path runs over the whole batch in one call. Of the rest, texts
+    that normalize to the same string are detected once, and cached texts
+    are not detected at all.
+    """
+    with stage(RUST_FFI):
+        fast = [_fast_result(f) for f in identify_language_batch(texts)]
+    keys = [cache_key(text, "", _CACHE_MODEL) for text in texts]
+    predictions: dict[str, list[list[Any]]] = {}
+    misses: dict[str, str] = {}
+    for key, text, fast_result in zip(keys, texts, fast):
+        if fast_result is not None or key in predictions or key in misses:
+            continue
+        cached = DETECTION_CACHE.get(key)
+        if cached is None:
+            misses[key] = text
+        else:
+            predictions[key] = cached
+
+    # Profiles load once here rather than in every forked worker.
+    with stage(LANGUAGE_DETECT):
+        if misses:
+            _load_langdetect()
+        for key, predicted in zip(misses, _predict_many(list(misses.values()))):
+            predictions[key] = predicted
+            if predicted:
+                DETECTION_CACHE.put(key, predicted)
+
+    return [
+        fast_result if fast_result is not None else _to_result(predictions[key])
+        for key, fast_result in zip(keys, fast)
+    ]
+
+
+def batch_handler(texts: Any) -> dict[str, Any]:
+    """Detect languages for {"texts": [...]}."""
+    start = time.monotonic_ns()
+
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": "texts must be a list of strings"}),
+        }
+    if len(texts) > MAX_BATCH_SIZE:
+        return {
+            "statusCode": 413,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": f"batch exceeds {MAX_BATCH_SIZE} texts"}),
+        }
+
+    results = detect_languages(texts)
+    elapsed_ms = (time.monotonic_ns() - start) // 1_000_000
+
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({
+            "results": results,
+            "count": len(results),
+            "latency_ms": elapsed_ms,
+            "cache": DETECTION_CACHE.stats(),
+        }),
+    }
+
+
+def prewarm() -> None:
+    """Load langdetect profiles ahead of the first request."""
+    _load_langdetect()
+
+
+if prewarm_requested():
+    prewarm()
+
+
+@instrumented("sagemaker")
 def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """API Gateway Lambda handler for language detection.
 
     Expects:
         POST /detect-language
         {"text": "Bonjour, je veux envoyer de l'argent"}
+        or {"texts": ["Bonjour", "Habari yako", ...]}
 
     Returns:
         {"detected_language": "fr", "confidence": 0.95, ...}
+        or {"results": [...], "count": 2, ...} for batches
     """
+    if is_prewarm_event(event):
+        prewarm()
+        return prewarm_response()
+
     start = time.monotonic_ns()
 
     body = event
     if "body" in event:
         body = json.loads(event["body"]) if isinstance(event["body"], str) else event["body"]
 
+    if "texts" in body:
+        return batch_handler(body["texts"])
+
     text: str = body.get("text", "")
     if not text.strip():
         return {
@@ -1,10 +1,10 @@
 """Lambda handler for voice intent classification.
 
-Receives text from API Gateway, runs it through the Rust tokenizer and
-language detector, then applies keyword-based intent classification on
-the Python side. The split keeps the hot path (tokenization) in Rust
-and the business logic (intent mapping) in Python where it's easy to
-iterate on.
+Receives text from API Gateway and classifies it with one fused Rust call
+(tokenize, lowercase, detect language, score intents). The business logic
+— the intent keyword table, in intent_index (or a JSON file named by
+INTENT_KEYWORDS_PATH) — still lives in Python where it's easy to iterate
+on; it is compiled into the Rust classifier once per container.
 
 >>> result = classify_and_respond("angalia salio yangu")
 >>> result["language"]
@@ -14,87 +14,257 @@ iterate on.
 >>> "latency_ms" in result
 True
 """
+import base64
 import json
 import os
 import time
 from typing import Any
 
-import boto3
-
 # PyO3 Rust bindings.
-from wave_backend import classify_intent
+from wave_backend import IntentClassifier
 
-EVENTS_CLIENT = boto3.client("events", region_name="us-east-1")
-EVENT_BUS_NAME = os.environ.get("EVENT_BUS_NAME", "wave-ml-events")
+from aws_clients import LazyClient, is_prewarm_event, prewarm_requested, prewarm_response
+from event_publisher import EventPublisher, flush_at_exit
+from events_schema import decode, voice_detail
+from instrumentation import EVENTBRIDGE_PUBLISH, INTENT_MATCH, JSON_PARSE, instrumented, stage
+from intent_index import DEFAULT_CONFIDENCE, INTENT_KEYWORDS, LOW_CONFIDENCE, rebuild_index
 
-# Intent keyword map. Keys are intents, values are trigger words.
-# Intentionally flat — this is a demo, not a production NLU pipeline.
-INTENT_KEYWORDS: dict[str, list[str]] = {
-    "check_balance": ["balance", "salio", "angalia", "check", "how much"],
-    "send_money": ["send", "tuma", "kutuma", "transfer", "pesa"],
-    "account_info": ["account", "akaunti", "info", "details", "profile"],
-    "help": ["help", "msaada", "support", "assist"],
-    "greeting": ["hello", "hi", "habari", "jambo", "hey", "mambo"],
-}
+# Created on first publish, so 400s and cold starts don't pay for boto3.
+EVENTS_CLIENT = LazyClient("events", "us-east-1")
+EVENT_BUS_NAME = os.environ.get("EVENT_BUS_NAME", "wave-ml-events")
 
-DEFAULT_CONFIDENCE: float = 0.85
-LOW_CONFIDENCE: float = 0.4
+# "background" delivers events on a worker thread while the response is
+# built; "sync" flushes inline as events are published.
+EVENT_FLUSH_MODE: str = os.environ.get("EVENT_FLUSH_MODE", "background")
 
+# Lambda freezes the container (and the worker thread) as soon as the handler
+# returns, and atexit isn't guaranteed to run when it's reclaimed, so there
+# the handler waits up to EVENT_FLUSH_TIMEOUT_S for the queue to drain before
+# returning. Long-lived processes (the gateway) leave delivery to the worker.
+FLUSH_BEFORE_RETURN: bool = "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+EVENT_FLUSH_TIMEOUT_S: float = float(os.environ.get("EVENT_FLUSH_TIMEOUT_S", "2"))
 
-def match_intent(tokens: list[str]) -> tuple[str, float]:
-    """Match tokens against known intents. Returns (intent, confidence)."""
-    lower_tokens = [t.lower() for t in tokens]
+EVENT_PUBLISHER = EventPublisher(EVENTS_CLIENT, background=EVENT_FLUSH_MODE != "sync")
+flush_at_exit(EVENT_PUBLISHER)
 
-    best_intent = "unknown"
-    best_score = 0
+# Upper bound on utterances per batch invocation. Keeps a single call well
+# inside the Lambda timeout and the 6 MB response limit.
+MAX_BATCH_SIZE: int = int(os.environ.get("VOICE_MAX_BATCH_SIZE", "5000"))
 
-    for intent, keywords in INTENT_KEYWORDS.items():
-        hits = sum(1 for kw in keywords if kw in lower_tokens)
-        if hits > best_score:
-            best_score = hits
-            best_intent = intent
+# Compiled once per container from intent_index's table; rebuild with
+# rebuild_intent_index() after editing INTENT_KEYWORDS at runtime.
+_CLASSIFIER = IntentClassifier(INTENT_KEYWORDS, DEFAULT_CONFIDENCE, LOW_CONFIDENCE)
 
-    if best_score == 0:
-        return "unknown", LOW_CONFIDENCE
 
-    confidence = min(DEFAULT_CONFIDENCE + (best_score - 1) * 0.05, 0.99)
-    return best_intent, confidence
+def rebuild_intent_index() -> None:
+    """Recompile the Python index and the Rust classifier from INTENT_KEYWORDS."""
+    global _CLASSIFIER
+    rebuild_index()
+    _CLASSIFIER = IntentClassifier(INTENT_KEYWORDS, DEFAULT_CONFIDENCE, LOW_CONFIDENCE)
 
 
 def classify_and_respond(text: str) -> dict[str, Any]:
-    """Run classification pipeline: Rust tokenization then Python intent matching."""
+    """Run the fused Rust classification pipeline on one utterance."""
     start = time.monotonic_ns()
 
-    rust_result = json.loads(classify_intent(text))
-    tokens: list[str] = rust_result["tokens"]
-    language: str = rust_result["language"]
-
-    intent, confidence = match_intent(tokens)
+    with stage(INTENT_MATCH):
+        rust_result = _CLASSIFIER.classify(text)
 
     elapsed_ms = (time.monotonic_ns() - start) // 1_000_000
 
     return {
-        "language": language,
-        "intent": intent,
-        "tokens": tokens,
-        "confidence": confidence,
+        "language": rust_result["language"],
+        "intent": rust_result["intent"],
+        "tokens": rust_result["tokens"],
+        "confidence": rust_result["confidence"],
         "latency_ms": elapsed_ms,
     }
 
 
+def _event_entry(text: str, result: dict[str, Any]) -> dict[str, Any]:
+    """Build the EventBridge entry for one classified utterance.
+
+    The detail carries the tokens and classification (events_schema v2),
+    so downstream stages don't classify the text again.
+    """
+    return {
+        "Source": "wave.voice",
+        "DetailType": "VoiceClassification",
+        "Detail": json.dumps(voice_detail(text, result)),
+        "EventBusName": EVENT_BUS_NAME,
+    }
+
+
+@stage(EVENTBRIDGE_PUBLISH)
+def publish_events(entries: list[dict[str, Any]]) -> None:
+    """Hand entries to the publisher. Delivery failures never fail the response."""
+    EVENT_PUBLISHER.publish_many(entries)
+    if not EVENT_PUBLISHER.background:
+        EVENT_PUBLISHER.flush()
+
+
+def _batch_items(event: dict[str, Any], body: dict[str, Any]) -> tuple[str, list[tuple[str, Any]]]:
+    """Normalize a batch event into (source, [(item_id, text_or_error)]).
+
+    Supported shapes:
+        {"texts": ["...", ...]}                      (direct or API Gateway body)
+        {"Records": [{"eventSource": "aws:sqs", "messageId": ..., "body": "{\"text\": ...}"}]}
+        {"Records": [{"eventSource": "aws:kinesis", "kinesis": {"data": <base64>, ...}}]}
+
+    Record payloads may be JSON or any events_schema encoding.
+
+    Items that can't be decoded carry a ValueError instead of text so they are
+    reported individually rather than failing the whole batch.
+    """
+    if "Records" not in event:
+        return "texts", [(str(i), t) for i, t in enumerate(body.get("texts", []))]
+
+    items: list[tuple[str, Any]] = []
+    for record in event["Records"]:
+        if "kinesis" in record:
+            item_id = record["kinesis"].get("sequenceNumber", "")
+            raw = record["kinesis"].get("data", "")
+            try:
+                payload = decode(base64.b64decode(raw))
+            except (ValueError, TypeError) as exc:
+                items.append((item_id, ValueError(f"undecodable record: {exc}")))
+                continue
+        else:
+            item_id = record.get("messageId", "")
+            try:
+                payload = decode(record.get("body", ""))
+            except (ValueError, TypeError) as exc:
+                items.append((item_id, ValueError(f"undecodable record: {exc}")))
+                continue
+        items.append((item_id, payload["text"]))
+    return "records", items
+
+
+def classify_batch(
+    items: list[tuple[str, Any]],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Classify a batch in one pass. Returns (results, failures, event_entries).
+
+    All valid texts cross the FFI boundary in a single classify_batch call,
+    which tokenizes and scores with the GIL released.
+    """
+    failures: list[dict[str, Any]] = []
+    valid: list[tuple[str, str]] = []
+
+    for item_id, text in items:
+        if isinstance(text, Exception):
+            failures.append({"id": item_id, "error": str(text)})
+        elif not isinstance(text, str) or not text.strip():
+            failures.append({"id": item_id, "error": "text must be a non-empty string"})
+        else:
+            valid.append((item_id, text))
+
+    start = time.monotonic_ns()
+    with stage(INTENT_MATCH):
+        rust_results = _CLASSIFIER.classify_batch([text for _, text in valid]) if valid else []
+
+    results: list[dict[str, Any]] = []
+    entries: list[dict[str, Any]] = []
+    for (item_id, text), rust_result in zip(valid, rust_results):
+        result = {
+            "id": item_id,
+            "language": rust_result["language"],
+            "intent": rust_result["intent"],
+            "tokens": rust_result["tokens"],
+            "confidence": rust_result["confidence"],
+        }
+        results.append(result)
+        entries.append(_event_entry(text, result))
+
+    # Per-item latency is the amortized share of the batch.
+    per_item_ms = (time.monotonic_ns() - start) // 1_000_000 // max(len(results), 1)
+    for result in results:
+        result["latency_ms"] = per_item_ms
+
+    return results, failures, entries
+
+
+def batch_handler(event: dict[str, Any], body: dict[str, Any]) -> dict[str, Any]:
+    """Classify many utterances in one invocation.
+
+    Direct/API Gateway batches get per-item results plus a failures list.
+    SQS/Kinesis batches get the Lambda partial-batch response shape so only
+    failed records are redelivered.
+    """
+    start = time.monotonic_ns()
+    if "Records" not in event and not isinstance(body.get("texts"), list):
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": "texts must be a list of strings"}),
+        }
+
+    with stage(JSON_PARSE):
+        source, items = _batch_items(event, body)
+    if len(items) > MAX_BATCH_SIZE:
+        return {
+            "statusCode": 413,
+            "body": json.dumps({"error": f"batch exceeds {MAX_BATCH_SIZE} items"}),
+        }
+
+    results, failures, entries = classify_batch(items)
+    publish_events(entries)
+
+    if source == "records":
+        return {"batchItemFailures": [{"itemIdentifier": f["id"]} for f in failures]}
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps({
+            "results": results,
+            "failures": failures,
+            "count": len(results),
+            "latency_ms": (time.monotonic_ns() - start) // 1_000_000,
+        }),
+    }
+
+
+def prewarm() -> None:
+    """Build the EventBridge client ahead of the first request."""
+    EVENTS_CLIENT.resolve()
+
+
+if prewarm_requested():
+    prewarm()
+
+
+@instrumented("voice")
 def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """API Gateway Lambda handler for voice classification.
 
     Expects:
         {"text": "angalia salio yangu", "source_language": "auto"}
+    or a batch ({"texts": [...]}, or an SQS/Kinesis record batch) — see
+    batch_handler.
 
     Returns:
         {"language": str, "intent": str, "tokens": list,
          "confidence": float, "latency_ms": int}
     """
+    if is_prewarm_event(event):
+        prewarm()
+        return prewarm_response()
+
+    try:
+        return _handle(event)
+    finally:
+        if FLUSH_BEFORE_RETURN and EVENT_PUBLISHER.background:
+            with stage(EVENTBRIDGE_PUBLISH):
+                EVENT_PUBLISHER.flush(EVENT_FLUSH_TIMEOUT_S)
+
+
+def _handle(event: dict[str, Any]) -> dict[str, Any]:
     body = event
     if "body" in event:
-        body = json.loads(event["body"]) if isinstance(event["body"], str) else event["body"]
+        with stage(JSON_PARSE):
+            body = json.loads(event["body"]) if isinstance(event["body"], str) else event["body"]
+
+    if "Records" in event or "texts" in body:
+        return batch_handler(event, body)
 
     text: str = body.get("text", "")
     if not text.strip():
@@ -106,26 +276,7 @@ def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     result = classify_and_respond(text)
 
     # Publish to EventBridge for downstream ML processing (Bedrock sentiment, etc.)
-    try:
-        EVENTS_CLIENT.put_events(
-            Entries=[
-                {
-                    "Source": "wave.voice",
-                    "DetailType": "VoiceClassification",
-                    "Detail": json.dumps({
-                        "text": text,
-                        "language": result["language"],
-                        "intent": result["intent"],
-                        "confidence": result["confidence"],
-                        "token_count": len(result["tokens"]),
-                    }),
-                    "EventBusName": EVENT_BUS_NAME,
-                }
-            ]
-        )
-    except Exception:
-        # Don't fail the voice response if event publishing fails
-        pass
+    publish_events([_event_entry(text, result)])
 
     return {
         "statusCode": 200,
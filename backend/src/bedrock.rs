@@ -49,20 +49,168 @@ pub fn parse_sentiment_response(response_json: &str) -> PyResult<String> {
         .and_then(|block| block["text"].as_str())
         .ok_or_else(|| PyValueError::new_err("missing content[0].text in response"))?;
 
-    // Parse the inner JSON from Claude's response text
+    validate_sentiment(content_text).map_err(PyValueError::new_err)
+}
+
+/// Parse Claude's sentiment JSON text and check the required fields.
+fn validate_sentiment(content_text: &str) -> Result<String, String> {
     let sentiment: serde_json::Value = serde_json::from_str(content_text)
-        .map_err(|e| PyValueError::new_err(format!("failed to parse sentiment JSON: {e}")))?;
+        .map_err(|e| format!("failed to parse sentiment JSON: {e}"))?;
 
-    // Validate required fields
     for field in ["sentiment", "category", "confidence"] {
         if sentiment.get(field).is_none() {
-            return Err(PyValueError::new_err(format!("missing field: {field}")));
+            return Err(format!("missing field: {field}"));
         }
     }
 
     Ok(sentiment.to_string())
 }
 
+/// Finds the end of the first top-level JSON object in text that arrives
+/// in pieces, scanning each byte once.
+#[derive(Default)]
+struct ObjectScanner {
+    buffer: String,
+    scanned: usize,
+    start: Option<usize>,
+    depth: usize,
+    in_string: bool,
+    escaped: bool,
+}
+
+impl ObjectScanner {
+    /// Append text; returns the complete object once its closing brace is seen.
+    fn push(&mut self, text: &str) -> Option<&str> {
+        self.buffer.push_str(text);
+        let bytes = self.buffer.as_bytes();
+        while self.scanned < bytes.len() {
+            let i = self.scanned;
+            self.scanned += 1;
+            let b = bytes[i];
+            if self.in_string {
+                match (self.escaped, b) {
+                    (true, _) => self.escaped = false,
+                    (false, b'\\') => self.escaped = true,
+                    (false, b'"') => self.in_string = false,
+                    _ => {}
+                }
+                continue;
+            }
+            match b {
+                b'"' if self.start.is_some() => self.in_string = true,
+                b'{' => {
+                    self.start.get_or_insert(i);
+                    self.depth += 1;
+                }
+                b'}' if self.depth > 0 => {
+                    self.depth -= 1;
+                    if self.depth == 0 {
+                        let start = self.start.unwrap_or(0);
+                        return Some(&self.buffer[start..=i]);
+                    }
+                }
+                _ => {}
+            }
+        }
+        None
+    }
+}
+
+/// Incremental parser for a streamed Claude sentiment response
+/// (`invoke_model_with_response_stream`).
+///
+/// Feed it each stream event's bytes (or raw text deltas); it returns the
+/// validated sentiment JSON as soon as the object's closing brace arrives,
+/// so the caller can stop reading and close the stream instead of waiting
+/// for (and paying for) the rest of the generation.
+///
+/// ```
+/// // parser = SentimentStreamParser()
+/// // for event in response["body"]:
+/// //     result = parser.feed_event(event["chunk"]["bytes"])
+/// //     if result is not None:
+/// //         response["body"].close()
+/// //         break
+/// ```
+#[pyclass]
+#[derive(Default)]
+pub struct SentimentStreamParser {
+    scanner: ObjectScanner,
+    result: Option<String>,
+    events: usize,
+}
+
+impl SentimentStreamParser {
+    fn push_text(&mut self, text: &str) -> Result<Option<String>, String> {
+        if self.result.is_none() {
+            if let Some(object) = self.scanner.push(text) {
+                self.result = Some(validate_sentiment(object)?);
+            }
+        }
+        Ok(self.result.clone())
+    }
+
+    fn push_event(&mut self, event: &[u8]) -> Result<Option<String>, String> {
+        self.events += 1;
+        let event: serde_json::Value =
+            serde_json::from_slice(event).map_err(|e| format!("invalid stream event JSON: {e}"))?;
+        match event["type"].as_str() {
+            Some("content_block_delta") => match event["delta"]["text"].as_str() {
+                Some(text) => self.push_text(text),
+                None => Ok(self.result.clone()),
+            },
+            _ => Ok(self.result.clone()),
+        }
+    }
+}
+
+#[pymethods]
+impl SentimentStreamParser {
+    #[new]
+    fn new() -> Self {
+        Self::default()
+    }
+
+    /// Feed one stream event (the `chunk["bytes"]` payload). Returns the
+    /// sentiment JSON once complete, else None. Non-text events are skipped.
+    fn feed_event(&mut self, event: &[u8]) -> PyResult<Option<String>> {
+        self.push_event(event).map_err(PyValueError::new_err)
+    }
+
+    /// Feed a raw text delta. Returns the sentiment JSON once complete.
+    fn feed(&mut self, text: &str) -> PyResult<Option<String>> {
+        self.push_text(text).map_err(PyValueError::new_err)
+    }
+
+    /// The stream ended: return the result, or raise if no complete object arrived.
+    fn finish(&self) -> PyResult<String> {
+        self.result.clone().ok_or_else(|| {
+            PyValueError::new_err(format!(
+                "stream ended without a complete sentiment object: {:?}",
+                self.scanner.buffer
+            ))
+        })
+    }
+
+    /// True once the sentiment object has been parsed.
+    #[getter]
+    fn done(&self) -> bool {
+        self.result.is_some()
+    }
+
+    /// Number of stream events fed so far.
+    #[getter]
+    fn events(&self) -> usize {
+        self.events
+    }
+
+    /// Text received so far.
+    #[getter]
+    fn text(&self) -> String {
+        self.scanner.buffer.clone()
+    }
+}
+
 /// Build a Titan Embeddings V2 request payload.
 ///
 /// Returns a JSON string for `bedrock:InvokeModel` with amazon.titan-embed-text-v2:0.
@@ -81,6 +229,209 @@ pub fn build_embedding_request(text: &str) -> PyResult<String> {
     Ok(payload.to_string())
 }
 
+/// Default input budget for one batched sentiment request, in estimated
+/// tokens (system prompt included). Well under Haiku's context window, so
+/// a batch never fails on length even when the estimate is off.
+pub(crate) const DEFAULT_BATCH_INPUT_TOKENS: usize = 6000;
+
+/// Default cap on messages per batched request. Bounds the output too:
+/// each answer costs roughly `OUTPUT_TOKENS_PER_ITEM`.
+pub(crate) const DEFAULT_BATCH_ITEMS: usize = 25;
+
+const OUTPUT_TOKENS_PER_ITEM: usize = 60;
+const MAX_OUTPUT_TOKENS: usize = 4096;
+
+/// JSON punctuation and keys around each message in the user turn.
+const ITEM_OVERHEAD_TOKENS: usize = 12;
+
+const BATCH_SYSTEM_PROMPT: &str =
+    "You are a sentiment analysis engine for Wave mobile money customer support. \
+     The user turn is a JSON array of messages, each {\"id\", \"language\", \"text\"}. \
+     Classify every message independently. Respond ONLY with a JSON array holding \
+     one object per message, in any order: {\"id\": <the message id>, \
+     \"sentiment\": \"positive\"|\"negative\"|\"neutral\", \
+     \"category\": \"complaint\"|\"inquiry\"|\"praise\"|\"urgent\", \
+     \"confidence\": 0.0-1.0, \"summary\": \"english summary, at most 12 words\"}";
+
+/// Rough token count: ~4 UTF-8 bytes per token, rounded up. Overestimates
+/// for non-Latin scripts, which is the safe direction for a budget.
+fn estimate_tokens(text: &str) -> usize {
+    text.len().div_ceil(4)
+}
+
+/// One Claude request for a slice of (id, text, language) items.
+fn batch_request(items: &[(String, String, String)]) -> String {
+    let messages: Vec<serde_json::Value> = items
+        .iter()
+        .map(|(id, text, language)| {
+            serde_json::json!({"id": id, "language": language, "text": text})
+        })
+        .collect();
+    let max_tokens = (64 + OUTPUT_TOKENS_PER_ITEM * items.len()).min(MAX_OUTPUT_TOKENS);
+
+    serde_json::json!({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "temperature": 0.0,
+        "system": BATCH_SYSTEM_PROMPT,
+        "messages": [
+            {
+                "role": "user",
+                "content": serde_json::Value::Array(messages).to_string()
+            }
+        ]
+    })
+    .to_string()
+}
+
+/// Pack items into as few requests as the budgets allow, in order.
+///
+/// An item too large for the input budget on its own still gets a request
+/// of its own rather than being dropped.
+pub(crate) fn pack_sentiment_batches(
+    items: &[(String, String, String)],
+    max_input_tokens: usize,
+    max_items: usize,
+) -> Result<Vec<(String, Vec<String>)>, String> {
+    let mut seen = std::collections::HashSet::new();
+    for (id, text, _) in items {
+        if text.is_empty() {
+            return Err(format!("text must not be empty (id {id})"));
+        }
+        if !seen.insert(id.as_str()) {
+            return Err(format!("duplicate id {id}"));
+        }
+    }
+
+    let base = estimate_tokens(BATCH_SYSTEM_PROMPT);
+    let max_items = max_items.max(1);
+    let mut batches = Vec::new();
+    let mut start = 0;
+    while start < items.len() {
+        let mut end = start;
+        let mut used = base;
+        while end < items.len() && end - start < max_items {
+            let (id, text, language) = &items[end];
+            let cost = estimate_tokens(text)
+                + estimate_tokens(id)
+                + estimate_tokens(language)
+                + ITEM_OVERHEAD_TOKENS;
+            if end > start && used + cost > max_input_tokens {
+                break;
+            }
+            used += cost;
+            end += 1;
+        }
+        let slice = &items[start..end];
+        let ids = slice.iter().map(|(id, _, _)| id.clone()).collect();
+        batches.push((batch_request(slice), ids));
+        start = end;
+    }
+    Ok(batches)
+}
+
+/// Complete JSON values from a (possibly truncated) array body.
+///
+/// Answers cut off by `max_tokens` are lost, but every object before the
+/// cut is kept, so only the tail needs a retry.
+fn array_items(text: &str) -> Vec<serde_json::Value> {
+    let Some(open) = text.find('[') else {
+        return Vec::new();
+    };
+    let mut rest = &text[open + 1..];
+    let mut values = Vec::new();
+    loop {
+        rest = rest.trim_start_matches(|c: char| c.is_whitespace() || c == ',');
+        if rest.is_empty() || rest.starts_with(']') {
+            break;
+        }
+        let mut stream = serde_json::Deserializer::from_str(rest).into_iter::<serde_json::Value>();
+        match stream.next() {
+            Some(Ok(value)) => {
+                values.push(value);
+                rest = &rest[stream.byte_offset()..];
+            }
+            _ => break,
+        }
+    }
+    values
+}
+
+/// Match a batched response to the expected ids.
+///
+/// Returns (JSON object of id -> sentiment, missing ids). An id is missing
+/// if its answer is absent, lacks a required field, or was cut off; the
+/// caller retries those on their own. Unknown ids are ignored.
+pub(crate) fn match_sentiment_batch(
+    response_json: &str,
+    expected_ids: &[String],
+) -> Result<(String, Vec<String>), String> {
+    let response: serde_json::Value =
+        serde_json::from_str(response_json).map_err(|e| format!("invalid response JSON: {e}"))?;
+    let content_text = response["content"]
+        .as_array()
+        .and_then(|arr| arr.first())
+        .and_then(|block| block["text"].as_str())
+        .ok_or_else(|| "missing content[0].text in response".to_owned())?;
+
+    let expected: std::collections::HashSet<&str> =
+        expected_ids.iter().map(String::as_str).collect();
+    let mut results = serde_json::Map::new();
+    for mut item in array_items(content_text) {
+        let id = match &item["id"] {
+            serde_json::Value::String(s) => s.clone(),
+            serde_json::Value::Number(n) => n.to_string(),
+            _ => continue,
+        };
+        let complete = ["sentiment", "category", "confidence"]
+            .iter()
+            .all(|field| item.get(field).is_some());
+        if !complete || !expected.contains(id.as_str()) {
+            continue;
+        }
+        if let Some(object) = item.as_object_mut() {
+            object.remove("id");
+        }
+        results.insert(id, item);
+    }
+
+    let missing = expected_ids
+        .iter()
+        .filter(|id| !results.contains_key(id.as_str()))
+        .cloned()
+        .collect();
+    Ok((serde_json::Value::Object(results).to_string(), missing))
+}
+
+/// Build batched Claude 3 Haiku sentiment requests.
+///
+/// `items` are (id, text, language); ids must be unique and are echoed
+/// back by the model. Items are packed in order into requests of at most
+/// `max_items` messages and `max_input_tokens` estimated input tokens.
+/// Returns [(request_json, ids_in_request), ...].
+#[pyfunction]
+#[pyo3(signature = (items, max_input_tokens=DEFAULT_BATCH_INPUT_TOKENS, max_items=DEFAULT_BATCH_ITEMS))]
+pub fn build_sentiment_batch_requests(
+    items: Vec<(String, String, String)>,
+    max_input_tokens: usize,
+    max_items: usize,
+) -> PyResult<Vec<(String, Vec<String>)>> {
+    pack_sentiment_batches(&items, max_input_tokens, max_items).map_err(PyValueError::new_err)
+}
+
+/// Parse a batched sentiment response.
+///
+/// Returns (results_json, missing_ids): results_json is a JSON object
+/// mapping each answered id to its sentiment object; missing_ids should be
+/// retried individually.
+#[pyfunction]
+pub fn parse_sentiment_batch_response(
+    response_json: &str,
+    expected_ids: Vec<String>,
+) -> PyResult<(String, Vec<String>)> {
+    match_sentiment_batch(response_json, &expected_ids).map_err(PyValueError::new_err)
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -157,4 +508,139 @@ mod tests {
         let result = build_embedding_request("");
         assert!(result.is_err());
     }
+
+    fn items(n: usize) -> Vec<(String, String, String)> {
+        (0..n)
+            .map(|i| {
+                (
+                    i.to_string(),
+                    format!("message number {i}"),
+                    "english".to_owned(),
+                )
+            })
+            .collect()
+    }
+
+    fn claude_response(text: &str) -> String {
+        serde_json::json!({"content": [{"type": "text", "text": text}]}).to_string()
+    }
+
+    #[test]
+    fn test_batch_requests_pack_by_count_and_budget() {
+        let batches = pack_sentiment_batches(&items(60), 100_000, 25).unwrap();
+        let sizes: Vec<usize> = batches.iter().map(|(_, ids)| ids.len()).collect();
+        assert_eq!(sizes, vec![25, 25, 10]);
+
+        let (request, ids) = &batches[2];
+        let parsed: serde_json::Value = serde_json::from_str(request).unwrap();
+        let content: serde_json::Value =
+            serde_json::from_str(parsed["messages"][0]["content"].as_str().unwrap()).unwrap();
+        assert_eq!(content[0]["id"], "50");
+        assert_eq!(content[9]["text"], "message number 59");
+        assert_eq!(ids[0], "50");
+        assert_eq!(parsed["max_tokens"], 64 + 60 * 10);
+
+        // A tight budget splits sooner, but never leaves an item behind.
+        let base = estimate_tokens(BATCH_SYSTEM_PROMPT);
+        let tight = pack_sentiment_batches(&items(6), base + 40, 25).unwrap();
+        assert!(tight.len() > 1);
+        assert_eq!(tight.iter().map(|(_, ids)| ids.len()).sum::<usize>(), 6);
+        let huge = vec![("big".to_owned(), "x".repeat(50_000), "english".to_owned())];
+        assert_eq!(pack_sentiment_batches(&huge, 1000, 25).unwrap().len(), 1);
+    }
+
+    #[test]
+    fn test_batch_requests_reject_empty_text_and_duplicate_ids() {
+        let mut bad = items(2);
+        bad[1].1.clear();
+        assert!(pack_sentiment_batches(&bad, 6000, 25).is_err());
+        let mut dup = items(2);
+        dup[1].0 = "0".to_owned();
+        assert!(pack_sentiment_batches(&dup, 6000, 25)
+            .unwrap_err()
+            .contains("duplicate"));
+    }
+
+    #[test]
+    fn test_batch_response_matched_by_id_with_missing_flagged() {
+        let text = "Here you go:\n```json\n[\
+            {\"id\": \"b\", \"sentiment\": \"negative\", \"category\": \"complaint\", \"confidence\": 0.9},\
+            {\"id\": \"a\", \"sentiment\": \"positive\", \"category\": \"praise\", \"confidence\": 0.8},\
+            {\"id\": \"c\", \"sentiment\": \"neutral\"},\
+            {\"id\": \"zzz\", \"sentiment\": \"neutral\", \"category\": \"inquiry\", \"confidence\": 0.5}\
+        ]\n```";
+        let expected = vec![
+            "a".to_owned(),
+            "b".to_owned(),
+            "c".to_owned(),
+            "d".to_owned(),
+        ];
+        let (results, missing) = match_sentiment_batch(&claude_response(text), &expected).unwrap();
+        let results: serde_json::Value = serde_json::from_str(&results).unwrap();
+        assert_eq!(results["a"]["sentiment"], "positive");
+        assert_eq!(results["b"]["category"], "complaint");
+        assert!(results.get("zzz").is_none());
+        assert!(results["a"].get("id").is_none());
+        assert_eq!(missing, vec!["c".to_owned(), "d".to_owned()]);
+    }
+
+    #[test]
+    fn test_truncated_batch_response_keeps_complete_items() {
+        let text = "[{\"id\": 1, \"sentiment\": \"neutral\", \"category\": \"inquiry\", \"confidence\": 0.7},\
+                    {\"id\": 2, \"sentiment\": \"neg";
+        let expected = vec!["1".to_owned(), "2".to_owned()];
+        let (results, missing) = match_sentiment_batch(&claude_response(text), &expected).unwrap();
+        assert!(results.contains("\"1\""));
+        assert_eq!(missing, vec!["2".to_owned()]);
+
+        let (_, missing) = match_sentiment_batch(&claude_response("sorry, no"), &expected).unwrap();
+        assert_eq!(missing.len(), 2);
+        assert!(match_sentiment_batch("not json", &expected).is_err());
+    }
+
+    fn delta(text: &str) -> Vec<u8> {
+        serde_json::json!({
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": text}
+        })
+        .to_string()
+        .into_bytes()
+    }
+
+    #[test]
+    fn test_stream_parser_finishes_at_closing_brace() {
+        let mut parser = SentimentStreamParser::default();
+        let start = serde_json::json!({"type": "message_start", "message": {}}).to_string();
+        assert_eq!(parser.push_event(start.as_bytes()).unwrap(), None);
+
+        let pieces = [
+            "{\"sentiment\": \"neg",
+            "ative\", \"category\": \"complaint\", \"summary\": \"a } and \\\" {",
+            "\", \"confidence\": 0.9}",
+            " trailing text the caller never needs",
+        ];
+        assert_eq!(parser.push_event(&delta(pieces[0])).unwrap(), None);
+        assert_eq!(parser.push_event(&delta(pieces[1])).unwrap(), None);
+        let result = parser.push_event(&delta(pieces[2])).unwrap().unwrap();
+        let parsed: serde_json::Value = serde_json::from_str(&result).unwrap();
+        assert_eq!(parsed["sentiment"], "negative");
+        assert_eq!(parsed["summary"], "a } and \" {");
+        assert!(parser.done());
+        assert_eq!(parser.events(), 4);
+        // Later input doesn't change the answer.
+        assert_eq!(parser.push_text(pieces[3]).unwrap(), Some(result));
+    }
+
+    #[test]
+    fn test_stream_parser_skips_preamble_and_validates() {
+        let mut parser = SentimentStreamParser::default();
+        assert_eq!(parser.push_text("Sure! ").unwrap(), None);
+        assert!(parser.finish().is_err());
+        let err = parser
+            .push_text("{\"sentiment\": \"neutral\"}")
+            .unwrap_err();
+        assert!(err.contains("missing field"));
+        assert!(parser.push_event(b"not json").is_err());
+    }
 }
@@ -0,0 +1,341 @@
+use std::borrow::Cow;
+use std::collections::{HashMap, HashSet};
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList};
+
+use crate::voice;
+
+/// Compiled intent keyword table.
+///
+/// Single-word triggers live in a flat token -> (intent, keyword) map;
+/// multi-word triggers live in a token-level trie stored as a flat node
+/// arena. Scoring is one pass over the tokens, independent of table size.
+/// Same scoring rules as the Python `IntentIndex`: one point per distinct
+/// trigger, ties go to the intent listed first.
+struct IntentTable {
+    intents: Vec<String>,
+    single: HashMap<String, Vec<(u32, u32)>>,
+    roots: HashMap<String, usize>,
+    nodes: Vec<TrieNode>,
+}
+
+#[derive(Default)]
+struct TrieNode {
+    children: HashMap<String, usize>,
+    terminal: Vec<(u32, u32)>,
+}
+
+pub(crate) fn lowercase(token: &str) -> Cow<'_, str> {
+    if token.chars().any(char::is_uppercase) {
+        Cow::Owned(token.to_lowercase())
+    } else {
+        Cow::Borrowed(token)
+    }
+}
+
+impl IntentTable {
+    fn new(entries: Vec<(String, Vec<String>)>) -> Self {
+        let mut table = IntentTable {
+            intents: Vec::with_capacity(entries.len()),
+            single: HashMap::new(),
+            roots: HashMap::new(),
+            nodes: Vec::new(),
+        };
+
+        let mut keyword_id: u32 = 0;
+        for (intent_id, (intent, keywords)) in entries.into_iter().enumerate() {
+            table.intents.push(intent);
+            let mut seen: HashSet<Vec<String>> = HashSet::new();
+
+            for keyword in keywords {
+                let parts: Vec<String> = keyword
+                    .split_whitespace()
+                    .map(|p| p.to_lowercase())
+                    .collect();
+                if parts.is_empty() || seen.contains(&parts) {
+                    continue;
+                }
+                let entry = (intent_id as u32, keyword_id);
+                keyword_id += 1;
+
+                if parts.len() == 1 {
+                    table
+                        .single
+                        .entry(parts[0].clone())
+                        .or_default()
+                        .push(entry);
+                } else {
+                    let mut node = table.root(&parts[0]);
+                    for part in &parts[1..] {
+                        node = table.child(node, part);
+                    }
+                    table.nodes[node].terminal.push(entry);
+                }
+                seen.insert(parts);
+            }
+        }
+
+        table
+    }
+
+    fn root(&mut self, token: &str) -> usize {
+        if let Some(&idx) = self.roots.get(token) {
+            return idx;
+        }
+        self.nodes.push(TrieNode::default());
+        let idx = self.nodes.len() - 1;
+        self.roots.insert(token.to_owned(), idx);
+        idx
+    }
+
+    fn child(&mut self, parent: usize, token: &str) -> usize {
+        if let Some(&idx) = self.nodes[parent].children.get(token) {
+            return idx;
+        }
+        self.nodes.push(TrieNode::default());
+        let idx = self.nodes.len() - 1;
+        self.nodes[parent].children.insert(token.to_owned(), idx);
+        idx
+    }
+
+    /// Returns (intent index, distinct trigger hits) of the best intent.
+    fn score(&self, tokens: &[&str]) -> Option<(usize, u32)> {
+        let lower: Vec<Cow<'_, str>> = tokens.iter().map(|t| lowercase(t)).collect();
+        let mut hits: Vec<(u32, u32)> = Vec::new();
+
+        for (pos, token) in lower.iter().enumerate() {
+            if let Some(entries) = self.single.get(token.as_ref()) {
+                hits.extend_from_slice(entries);
+            }
+
+            let mut node = self.roots.get(token.as_ref()).copied();
+            for next in &lower[pos + 1..] {
+                node = node.and_then(|n| self.nodes[n].children.get(next.as_ref()).copied());
+                match node {
+                    Some(n) => hits.extend_from_slice(&self.nodes[n].terminal),
+                    None => break,
+                }
+            }
+        }
+
+        if hits.is_empty() {
+            return None;
+        }
+        hits.sort_unstable();
+        hits.dedup();
+
+        // Hits are sorted by intent, so strict ">" keeps the first-listed
+        // intent on ties.
+        let mut best: Option<(usize, u32)> = None;
+        for group in hits.chunk_by(|a, b| a.0 == b.0) {
+            let n = group.len() as u32;
+            let better = match best {
+                Some((_, b)) => n > b,
+                None => true,
+            };
+            if better {
+                best = Some((group[0].0 as usize, n));
+            }
+        }
+        best
+    }
+}
+
+/// Intent classification result for one text.
+struct Scored<'a> {
+    classification: voice::Classification<'a>,
+    intent: &'a str,
+    confidence: f64,
+}
+
+/// Fused tokenizer + language detector + intent scorer.
+///
+/// Built once from the intent keyword table (a dict of intent -> trigger
+/// words/phrases, in priority order) and reused for every request:
+///
+/// ```
+/// // clf = IntentClassifier({"check_balance": ["salio", "how much"]})
+/// // clf.classify("Angalia salio yangu")
+/// // -> {"language": "swahili", "tokens": [...], "token_count": 3,
+/// //     "intent": "check_balance", "confidence": 0.85}
+/// ```
+#[pyclass(frozen)]
+pub struct IntentClassifier {
+    table: IntentTable,
+    default_confidence: f64,
+    low_confidence: f64,
+}
+
+impl IntentClassifier {
+    fn score<'a>(&'a self, text: &'a str) -> Scored<'a> {
+        let classification = voice::classify(text);
+        let (intent, confidence) = match self.table.score(&classification.tokens) {
+            Some((idx, hits)) => (
+                self.table.intents[idx].as_str(),
+                (self.default_confidence + f64::from(hits - 1) * 0.05).min(0.99),
+            ),
+            None => ("unknown", self.low_confidence),
+        };
+        Scored {
+            classification,
+            intent,
+            confidence,
+        }
+    }
+
+    fn to_dict<'py>(py: Python<'py>, scored: &Scored<'_>) -> PyResult<Bound<'py, PyDict>> {
+        let dict = voice::to_dict(py, &scored.classification)?;
+        dict.set_item("intent", scored.intent)?;
+        dict.set_item("confidence", scored.confidence)?;
+        Ok(dict)
+    }
+}
+
+#[pymethods]
+impl IntentClassifier {
+    #[new]
+    #[pyo3(signature = (keywords, default_confidence=0.85, low_confidence=0.4))]
+    fn new(
+        keywords: &Bound<'_, PyDict>,
+        default_confidence: f64,
+        low_confidence: f64,
+    ) -> PyResult<Self> {
+        let mut entries = Vec::with_capacity(keywords.len());
+        for (intent, triggers) in keywords.iter() {
+            let intent: String = intent
+                .extract()
+                .map_err(|_| PyValueError::new_err("intent names must be strings"))?;
+            let triggers: Vec<String> = triggers.extract().map_err(|_| {
+                PyValueError::new_err(format!("triggers for {intent} must be a list of strings"))
+            })?;
+            entries.push((intent, triggers));
+        }
+
+        Ok(IntentClassifier {
+            table: IntentTable::new(entries),
+            default_confidence,
+            low_confidence,
+        })
+    }
+
+    /// Intent names in priority order.
+    #[getter]
+    fn intents(&self) -> Vec<String> {
+        self.table.intents.clone()
+    }
+
+    /// Tokenize, detect language and score intents in one call.
+    fn classify<'py>(&self, py: Python<'py>, text: &str) -> PyResult<Bound<'py, PyDict>> {
+        Self::to_dict(py, &self.score(text))
+    }
+
+    /// Classify a list of texts with the GIL released while scoring.
+    fn classify_batch<'py>(
+        &self,
+        py: Python<'py>,
+        texts: Vec<String>,
+    ) -> PyResult<Bound<'py, PyList>> {
+        let scored: Vec<Scored<'_>> =
+            py.allow_threads(|| texts.iter().map(|t| self.score(t)).collect());
+
+        let list = PyList::empty(py);
+        for item in &scored {
+            list.append(Self::to_dict(py, item)?)?;
+        }
+        Ok(list)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn table() -> IntentTable {
+        IntentTable::new(vec![
+            (
+                "check_balance".to_string(),
+                vec!["balance".into(), "salio".into(), "how much".into()],
+            ),
+            (
+                "send_money".to_string(),
+                vec!["send".into(), "tuma".into(), "pesa".into()],
+            ),
+        ])
+    }
+
+    fn best(table: &IntentTable, text: &str) -> Option<(String, u32)> {
+        let tokens: Vec<&str> = text.split_whitespace().collect();
+        table
+            .score(&tokens)
+            .map(|(i, n)| (table.intents[i].clone(), n))
+    }
+
+    #[test]
+    fn test_single_word_triggers() {
+        let t = table();
+        assert_eq!(best(&t, "tuma pesa sasa"), Some(("send_money".into(), 2)));
+    }
+
+    #[test]
+    fn test_multi_word_trigger_and_case() {
+        let t = table();
+        assert_eq!(
+            best(&t, "How MUCH is left"),
+            Some(("check_balance".into(), 1))
+        );
+        assert_eq!(best(&t, "how is much"), None);
+    }
+
+    #[test]
+    fn test_tie_goes_to_first_intent() {
+        let t = table();
+        assert_eq!(best(&t, "send balance"), Some(("check_balance".into(), 1)));
+    }
+
+    #[test]
+    fn test_repeated_trigger_counts_once() {
+        let t = table();
+        assert_eq!(best(&t, "tuma tuma tuma"), Some(("send_money".into(), 1)));
+    }
+
+    #[test]
+    fn test_classifier_fused_dict() {
+        Python::with_gil(|py| {
+            let keywords = PyDict::new(py);
+            keywords
+                .set_item("check_balance", vec!["salio", "angalia"])
+                .unwrap();
+            keywords.set_item("help", vec!["help"]).unwrap();
+            let clf = IntentClassifier::new(&keywords, 0.85, 0.4).unwrap();
+
+            let dict = clf.classify(py, "Angalia salio yangu").unwrap();
+            let intent: String = dict.get_item("intent").unwrap().unwrap().extract().unwrap();
+            let confidence: f64 = dict
+                .get_item("confidence")
+                .unwrap()
+                .unwrap()
+                .extract()
+                .unwrap();
+            let language: String = dict
+                .get_item("language")
+                .unwrap()
+                .unwrap()
+                .extract()
+                .unwrap();
+            assert_eq!(intent, "check_balance");
+            assert!((confidence - 0.90).abs() < 1e-9);
+            assert_eq!(language, "swahili");
+
+            let unknown = clf.classify(py, "something random").unwrap();
+            let intent: String = unknown
+                .get_item("intent")
+                .unwrap()
+                .unwrap()
+                .extract()
+                .unwrap();
+            assert_eq!(intent, "unknown");
+        });
+    }
+}
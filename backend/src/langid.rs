@@ -0,0 +1,444 @@
+use std::collections::HashMap;
+use std::sync::OnceLock;
+
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList};
+use unicode_segmentation::UnicodeSegmentation;
+
+use crate::intent::lowercase;
+
+/// A language the fast detector knows: display name (as used by the voice
+/// handler) and ISO 639-1 code (as used by the language detection API).
+pub(crate) struct Language {
+    pub(crate) name: &'static str,
+    pub(crate) code: &'static str,
+}
+
+const EN: usize = 0;
+const SW: usize = 1;
+const FR: usize = 2;
+const PT: usize = 3;
+const AR: usize = 4;
+const AM: usize = 5;
+const WO: usize = 6;
+const HA: usize = 7;
+const YO: usize = 8;
+const LG: usize = 9;
+
+#[rustfmt::skip]
+pub(crate) const LANGUAGES: [Language; 10] = [
+    Language { name: "english", code: "en" },
+    Language { name: "swahili", code: "sw" },
+    Language { name: "french", code: "fr" },
+    Language { name: "portuguese", code: "pt" },
+    Language { name: "arabic", code: "ar" },
+    Language { name: "amharic", code: "am" },
+    Language { name: "wolof", code: "wo" },
+    Language { name: "hausa", code: "ha" },
+    Language { name: "yoruba", code: "yo" },
+    Language { name: "luganda", code: "lg" },
+];
+
+/// Frequent function words and mobile-money vocabulary per language.
+/// A word listed under several languages splits its weight between them.
+#[rustfmt::skip]
+const LEXICON: &[(usize, &[&str])] = &[
+    (
+        EN,
+        &[
+            "the", "and", "to", "my", "i", "you", "is", "are", "want", "send", "money", "check",
+            "please", "how", "much", "what", "can", "me", "account", "from", "for", "with", "this",
+            "it", "of", "in", "have", "do", "not", "need", "pay", "balance", "bill", "help",
+            "transfer", "hello", "hi", "thank", "thanks", "your", "was", "be", "will", "show",
+            "recent", "transactions", "where", "why", "when", "yes", "no", "left", "brother",
+            "sister", "mother", "friend", "received", "did", "get", "has", "been", "wrong",
+            "number", "phone", "airtime", "buy", "today", "there",
+        ],
+    ),
+    (
+        SW,
+        &[
+            "nataka", "kutuma", "tuma", "pesa", "salio", "angalia", "yangu", "wangu", "kwa", "na",
+            "ya", "wa", "za", "ni", "habari", "asante", "tafadhali", "akaunti", "hela", "nini",
+            "gani", "sasa", "leo", "kesho", "jana", "rafiki", "mama", "baba", "lipa", "kulipa",
+            "hii", "hiyo", "ndiyo", "hapana", "sana", "nimetuma", "imepotea", "nisaidie", "msaada",
+            "yako", "kiasi", "shilingi", "bado", "mimi", "wewe", "sijapokea", "kupokea", "pokea",
+            "jambo", "ndugu", "kaka", "dada", "kununua", "nunua", "muda", "je", "ngapi", "iko",
+            "kiko", "tatizo", "simu", "sawa", "ndio",
+        ],
+    ),
+    (
+        FR,
+        &[
+            "je", "tu", "il", "nous", "vous", "le", "la", "les", "un", "une", "des", "de", "du",
+            "et", "est", "pas", "ne", "mon", "ma", "mes", "veux", "voudrais", "envoyer", "argent",
+            "solde", "compte", "bonjour", "merci", "s'il", "plaît", "comment", "combien", "pour",
+            "avec", "à", "au", "aux", "que", "qui", "transfert", "payer", "facture", "aide",
+            "aider", "oui", "non", "ce", "cette", "sur", "dans", "mère", "père", "frère", "ami",
+            "reçu", "j'ai", "n'ai", "voir", "mon", "crédit", "acheter",
+        ],
+    ),
+    (
+        PT,
+        &[
+            "eu", "quero", "enviar", "dinheiro", "saldo", "conta", "olá", "obrigado", "obrigada",
+            "por", "favor", "para", "com", "não", "sim", "meu", "minha", "o", "os", "um", "uma",
+            "de", "do", "da", "dos", "das", "e", "é", "que", "como", "quanto", "pagar",
+            "transferência", "ajuda", "preciso", "você", "bom", "dia", "está", "verificar", "onde",
+            "mãe", "pai", "irmão", "amigo", "recebi", "comprar", "tenho",
+        ],
+    ),
+    (
+        WO,
+        &[
+            "dama", "bëgg", "begg", "yónni", "yonni", "xaalis", "sama", "yow", "man", "nanga",
+            "def", "jërëjëf", "jerejef", "waaw", "déedéet", "deedeet", "ci", "ak", "la", "na",
+            "ngi", "dafa", "dinaa", "fan", "lan", "naka", "xam", "am", "jàmm", "jamm", "leegi",
+            "tey", "bi", "yi", "gi", "mu", "ñu", "moo", "ndax", "wax", "jënd", "jend", "fey",
+            "seet", "sa", "li", "yaay", "baay", "xarit", "mag", "rakk", "nangadef", "damay",
+        ],
+    ),
+    (
+        HA,
+        &[
+            "ina", "son", "aika", "kuɗi", "kudi", "sannu", "nagode", "na", "gode", "don", "allah",
+            "da", "ba", "ne", "ce", "wannan", "yaya", "nawa", "ni", "kai", "ke", "mu", "su", "shi",
+            "ita", "zan", "za", "kuma", "amma", "akwai", "babu", "asusun", "biya", "taimako", "yau",
+            "gobe", "lafiya", "ka", "ki", "tura", "duba", "saura", "uwata", "ɗan", "dan", "uwa",
+            "aboki", "abokina", "kiredit", "saya", "ban",
+        ],
+    ),
+    (
+        YO,
+        &[
+            "mo", "fẹ́", "fẹ", "fe", "fi", "owó", "owo", "ranṣẹ", "ranse", "sí", "si", "ẹ", "e",
+            "jọ", "jọwọ", "jowo", "ọ̀rẹ́", "ọrẹ", "ore", "bawo", "báwo", "ni", "kò", "ko", "ṣé",
+            "se", "mi", "rẹ", "re", "wa", "elo", "mélòó", "melo", "o", "ati", "àti", "ninu", "lati",
+            "láti", "yìí", "yii", "náà", "naa", "sanwo", "san", "ìyá", "iya", "bàbá", "ẹ̀gbọ́n",
+            "ẹgbọn", "ṣe", "kan", "ti", "gba", "mọ", "ra",
+        ],
+    ),
+    (
+        LG,
+        &[
+            "njagala", "okusindika", "sindika", "sente", "ssente", "ku", "nkusaba", "webale",
+            "weebale", "oli", "otya", "bulungi", "gyendi", "nga", "era", "naye", "kati", "leero",
+            "enkya", "mukwano", "omukwano", "ensimbi", "akawunti", "okusasula", "sasula", "nze",
+            "ggwe", "ye", "ffe", "mmwe", "bo", "kino", "ekyo", "wa", "ki", "mmeka", "bbanja",
+            "yamba", "nnyo", "ssebo", "nnyabo", "gyange", "wange", "yange", "ndaba", "laba",
+            "maama", "taata", "muganda", "mwannyinaze", "okugula", "gula",
+        ],
+    ),
+];
+
+/// Character n-grams (1-4 chars, `_` marks a word boundary) that are
+/// characteristic of a language, with their weight.
+#[rustfmt::skip]
+const NGRAMS: &[(usize, f32, &[&str])] = &[
+    (
+        EN,
+        0.6,
+        &[
+            "_th", "th_", "ing_", "the", "_wh", "ght", "ck_", "ck", "ly_", "ed_", "ow_", "ea", "ou",
+            "y_", "_my", "er_", "ll_", "'s_", "'t_",
+        ],
+    ),
+    (
+        SW,
+        0.6,
+        &[
+            "_ku", "_wa", "nch", "ch", "_mb", "_nd", "_ny", "_ki", "_ni", "aka", "ish", "_mw",
+            "_mt", "_mk", "_ya", "uwa", "ika_", "isha", "_ali", "_ime", "_ata", "_ana", "_nime",
+            "_tu", "_si", "_hu", "dh", "gh", "a_", "i_", "_ji",
+        ],
+    ),
+    (
+        FR,
+        0.6,
+        &[
+            "eau", "ou", "_qu", "qu'", "ais", "ait_", "_d'", "_l'", "_j'", "_n'", "ez_", "oi",
+            "ent_", "é", "è", "ê", "ç", "à", "ù", "œ", "â", "î", "ô", "eux", "aux_", "er_", "_les",
+            "tion", "ion_", "ette", "ille", "ue_",
+        ],
+    ),
+    (
+        PT,
+        0.6,
+        &[
+            "ão", "õe", "ã", "õ", "nh", "lh", "ção", "inh", "ei", "ar_", "os_", "as_", "á", "é",
+            "í", "ú", "ç", "ê", "ô", "_qu", "ado_", "ada_", "eir", "ro_",
+        ],
+    ),
+    (
+        WO,
+        0.7,
+        &[
+            "ë", "ñ", "_x", "x", "aa", "ee", "oo", "uu", "_ng", "_mb", "_nd", "_nj", "_ñ", "àmm",
+            "ay_", "ëg", "_yo", "óo", "éé", "_ci", "_ak",
+        ],
+    ),
+    (
+        HA,
+        0.7,
+        &[
+            "ɓ", "ɗ", "ƙ", "ƴ", "ts", "kw", "gw", "'y", "_za", "_ba", "_sh", "ai_", "au_", "wa_",
+            "_ƙ", "an_", "ina", "ann", "ata_", "_ya", "iya",
+        ],
+    ),
+    (
+        YO,
+        0.8,
+        &[
+            "ẹ", "ọ", "ṣ", "\u{0323}", "gb", "kp", "_gb", "wọ", "_ẹ", "_ọ", "ò", "ì", "à", "è", "ú",
+            "ó", "í", "á", "é", "wo_", "_ti", "_fi",
+        ],
+    ),
+    (
+        LG,
+        0.7,
+        &[
+            "bb", "gg", "kk", "ll", "mm", "nn", "ss", "tt", "zz", "ff", "_ok", "_ek", "_en", "_om",
+            "_ob", "_ku", "ky", "gy", "_ng", "aa", "ee", "oo", "ŋ", "ny", "_ny", "_nj", "_ss",
+            "_nn", "a_",
+        ],
+    ),
+];
+
+const MAX_NGRAM_CHARS: usize = 4;
+const WORD_WEIGHT: f32 = 2.5;
+/// Below this confidence callers should treat the answer as a guess.
+pub(crate) const MIN_CONFIDENCE: f64 = 0.5;
+/// Pseudo-count added to the evidence total, so one weak hit doesn't
+/// produce a confident answer.
+const PRIOR: f32 = 1.0;
+
+struct Tables {
+    words: HashMap<&'static str, Vec<(usize, f32)>>,
+    ngrams: HashMap<&'static str, Vec<(usize, f32)>>,
+}
+
+fn tables() -> &'static Tables {
+    static TABLES: OnceLock<Tables> = OnceLock::new();
+    TABLES.get_or_init(|| {
+        let mut shared: HashMap<&'static str, Vec<usize>> = HashMap::new();
+        for &(lang, words) in LEXICON {
+            for &word in words {
+                let langs = shared.entry(word).or_default();
+                if !langs.contains(&lang) {
+                    langs.push(lang);
+                }
+            }
+        }
+        let words = shared
+            .into_iter()
+            .map(|(word, langs)| {
+                let weight = WORD_WEIGHT / langs.len() as f32;
+                (word, langs.into_iter().map(|l| (l, weight)).collect())
+            })
+            .collect();
+
+        let mut ngrams: HashMap<&'static str, Vec<(usize, f32)>> = HashMap::new();
+        for &(lang, weight, grams) in NGRAMS {
+            for &gram in grams {
+                ngrams.entry(gram).or_default().push((lang, weight));
+            }
+        }
+
+        Tables { words, ngrams }
+    })
+}
+
+/// Detected language and a confidence in [0, 1].
+pub(crate) struct Detection {
+    pub(crate) language: &'static Language,
+    pub(crate) confidence: f64,
+}
+
+fn is_ethiopic(c: char) -> bool {
+    matches!(c, '\u{1200}'..='\u{139F}' | '\u{2D80}'..='\u{2DDF}' | '\u{AB00}'..='\u{AB2F}')
+}
+
+fn is_arabic(c: char) -> bool {
+    matches!(
+        c,
+        '\u{0600}'..='\u{06FF}'
+            | '\u{0750}'..='\u{077F}'
+            | '\u{08A0}'..='\u{08FF}'
+            | '\u{FB50}'..='\u{FDFF}'
+            | '\u{FE70}'..='\u{FEFF}'
+    )
+}
+
+/// Non-Latin scripts decide the language outright.
+fn detect_script(tokens: &[&str]) -> Option<Detection> {
+    let (mut letters, mut ethiopic, mut arabic) = (0u32, 0u32, 0u32);
+    for c in tokens.iter().flat_map(|t| t.chars()) {
+        if !c.is_alphabetic() {
+            continue;
+        }
+        letters += 1;
+        if is_ethiopic(c) {
+            ethiopic += 1;
+        } else if is_arabic(c) {
+            arabic += 1;
+        }
+    }
+
+    let (lang, count) = if ethiopic >= arabic {
+        (AM, ethiopic)
+    } else {
+        (AR, arabic)
+    };
+    if letters == 0 || count * 2 <= letters {
+        return None;
+    }
+    Some(Detection {
+        language: &LANGUAGES[lang],
+        confidence: f64::from(count) / f64::from(letters),
+    })
+}
+
+/// Identify the language of already-tokenized text.
+///
+/// Returns None when there is no evidence at all (empty input, digits,
+/// unknown words with no characteristic n-grams).
+pub(crate) fn detect_tokens(tokens: &[&str]) -> Option<Detection> {
+    if let Some(detection) = detect_script(tokens) {
+        return Some(detection);
+    }
+
+    let tables = tables();
+    let mut scores = [0f32; LANGUAGES.len()];
+    let mut padded = String::new();
+    let mut bounds: Vec<usize> = Vec::new();
+
+    for token in tokens {
+        let lower = lowercase(token);
+        if let Some(entries) = tables.words.get(lower.as_ref()) {
+            for &(lang, weight) in entries {
+                scores[lang] += weight;
+            }
+        }
+
+        padded.clear();
+        padded.push('_');
+        padded.push_str(&lower);
+        padded.push('_');
+        bounds.clear();
+        bounds.extend(padded.char_indices().map(|(i, _)| i));
+        bounds.push(padded.len());
+
+        // Every substring of 1..=MAX_NGRAM_CHARS chars. N-gram evidence is
+        // scaled by token length so long words don't drown out the lexicon.
+        let scale = 1.0 / (bounds.len() - 1) as f32;
+        for start in 0..bounds.len() - 1 {
+            let last = (start + MAX_NGRAM_CHARS).min(bounds.len() - 1);
+            for end in start + 1..=last {
+                if let Some(entries) = tables.ngrams.get(&padded[bounds[start]..bounds[end]]) {
+                    for &(lang, weight) in entries {
+                        scores[lang] += weight * scale;
+                    }
+                }
+            }
+        }
+    }
+
+    let total: f32 = scores.iter().sum();
+    if total <= 0.0 {
+        return None;
+    }
+    let mut best = 0;
+    for (lang, &score) in scores.iter().enumerate() {
+        if score > scores[best] {
+            best = lang;
+        }
+    }
+    Some(Detection {
+        language: &LANGUAGES[best],
+        confidence: f64::from(scores[best] / (total + PRIOR)),
+    })
+}
+
+pub(crate) fn detect(text: &str) -> Option<Detection> {
+    let tokens: Vec<&str> = text.unicode_words().collect();
+    detect_tokens(&tokens)
+}
+
+fn to_dict<'py>(py: Python<'py>, detection: &Detection) -> PyResult<Bound<'py, PyDict>> {
+    let dict = PyDict::new(py);
+    dict.set_item("language", detection.language.name)?;
+    dict.set_item("code", detection.language.code)?;
+    dict.set_item("confidence", detection.confidence)?;
+    Ok(dict)
+}
+
+/// Fast language identification for short utterances.
+///
+/// Covers English, Swahili, French, Portuguese, Arabic, Amharic, Wolof,
+/// Hausa, Yoruba and Luganda with precomputed lexicon and character n-gram
+/// tables (Arabic and Amharic by script). Returns
+/// {"language": "french", "code": "fr", "confidence": 0.83}, or None when
+/// the text carries no evidence — callers fall back to langdetect.
+#[pyfunction]
+pub fn identify_language<'py>(py: Python<'py>, text: &str) -> PyResult<Option<Bound<'py, PyDict>>> {
+    detect(text).map(|d| to_dict(py, &d)).transpose()
+}
+
+/// `identify_language` over a list, with the GIL released while detecting.
+#[pyfunction]
+pub fn identify_language_batch<'py>(
+    py: Python<'py>,
+    texts: Vec<String>,
+) -> PyResult<Bound<'py, PyList>> {
+    let detections: Vec<Option<Detection>> =
+        py.allow_threads(|| texts.iter().map(|t| detect(t)).collect());
+
+    let list = PyList::empty(py);
+    for detection in &detections {
+        match detection {
+            Some(d) => list.append(to_dict(py, d)?)?,
+            None => list.append(py.None())?,
+        }
+    }
+    Ok(list)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn name(text: &str) -> &'static str {
+        detect(text).map_or("none", |d| d.language.name)
+    }
+
+    #[test]
+    fn test_latin_script_languages() {
+        assert_eq!(name("show me my recent transactions"), "english");
+        assert_eq!(name("nataka kutuma pesa kwa rafiki"), "swahili");
+        assert_eq!(name("Je veux envoyer de l'argent"), "french");
+        assert_eq!(name("Quero enviar dinheiro para minha mãe"), "portuguese");
+        assert_eq!(name("Dama bëgg yónni xaalis"), "wolof");
+        assert_eq!(name("Ina son aika kuɗi"), "hausa");
+        assert_eq!(name("Mo fẹ́ fi owó ranṣẹ"), "yoruba");
+        assert_eq!(name("Njagala okusindika ssente"), "luganda");
+    }
+
+    #[test]
+    fn test_script_languages() {
+        assert_eq!(name("أريد إرسال المال"), "arabic");
+        assert_eq!(name("ገንዘብ መላክ እፈልጋለሁ"), "amharic");
+    }
+
+    #[test]
+    fn test_no_evidence_is_none() {
+        assert!(detect("").is_none());
+        assert!(detect("12345 !!").is_none());
+    }
+
+    #[test]
+    fn test_confidence_is_bounded() {
+        let d = detect("hello").unwrap();
+        assert_eq!(d.language.code, "en");
+        assert!(d.confidence > 0.0 && d.confidence < 1.0);
+    }
+}
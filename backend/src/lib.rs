@@ -1,4 +1,6 @@
 mod bedrock;
+mod intent;
+mod langid;
 mod submission;
 mod voice;
 
@@ -7,21 +9,40 @@ use pyo3::prelude::*;
 /// Wave backend — Rust bindings for resume submission, voice classification,
 /// and Bedrock ML inference.
 ///
-/// Language detection moved to pure Python (langdetect library) — no longer
-/// needs Rust serialization helpers.
+/// Full language detection lives in Python (langdetect); `identify_language`
+/// is the fast path for short utterances in the 10 supported languages.
 ///
 /// ```
 /// // Usage from Python:
-/// //   from wave_backend import submit_resume, classify_intent
+/// //   from wave_backend import submit_resume, submit_many, classify_intent
+/// //   from wave_backend import classify_intent_dict, classify_intent_batch
+/// //   from wave_backend import IntentClassifier
+/// //   from wave_backend import identify_language, identify_language_batch
 /// //   from wave_backend import build_sentiment_request, parse_sentiment_response
-/// //   from wave_backend import build_embedding_request
+/// //   from wave_backend import build_sentiment_batch_requests, parse_sentiment_batch_response
+/// //   from wave_backend import build_embedding_request, SentimentStreamParser
 /// ```
 #[pymodule]
 fn wave_backend(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(submission::submit_resume, m)?)?;
+    m.add_function(wrap_pyfunction!(submission::submit_many, m)?)?;
     m.add_function(wrap_pyfunction!(voice::classify_intent, m)?)?;
+    m.add_function(wrap_pyfunction!(voice::classify_intent_dict, m)?)?;
+    m.add_function(wrap_pyfunction!(voice::classify_intent_batch, m)?)?;
+    m.add_class::<intent::IntentClassifier>()?;
+    m.add_function(wrap_pyfunction!(langid::identify_language, m)?)?;
+    m.add_function(wrap_pyfunction!(langid::identify_language_batch, m)?)?;
     m.add_function(wrap_pyfunction!(bedrock::build_sentiment_request, m)?)?;
     m.add_function(wrap_pyfunction!(bedrock::parse_sentiment_response, m)?)?;
+    m.add_function(wrap_pyfunction!(
+        bedrock::build_sentiment_batch_requests,
+        m
+    )?)?;
+    m.add_function(wrap_pyfunction!(
+        bedrock::parse_sentiment_batch_response,
+        m
+    )?)?;
     m.add_function(wrap_pyfunction!(bedrock::build_embedding_request, m)?)?;
+    m.add_class::<bedrock::SentimentStreamParser>()?;
     Ok(())
 }
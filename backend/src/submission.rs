@@ -1,70 +1,457 @@
-use pyo3::exceptions::PyValueError;
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::sync::OnceLock;
+use std::thread;
+use std::time::Duration;
+
+use pyo3::exceptions::{PyConnectionError, PyRuntimeError, PyTimeoutError, PyValueError};
 use pyo3::prelude::*;
 use reqwest::blocking::Client;
 use reqwest::header::{AUTHORIZATION, CONTENT_TYPE};
 
 const WAVE_API_URL: &str = "https://api.wave.com/v1/submissions";
 
+/// (status_code, body) or a transport/validation error message.
+type Response = Result<(u16, String), String>;
+
+/// Error prefixes callers can match on. NOT_SENT: the connection was never
+/// made, so nothing reached the API. NO_RESPONSE: the request went out but
+/// no usable response came back (timed out, connection dropped), so the API
+/// may have accepted it.
+const NOT_SENT: &str = "request failed";
+const NO_RESPONSE: &str = "no response";
+
+fn env_u64(name: &str, default: u64) -> u64 {
+    std::env::var(name)
+        .ok()
+        .and_then(|v| v.parse().ok())
+        .unwrap_or(default)
+}
+
+/// Submission endpoint; WAVE_API_URL overrides it (staging, local stubs).
+fn api_url() -> String {
+    std::env::var("WAVE_API_URL").unwrap_or_else(|_| WAVE_API_URL.to_owned())
+}
+
+/// Process-wide HTTP client. Reusing it keeps connections (and their TLS
+/// sessions) alive across submissions and warm Lambda invocations.
+///
+/// Timeouts come from WAVE_HTTP_TIMEOUT_S (default 10) and
+/// WAVE_HTTP_CONNECT_TIMEOUT_S (default 5), read once on first use.
+fn client() -> Result<&'static Client, String> {
+    static CLIENT: OnceLock<Result<Client, String>> = OnceLock::new();
+    CLIENT
+        .get_or_init(|| {
+            Client::builder()
+                .timeout(Duration::from_secs(env_u64("WAVE_HTTP_TIMEOUT_S", 10)))
+                .connect_timeout(Duration::from_secs(env_u64(
+                    "WAVE_HTTP_CONNECT_TIMEOUT_S",
+                    5,
+                )))
+                .pool_idle_timeout(Duration::from_secs(90))
+                .pool_max_idle_per_host(16)
+                .tcp_keepalive(Duration::from_secs(60))
+                .build()
+                .map_err(|e| format!("failed to build HTTP client: {e}"))
+        })
+        .as_ref()
+        .map_err(Clone::clone)
+}
+
+/// Exponential backoff for 5xx responses and connection errors. A request
+/// that timed out may already have been processed, so it is not retried:
+/// the submission endpoint is not idempotent.
+struct RetryPolicy {
+    max_retries: u32,
+    base: Duration,
+    cap: Duration,
+}
+
+impl RetryPolicy {
+    /// WAVE_HTTP_MAX_RETRIES (default 3) and WAVE_HTTP_BACKOFF_MS (default 100).
+    fn from_env() -> Self {
+        RetryPolicy {
+            max_retries: env_u64("WAVE_HTTP_MAX_RETRIES", 3) as u32,
+            base: Duration::from_millis(env_u64("WAVE_HTTP_BACKOFF_MS", 100)),
+            cap: Duration::from_secs(2),
+        }
+    }
+
+    fn delay(&self, attempt: u32) -> Duration {
+        self.base.saturating_mul(1 << attempt.min(16)).min(self.cap)
+    }
+}
+
+fn validate(payload_json: &str) -> Result<(), String> {
+    serde_json::from_str::<serde_json::Value>(payload_json)
+        .map(|_| ())
+        .map_err(|e| format!("invalid JSON payload: {e}"))
+}
+
+/// POST one payload, retrying per the policy. A 5xx that survives every
+/// retry is returned as a normal (status, body) result; transport errors
+/// start with NOT_SENT or NO_RESPONSE.
+fn post(
+    client: &Client,
+    url: &str,
+    payload_json: &str,
+    token: &str,
+    policy: &RetryPolicy,
+) -> Response {
+    let mut attempt = 0;
+    loop {
+        let result = client
+            .post(url)
+            .header(AUTHORIZATION, format!("Bearer {token}"))
+            .header(CONTENT_TYPE, "application/json")
+            .body(payload_json.to_owned())
+            .send();
+
+        let retryable = match &result {
+            Ok(resp) => resp.status().is_server_error(),
+            Err(e) => e.is_connect(),
+        };
+        if retryable && attempt < policy.max_retries {
+            thread::sleep(policy.delay(attempt));
+            attempt += 1;
+            continue;
+        }
+
+        let resp = result.map_err(|e| {
+            let kind = if e.is_connect() {
+                NOT_SENT
+            } else {
+                NO_RESPONSE
+            };
+            format!("{kind}: {e}")
+        })?;
+        let status = resp.status().as_u16();
+        let body = resp
+            .text()
+            .map_err(|e| format!("{NO_RESPONSE}: failed to read response body: {e}"))?;
+        return Ok((status, body));
+    }
+}
+
+/// POST every payload using at most `max_concurrency` worker threads.
+/// Results are returned in input order.
+fn post_many(
+    client: &Client,
+    url: &str,
+    payloads: &[String],
+    token: &str,
+    max_concurrency: usize,
+    policy: &RetryPolicy,
+) -> Vec<Response> {
+    let next = AtomicUsize::new(0);
+    let workers = max_concurrency.clamp(1, payloads.len().max(1));
+    // One slot per payload, so a worker that panics leaves its unfinished
+    // payloads empty instead of dropping the ones it had already sent.
+    let slots: Vec<OnceLock<Response>> = payloads.iter().map(|_| OnceLock::new()).collect();
+
+    thread::scope(|scope| {
+        let handles: Vec<_> = (0..workers)
+            .map(|_| {
+                scope.spawn(|| loop {
+                    let i = next.fetch_add(1, Ordering::Relaxed);
+                    let Some(payload) = payloads.get(i) else {
+                        return;
+                    };
+                    let result =
+                        validate(payload).and_then(|()| post(client, url, payload, token, policy));
+                    let _ = slots[i].set(result);
+                })
+            })
+            .collect();
+        // Joining here keeps the scope from re-raising a worker's panic;
+        // the empty slots below report it per payload instead.
+        for handle in handles {
+            let _ = handle.join();
+        }
+    });
+
+    slots
+        .into_iter()
+        .map(|slot| {
+            slot.into_inner()
+                .unwrap_or_else(|| Err("submit worker panicked before finishing".to_owned()))
+        })
+        .collect()
+}
+
 /// Submit a resume payload to the Wave API.
 ///
 /// Takes a JSON string and bearer token, POSTs to the Wave submission endpoint,
 /// and returns (status_code, response_body). Fails fast on malformed JSON or
 /// missing auth — no silent swallowing of errors.
+///
+/// Uses the pooled client, retries 5xx and connection errors with
+/// exponential backoff, and releases the GIL while waiting on the network.
+///
+/// Rejected input (empty token, malformed JSON) raises ValueError. A
+/// connection that could not be made (after retries) raises ConnectionError:
+/// nothing was sent. A request that went out without a usable response
+/// (timed out, connection dropped) raises TimeoutError: the API may have
+/// accepted it, so the caller must not post it again. submit_many reports
+/// the same failures as (0, message), the message starting with
+/// "request failed" or "no response" respectively.
 #[pyfunction]
-pub fn submit_resume(payload_json: &str, token: &str) -> PyResult<(u16, String)> {
+pub fn submit_resume(py: Python<'_>, payload_json: &str, token: &str) -> PyResult<(u16, String)> {
     if token.is_empty() {
         return Err(PyValueError::new_err("token must not be empty"));
     }
 
     // Validate JSON before sending it over the wire.
-    let _: serde_json::Value = serde_json::from_str(payload_json)
-        .map_err(|e| PyValueError::new_err(format!("invalid JSON payload: {e}")))?;
-
-    let client = Client::new();
-    let resp = client
-        .post(WAVE_API_URL)
-        .header(AUTHORIZATION, format!("Bearer {token}"))
-        .header(CONTENT_TYPE, "application/json")
-        .body(payload_json.to_owned())
-        .send()
-        .map_err(|e| PyValueError::new_err(format!("request failed: {e}")))?;
-
-    let status = resp.status().as_u16();
-    let body = resp
-        .text()
-        .map_err(|e| PyValueError::new_err(format!("failed to read response body: {e}")))?;
-
-    Ok((status, body))
+    validate(payload_json).map_err(PyValueError::new_err)?;
+
+    let client = client().map_err(PyRuntimeError::new_err)?;
+    let url = api_url();
+    let policy = RetryPolicy::from_env();
+    py.allow_threads(|| post(client, &url, payload_json, token, &policy))
+        .map_err(|e| {
+            if e.starts_with(NO_RESPONSE) {
+                PyTimeoutError::new_err(e)
+            } else {
+                PyConnectionError::new_err(e)
+            }
+        })
+}
+
+/// Submit many payloads concurrently (at most `max_concurrency` in flight).
+///
+/// Returns one (status_code, response_body) per payload, in order. A
+/// payload that is invalid JSON or fails in transport gets status 0 and the
+/// error message as its body, so one bad item doesn't fail the batch.
+#[pyfunction]
+#[pyo3(signature = (payloads, token, max_concurrency=8))]
+pub fn submit_many(
+    py: Python<'_>,
+    payloads: Vec<String>,
+    token: &str,
+    max_concurrency: usize,
+) -> PyResult<Vec<(u16, String)>> {
+    if token.is_empty() {
+        return Err(PyValueError::new_err("token must not be empty"));
+    }
+
+    let client = client().map_err(PyRuntimeError::new_err)?;
+    let url = api_url();
+    let policy = RetryPolicy::from_env();
+    let results =
+        py.allow_threads(|| post_many(client, &url, &payloads, token, max_concurrency, &policy));
+
+    Ok(results
+        .into_iter()
+        .map(|r| r.unwrap_or_else(|e| (0, e)))
+        .collect())
 }
 
 #[cfg(test)]
 mod tests {
     use super::*;
+    use std::io::{BufRead, BufReader, Read, Write};
+    use std::net::TcpListener;
+    use std::sync::Arc;
+
+    /// Minimal HTTP/1.1 server on 127.0.0.1: answers the n-th request with
+    /// `status(n)` after `delay`, one connection per request. Returns the
+    /// URL, the request counter and the peak number of concurrent requests.
+    fn stub_server(
+        status: fn(usize) -> u16,
+        delay: Duration,
+    ) -> (String, Arc<AtomicUsize>, Arc<AtomicUsize>) {
+        let listener = TcpListener::bind("127.0.0.1:0").unwrap();
+        let url = format!("http://{}/v1/submissions", listener.local_addr().unwrap());
+        let hits = Arc::new(AtomicUsize::new(0));
+        let peak = Arc::new(AtomicUsize::new(0));
+        let in_flight = Arc::new(AtomicUsize::new(0));
+
+        let (hits_srv, peak_srv) = (hits.clone(), peak.clone());
+        thread::spawn(move || {
+            for stream in listener.incoming() {
+                let mut stream = stream.unwrap();
+                let n = hits_srv.fetch_add(1, Ordering::SeqCst);
+                let (peak, in_flight) = (peak_srv.clone(), in_flight.clone());
+                thread::spawn(move || {
+                    let now = in_flight.fetch_add(1, Ordering::SeqCst) + 1;
+                    peak.fetch_max(now, Ordering::SeqCst);
+
+                    let mut reader = BufReader::new(stream.try_clone().unwrap());
+                    let mut length = 0;
+                    loop {
+                        let mut line = String::new();
+                        reader.read_line(&mut line).unwrap();
+                        if line == "\r\n" || line.is_empty() {
+                            break;
+                        }
+                        if let Some(v) = line.to_ascii_lowercase().strip_prefix("content-length:") {
+                            length = v.trim().parse().unwrap();
+                        }
+                    }
+                    let mut body = vec![0; length];
+                    reader.read_exact(&mut body).unwrap();
+
+                    thread::sleep(delay);
+                    in_flight.fetch_sub(1, Ordering::SeqCst);
+                    let reply = format!("{{\"request\":{n}}}");
+                    // The client may have given up waiting already.
+                    let _ = write!(
+                        stream,
+                        "HTTP/1.1 {} X\r\nContent-Length: {}\r\nConnection: close\r\n\r\n{}",
+                        status(n),
+                        reply.len(),
+                        reply
+                    );
+                });
+            }
+        });
+        (url, hits, peak)
+    }
+
+    fn fast_policy(max_retries: u32) -> RetryPolicy {
+        RetryPolicy {
+            max_retries,
+            base: Duration::from_millis(1),
+            cap: Duration::from_millis(5),
+        }
+    }
 
     #[test]
     fn test_submit_resume_returns_tuple() {
         // We can't hit the real API in unit tests, but we can verify that
         // the function signature and error paths work correctly.
         // A valid JSON + empty token should fail before any network call.
-        let result = submit_resume(r#"{"name": "Eric"}"#, "");
-        assert!(result.is_err());
-        let err_msg = format!("{}", result.unwrap_err());
-        assert!(err_msg.contains("token must not be empty"));
+        Python::with_gil(|py| {
+            let result = submit_resume(py, r#"{"name": "Eric"}"#, "");
+            assert!(result.is_err());
+            let err_msg = format!("{}", result.unwrap_err());
+            assert!(err_msg.contains("token must not be empty"));
+        });
     }
 
     #[test]
     fn test_invalid_json_handling() {
-        let result = submit_resume("not json at all", "some-token");
-        assert!(result.is_err());
-        let err_msg = format!("{}", result.unwrap_err());
-        assert!(err_msg.contains("invalid JSON payload"));
+        Python::with_gil(|py| {
+            let result = submit_resume(py, "not json at all", "some-token");
+            assert!(result.is_err());
+            let err_msg = format!("{}", result.unwrap_err());
+            assert!(err_msg.contains("invalid JSON payload"));
+        });
     }
 
     #[test]
     fn test_empty_token_handling() {
-        let result = submit_resume(r#"{"valid": true}"#, "");
-        assert!(result.is_err());
-        let err_msg = format!("{}", result.unwrap_err());
-        assert!(err_msg.contains("token must not be empty"));
+        Python::with_gil(|py| {
+            let result = submit_resume(py, r#"{"valid": true}"#, "");
+            assert!(result.is_err());
+            let err_msg = format!("{}", result.unwrap_err());
+            assert!(err_msg.contains("token must not be empty"));
+        });
+    }
+
+    #[test]
+    fn test_retries_server_errors_then_succeeds() {
+        let (url, hits, _) = stub_server(|n| if n < 2 { 503 } else { 201 }, Duration::ZERO);
+        let client = Client::new();
+        let (status, body) = post(&client, &url, "{}", "t", &fast_policy(3)).unwrap();
+        assert_eq!(status, 201);
+        assert_eq!(body, r#"{"request":2}"#);
+        assert_eq!(hits.load(Ordering::SeqCst), 3);
+    }
+
+    #[test]
+    fn test_gives_up_with_last_server_error() {
+        let (url, hits, _) = stub_server(|_| 502, Duration::ZERO);
+        let client = Client::new();
+        let (status, _) = post(&client, &url, "{}", "t", &fast_policy(2)).unwrap();
+        assert_eq!(status, 502);
+        assert_eq!(hits.load(Ordering::SeqCst), 3);
+    }
+
+    #[test]
+    fn test_client_errors_are_not_retried() {
+        let (url, hits, _) = stub_server(|_| 400, Duration::ZERO);
+        let client = Client::new();
+        let (status, _) = post(&client, &url, "{}", "t", &fast_policy(3)).unwrap();
+        assert_eq!(status, 400);
+        assert_eq!(hits.load(Ordering::SeqCst), 1);
+    }
+
+    #[test]
+    fn test_connection_failures_raise_connection_error() {
+        let port = TcpListener::bind("127.0.0.1:0")
+            .unwrap()
+            .local_addr()
+            .unwrap()
+            .port();
+        std::env::set_var("WAVE_API_URL", format!("http://127.0.0.1:{port}/"));
+        std::env::set_var("WAVE_HTTP_MAX_RETRIES", "0");
+        Python::with_gil(|py| {
+            let err = submit_resume(py, "{}", "some-token").unwrap_err();
+            assert!(err.is_instance_of::<PyConnectionError>(py));
+            assert!(err.to_string().contains("request failed"));
+
+            let err = submit_resume(py, "not json", "some-token").unwrap_err();
+            assert!(err.is_instance_of::<PyValueError>(py));
+
+            let results = submit_many(py, vec!["{}".to_owned()], "some-token", 1).unwrap();
+            assert_eq!(results[0].0, 0);
+            assert!(results[0].1.contains("request failed"));
+        });
+    }
+
+    #[test]
+    fn test_read_timeouts_are_not_retried() {
+        let (url, hits, _) = stub_server(|_| 200, Duration::from_millis(300));
+        let client = Client::builder()
+            .timeout(Duration::from_millis(50))
+            .build()
+            .unwrap();
+        let err = post(&client, &url, "{}", "t", &fast_policy(3)).unwrap_err();
+        assert!(err.starts_with(NO_RESPONSE));
+        thread::sleep(Duration::from_millis(50));
+        assert_eq!(hits.load(Ordering::SeqCst), 1);
+    }
+
+    #[test]
+    fn test_connection_refused_is_an_error() {
+        let port = TcpListener::bind("127.0.0.1:0")
+            .unwrap()
+            .local_addr()
+            .unwrap()
+            .port();
+        let url = format!("http://127.0.0.1:{port}/");
+        let err = post(&Client::new(), &url, "{}", "t", &fast_policy(1)).unwrap_err();
+        assert!(err.contains("request failed"));
+    }
+
+    #[test]
+    fn test_post_many_caps_concurrency_and_keeps_order() {
+        let (url, hits, peak) = stub_server(|_| 200, Duration::from_millis(50));
+        let mut payloads: Vec<String> = (0..12).map(|i| format!("{{\"i\":{i}}}")).collect();
+        payloads[5] = "not json".to_string();
+
+        let results = post_many(&Client::new(), &url, &payloads, "t", 4, &fast_policy(0));
+
+        assert_eq!(results.len(), 12);
+        assert!(results[5].as_ref().unwrap_err().contains("invalid JSON"));
+        assert!(results
+            .iter()
+            .enumerate()
+            .all(|(i, r)| i == 5 || r.as_ref().unwrap().0 == 200));
+        assert_eq!(hits.load(Ordering::SeqCst), 11);
+        assert!(peak.load(Ordering::SeqCst) <= 4);
+        assert!(peak.load(Ordering::SeqCst) > 1);
+    }
+
+    #[test]
+    fn test_backoff_is_exponential_and_capped() {
+        let policy = RetryPolicy {
+            max_retries: 10,
+            base: Duration::from_millis(100),
+            cap: Duration::from_secs(2),
+        };
+        assert_eq!(policy.delay(0), Duration::from_millis(100));
+        assert_eq!(policy.delay(3), Duration::from_millis(800));
+        assert_eq!(policy.delay(10), Duration::from_secs(2));
     }
 }
@@ -1,6 +1,9 @@
 use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList};
 use unicode_segmentation::UnicodeSegmentation;
 
+use crate::langid;
+
 /// Swahili keywords that signal non-English input.
 /// Deliberately conservative — we only flag Swahili if we see words that
 /// are unambiguously Swahili (or Sheng) in a fintech context.
@@ -8,42 +11,95 @@ const SWAHILI_KEYWORDS: &[&str] = &[
     "angalia", "balance", "tuma", "pesa", "salio", "kutuma", "akaunti",
 ];
 
-/// Classify the intent and language of a text input.
-///
-/// Tokenizes using Unicode word boundaries (handles scripts beyond ASCII),
-/// runs a simple keyword heuristic for language detection, and returns a
-/// JSON string: {"language": "swahili"|"english", "tokens": [...], "token_count": N}
-#[pyfunction]
-pub fn classify_intent(text: &str) -> PyResult<String> {
-    let tokens: Vec<&str> = text.unicode_words().collect();
+/// Tokenized text plus detected language. Tokens borrow from the input so
+/// classification itself allocates only the token vector.
+pub(crate) struct Classification<'a> {
+    pub(crate) language: &'static str,
+    pub(crate) tokens: Vec<&'a str>,
+}
 
-    let lower_tokens: Vec<String> = tokens.iter().map(|t| t.to_lowercase()).collect();
+fn is_swahili_keyword(token: &str) -> bool {
+    if token.is_ascii() {
+        SWAHILI_KEYWORDS
+            .iter()
+            .any(|kw| kw.eq_ignore_ascii_case(token))
+    } else {
+        let lower = token.to_lowercase();
+        SWAHILI_KEYWORDS.contains(&lower.as_str())
+    }
+}
 
-    let swahili_hits = lower_tokens
-        .iter()
-        .filter(|t| SWAHILI_KEYWORDS.contains(&t.as_str()))
-        .count();
+pub(crate) fn classify(text: &str) -> Classification<'_> {
+    let tokens: Vec<&str> = text.unicode_words().collect();
 
-    let language = if swahili_hits > 0 {
+    // Fintech keywords win outright (code-switched "tuma pesa" is Swahili
+    // traffic); otherwise ask the n-gram detector, defaulting to English.
+    let language = if tokens.iter().any(|t| is_swahili_keyword(t)) {
         "swahili"
     } else {
-        "english"
+        match langid::detect_tokens(&tokens) {
+            Some(d) if d.confidence >= langid::MIN_CONFIDENCE => d.language.name,
+            _ => "english",
+        }
     };
 
-    let token_strings: Vec<serde_json::Value> = tokens
-        .iter()
-        .map(|t| serde_json::Value::String(t.to_string()))
-        .collect();
+    Classification { language, tokens }
+}
+
+pub(crate) fn to_dict<'py>(
+    py: Python<'py>,
+    result: &Classification<'_>,
+) -> PyResult<Bound<'py, PyDict>> {
+    let dict = PyDict::new(py);
+    dict.set_item("language", result.language)?;
+    dict.set_item("tokens", PyList::new(py, result.tokens.iter().copied())?)?;
+    dict.set_item("token_count", result.tokens.len())?;
+    Ok(dict)
+}
+
+/// Classify the intent and language of a text input.
+///
+/// Tokenizes using Unicode word boundaries (handles scripts beyond ASCII),
+/// detects the language (Swahili fintech keywords first, then the `langid`
+/// fast detector, English when unsure), and returns a JSON string:
+/// {"language": "swahili"|"english"|"french"|..., "tokens": [...], "token_count": N}
+#[pyfunction]
+pub fn classify_intent(text: &str) -> PyResult<String> {
+    let result = classify(text);
 
     let result = serde_json::json!({
-        "language": language,
-        "tokens": token_strings,
-        "token_count": tokens.len(),
+        "language": result.language,
+        "tokens": result.tokens,
+        "token_count": result.tokens.len(),
     });
 
     Ok(result.to_string())
 }
 
+/// Same as `classify_intent`, but returns a Python dict built directly
+/// through PyO3 — no JSON serialize/parse round-trip on the hot path.
+#[pyfunction]
+pub fn classify_intent_dict<'py>(py: Python<'py>, text: &str) -> PyResult<Bound<'py, PyDict>> {
+    to_dict(py, &classify(text))
+}
+
+/// Classify a list of texts. Tokenization runs with the GIL released; only
+/// building the result dicts needs it. Returns one dict per input, in order.
+#[pyfunction]
+pub fn classify_intent_batch<'py>(
+    py: Python<'py>,
+    texts: Vec<String>,
+) -> PyResult<Bound<'py, PyList>> {
+    let results: Vec<Classification<'_>> =
+        py.allow_threads(|| texts.iter().map(|t| classify(t)).collect());
+
+    let list = PyList::empty(py);
+    for result in &results {
+        list.append(to_dict(py, result)?)?;
+    }
+    Ok(list)
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -93,4 +149,62 @@ mod tests {
         // "tuma" and "pesa" are Swahili keywords
         assert!(result["token_count"].as_u64().unwrap() >= 7);
     }
+
+    #[test]
+    fn test_other_languages_use_fast_detector() {
+        assert_eq!(classify("Je veux envoyer de l'argent").language, "french");
+        assert_eq!(classify("Njagala okusindika ssente").language, "luganda");
+        assert_eq!(classify("Grace").language, "english");
+    }
+
+    #[test]
+    fn test_keyword_match_is_case_insensitive() {
+        assert_eq!(classify("ANGALIA Salio").language, "swahili");
+    }
+
+    #[test]
+    fn test_classify_intent_dict_matches_string_api() {
+        Python::with_gil(|py| {
+            let text = "Tuma pesa kwa rafiki";
+            let dict = classify_intent_dict(py, text).unwrap();
+            let expected = parse_result(text);
+
+            let language: String = dict
+                .get_item("language")
+                .unwrap()
+                .unwrap()
+                .extract()
+                .unwrap();
+            let tokens: Vec<String> = dict.get_item("tokens").unwrap().unwrap().extract().unwrap();
+            let count: usize = dict
+                .get_item("token_count")
+                .unwrap()
+                .unwrap()
+                .extract()
+                .unwrap();
+
+            assert_eq!(language, expected["language"]);
+            assert_eq!(tokens, vec!["Tuma", "pesa", "kwa", "rafiki"]);
+            assert_eq!(count, 4);
+        });
+    }
+
+    #[test]
+    fn test_classify_intent_batch_preserves_order() {
+        Python::with_gil(|py| {
+            let texts = vec![
+                "angalia salio".to_string(),
+                String::new(),
+                "hello".to_string(),
+            ];
+            let list = classify_intent_batch(py, texts).unwrap();
+            assert_eq!(list.len(), 3);
+
+            let languages: Vec<String> = list
+                .iter()
+                .map(|d| d.get_item("language").unwrap().extract().unwrap())
+                .collect();
+            assert_eq!(languages, vec!["swahili", "english", "english"]);
+        });
+    }
 }
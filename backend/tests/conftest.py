@@ -0,0 +1,9 @@
+"""Put the Lambda task root (backend/python) on sys.path.
+
+Handlers import their sibling modules flat, exactly as they are laid out
+in the Lambda image, so tests need the same search path.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "python"))
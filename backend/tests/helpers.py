@@ -0,0 +1,126 @@
+"""Shared test doubles."""
+import json
+from typing import Any, Iterator, Optional
+
+
+class ReferenceClassifier:
+    """Stand-in for wave_backend.IntentClassifier.
+
+    Tokens and language are what the Rust tokenizer would have produced
+    (given by the test, or a whitespace split); intents are scored with the
+    Python reference index, so intent-mapping assertions still exercise the
+    handler's real INTENT_KEYWORDS table.
+    """
+
+    def __init__(self, language: str = "english", tokens: Optional[list[str]] = None) -> None:
+        self.language = language
+        self.tokens = tokens
+
+    def classify(self, text: str) -> dict[str, Any]:
+        from python.intent_index import match_intent
+
+        tokens = self.tokens if self.tokens is not None else text.split()
+        intent, confidence = match_intent(tokens)
+        return {
+            "language": self.language,
+            "tokens": tokens,
+            "token_count": len(tokens),
+            "intent": intent,
+            "confidence": confidence,
+        }
+
+    def classify_batch(self, texts: list[str]) -> list[dict[str, Any]]:
+        if isinstance(texts, str):
+            raise TypeError("Can't extract `str` to `Vec`")
+        return [self.classify(t) for t in texts]
+
+
+class FakeConditionalTable:
+    """In-memory DynamoDB table for IdempotencyStore.
+
+    Understands only the reservation condition: a put succeeds if the key is
+    new, the stored record failed, or its in-progress claim is stale.
+    """
+
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+
+    def put_item(self, Item: dict[str, Any], **kwargs: Any) -> None:
+        from botocore.exceptions import ClientError
+
+        key = (Item["PK"], Item["SK"])
+        existing = self.items.get(key)
+        if "ConditionExpression" in kwargs and existing is not None:
+            values = kwargs["ExpressionAttributeValues"]
+            takeover = existing["status"] == values[":failed"] or (
+                existing["status"] == values[":in_progress"]
+                and existing["reserved_at"] < values[":stale"]
+            )
+            if not takeover:
+                raise ClientError(
+                    {"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem"
+                )
+        self.items[key] = dict(Item)
+
+    def get_item(self, Key: dict[str, str], **kwargs: Any) -> dict[str, Any]:
+        item = self.items.get((Key["PK"], Key["SK"]))
+        return {"Item": dict(item)} if item is not None else {}
+
+    def delete_item(self, Key: dict[str, str]) -> None:
+        self.items.pop((Key["PK"], Key["SK"]), None)
+
+
+class FakeSentimentStream:
+    """Bedrock response stream that emits a Claude answer a few characters at a time.
+
+    Records how many events were consumed and whether the consumer closed
+    it, so tests can check the stream was cut off early.
+    """
+
+    def __init__(self, text: str, chunk_chars: int = 4) -> None:
+        deltas = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        self.events = [{"type": "message_start", "message": {}}] + [
+            {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": d}}
+            for d in deltas
+        ] + [{"type": "message_stop"}]
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for event in self.events:
+            if self.closed:
+                return
+            self.consumed += 1
+            yield {"chunk": {"bytes": json.dumps(event).encode("utf-8")}}
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeRollupTable:
+    """In-memory DynamoDB table for rollups: ADD-style update_item and query on PK."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+        self.updates = 0
+        self.fail = fail
+
+    def update_item(self, Key: dict[str, str], UpdateExpression: str, **kwargs: Any) -> None:
+        from botocore.exceptions import ClientError
+
+        self.updates += 1
+        if self.fail:
+            raise ClientError(
+                {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "UpdateItem"
+            )
+        names, values = kwargs["ExpressionAttributeNames"], kwargs["ExpressionAttributeValues"]
+        item = self.items.setdefault((Key["PK"], Key["SK"]), dict(Key))
+        adds = UpdateExpression.removeprefix("ADD ").split(" SET ")[0]
+        for pair in adds.split(", "):
+            name, value = pair.split()
+            item[names[name]] = item.get(names[name], 0) + values[value]
+        item.setdefault("ExpiresAt", values[":expires"])
+
+    def query(self, ExpressionAttributeValues: dict[str, str], **kwargs: Any) -> dict[str, Any]:
+        pk = ExpressionAttributeValues[":pk"]
+        return {"Items": [dict(i) for (p, _), i in sorted(self.items.items()) if p == pk]}
@@ -0,0 +1,86 @@
+"""Tests for lazy AWS clients and the cold-start/pre-warm hooks."""
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+from python.aws_clients import LazyClient, get_client, is_prewarm_event
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "python")
+
+
+class TestLazyClient:
+    def test_client_is_created_on_first_use_and_cached(self) -> None:
+        with patch("python.aws_clients.get_client") as mock_get_client:
+            client = LazyClient("events", "us-east-1", connect_timeout=5)
+            mock_get_client.assert_not_called()
+
+            client.put_events(Entries=[])
+            client.put_events(Entries=[])
+            mock_get_client.assert_called_with("events", "us-east-1", connect_timeout=5)
+            assert mock_get_client.return_value.put_events.call_count == 2
+
+    def test_get_client_is_process_wide(self) -> None:
+        assert get_client("events", "us-east-1") is get_client("events", "us-east-1")
+
+    def test_concurrent_first_use_builds_one_client(self) -> None:
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest.mock import MagicMock
+
+        session = MagicMock()
+        active = []
+
+        def build(*args, **kwargs):  # type: ignore[no-untyped-def]
+            active.append(threading.get_ident())
+            time.sleep(0.02)
+            assert len(active) == 1, "clients built concurrently"
+            active.pop()
+            return object()
+
+        session.client.side_effect = build
+        with patch("python.aws_clients._get_session", return_value=session):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                clients = list(pool.map(lambda _: get_client("sqs", "eu-west-1"), range(8)))
+        assert session.client.call_count == 1
+        assert all(c is clients[0] for c in clients)
+
+
+class TestColdStart:
+    def test_handler_imports_do_not_load_boto3_or_langdetect(self) -> None:
+        code = (
+            f"import sys; sys.path.insert(0, {PYTHON_DIR!r}); "
+            "import handler, voice_handler, bedrock_handler, sagemaker_handler; "
+            "print(sorted(m for m in ('boto3', 'langdetect') if m in sys.modules))"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "WAVE_PREWARM"}
+        out = subprocess.run(
+            [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+        )
+        assert out.stdout.strip() == "[]"
+
+    def test_language_detection_does_not_load_botocore(self) -> None:
+        code = (
+            f"import sys; sys.path.insert(0, {PYTHON_DIR!r}); "
+            "import sagemaker_handler; "
+            "print(sorted(m for m in sys.modules if m.split('.')[0] == 'botocore'))"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "WAVE_PREWARM"}
+        out = subprocess.run(
+            [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+        )
+        assert out.stdout.strip() == "[]"
+
+    def test_prewarm_event_short_circuits(self) -> None:
+        assert is_prewarm_event({"prewarm": True})
+        assert not is_prewarm_event({"text": "prewarm"})
+
+        from python import sagemaker_handler
+
+        with patch.object(sagemaker_handler, "prewarm") as prewarm:
+            result = sagemaker_handler.handler({"prewarm": True}, None)
+        prewarm.assert_called_once()
+        assert result["statusCode"] == 200
+        assert json.loads(result["body"]) == {"prewarmed": True}
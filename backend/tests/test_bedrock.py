@@ -0,0 +1,262 @@
+"""Tests for the Bedrock sentiment + embedding handler."""
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+
+def _slow(result, delay: float = 0.2):  # type: ignore[no-untyped-def]
+    def call(*args, **kwargs):  # type: ignore[no-untyped-def]
+        time.sleep(delay)
+        return result
+    return call
+
+
+SENTIMENT = {"sentiment": "negative", "category": "complaint", "confidence": 0.9}
+
+
+@pytest.fixture(autouse=True)
+def _bedrock_path():  # type: ignore[no-untyped-def]
+    """These tests cover the Bedrock path; test_cascade covers routing around it."""
+    with patch("python.bedrock_handler.CASCADE_ENABLED", False):
+        yield
+
+
+class TestConcurrentInference:
+    def test_sentiment_and_embedding_run_in_parallel(self) -> None:
+        with patch("python.bedrock_handler.analyze_sentiment", _slow(SENTIMENT)), \
+                patch("python.bedrock_handler.generate_embedding", _slow([0.1] * 256)), \
+                patch("python.bedrock_handler.persist_result", return_value="abc123"):
+            from python.bedrock_handler import handler
+
+            start = time.monotonic()
+            result = handler({"text": "pesa yangu imepotea", "language": "swahili"}, None)
+            elapsed = time.monotonic() - start
+
+            assert result["statusCode"] == 200
+            assert elapsed < 0.35
+            body = json.loads(result["body"])
+            assert body["embedding_dimensions"] == 256
+            assert {"classify", "sentiment", "embedding", "persist"} <= set(body["stage_latency_ms"])
+            assert body["stage_latency_ms"]["sentiment"] >= 200
+
+    def test_embedding_failure_still_persists_sentiment(self) -> None:
+        with patch("python.bedrock_handler.analyze_sentiment", return_value=SENTIMENT), \
+                patch("python.bedrock_handler.generate_embedding", side_effect=RuntimeError("throttled")), \
+                patch("python.bedrock_handler.persist_result", return_value="abc123") as mock_persist:
+            from python.bedrock_handler import handler
+
+            result = handler({"text": "send money failed", "language": "english"}, None)
+
+            assert result["statusCode"] == 200
+            body = json.loads(result["body"])
+            assert body["degraded"] == {"embedding": "throttled"}
+            assert body["embedding_dimensions"] == 0
+            assert mock_persist.call_args.kwargs["sentiment"] == SENTIMENT
+
+    def test_embedding_timeout_degrades(self) -> None:
+        with patch("python.bedrock_handler.analyze_sentiment", return_value=SENTIMENT), \
+                patch("python.bedrock_handler.generate_embedding", _slow([0.1], delay=0.5)), \
+                patch("python.bedrock_handler.EMBEDDING_TIMEOUT_S", 0.05), \
+                patch("python.bedrock_handler.persist_result", return_value="abc123"):
+            from python.bedrock_handler import handler
+
+            result = handler({"text": "hello", "language": "english"}, None)
+            body = json.loads(result["body"])
+            assert "timed out" in body["degraded"]["embedding"]
+
+    def test_sentiment_failure_returns_502(self) -> None:
+        with patch("python.bedrock_handler.analyze_sentiment", side_effect=RuntimeError("boom")), \
+                patch("python.bedrock_handler.generate_embedding", return_value=[0.1]), \
+                patch("python.bedrock_handler.persist_result") as mock_persist:
+            from python.bedrock_handler import handler
+
+            result = handler({"text": "hello", "language": "english"}, None)
+            assert result["statusCode"] == 502
+            mock_persist.assert_not_called()
+
+    @pytest.mark.parametrize("concurrent", [True, False])
+    def test_sequential_mode_matches(self, concurrent: bool) -> None:
+        with patch("python.bedrock_handler.BEDROCK_CONCURRENT", concurrent), \
+                patch("python.bedrock_handler.analyze_sentiment", return_value=SENTIMENT), \
+                patch("python.bedrock_handler.generate_embedding", return_value=[0.0] * 8):
+            from python.bedrock_handler import run_inference
+
+            sentiment, embedding, stage_ms, errors = run_inference("hello", "english")
+            assert sentiment == SENTIMENT
+            assert len(embedding) == 8
+            assert set(stage_ms) == {"sentiment", "embedding"}
+            assert errors == {}
+
+
+def _throttle() -> Exception:
+    from botocore.exceptions import ClientError
+
+    return ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "InvokeModel")
+
+
+class TestBatchIngestion:
+    def test_sqs_batch_dedupes_and_reports_partial_failures(self) -> None:
+        from python.result_cache import ResultCache
+
+        events = [
+            {"detail": {"text": "angalia salio", "language": "swahili"}},
+            {"detail": {"text": "Angalia  SALIO", "language": "swahili"}},
+            {"detail": {"text": "", "language": "swahili"}},
+            {"detail": {"text": "send money", "language": "english"}},
+        ]
+        records = [{"messageId": f"m{i}", "body": json.dumps(e)} for i, e in enumerate(events)]
+        records.append({"messageId": "bad", "body": "{not json"})
+
+        with patch("python.bedrock_handler.RESULT_CACHE", ResultCache()), \
+                patch("python.bedrock_handler.SENTIMENT_BATCH_SIZE", 1), \
+                patch("python.bedrock_handler.invoke_sentiment", return_value=SENTIMENT) as mock_sentiment, \
+                patch("python.bedrock_handler.invoke_embedding", return_value=[0.1] * 4), \
+                patch("python.bedrock_handler.persist_result", return_value="r1") as mock_persist:
+            from python.bedrock_handler import handler
+
+            result = handler({"Records": records}, None)
+
+            assert sorted(f["itemIdentifier"] for f in result["batchItemFailures"]) == ["bad", "m2"]
+            assert mock_sentiment.call_count == 2
+            assert mock_persist.call_count == 3
+
+    def test_failed_inference_fails_every_duplicate(self) -> None:
+        from python.result_cache import ResultCache
+
+        with patch("python.bedrock_handler.RESULT_CACHE", ResultCache()), \
+                patch("python.bedrock_handler.invoke_sentiment", side_effect=ValueError("bad JSON")), \
+                patch("python.bedrock_handler.invoke_embedding", return_value=[0.1]), \
+                patch("python.bedrock_handler.persist_result", return_value="r1"):
+            from python.bedrock_handler import handler
+
+            result = handler({"events": [{"text": "hello"}, {"text": "hello"}]}, None)
+            body = json.loads(result["body"])
+            assert body["unique_messages"] == 1
+            assert [f["id"] for f in body["failures"]] == ["0", "1"]
+
+    def test_throttling_is_retried_with_backoff(self) -> None:
+        calls = []
+
+        def flaky(text: str, language: str) -> dict:
+            calls.append(text)
+            if len(calls) < 3:
+                raise _throttle()
+            return SENTIMENT
+
+        with patch("python.bedrock_handler.BEDROCK_BACKOFF_BASE_S", 0.001), \
+                patch("python.bedrock_handler.invoke_sentiment", side_effect=flaky):
+            from python.bedrock_handler import invoke_sentiment, with_backoff
+
+            assert with_backoff(invoke_sentiment, "hi", "english") == SENTIMENT
+            assert len(calls) == 3
+
+    def test_non_retryable_errors_fail_fast(self) -> None:
+        from botocore.exceptions import ClientError
+
+        denied = ClientError({"Error": {"Code": "AccessDeniedException", "Message": "no"}}, "InvokeModel")
+        with patch("python.bedrock_handler.invoke_sentiment", side_effect=denied) as mock_invoke:
+            from python.bedrock_handler import invoke_sentiment, with_backoff
+
+            with pytest.raises(ClientError):
+                with_backoff(invoke_sentiment, "hi", "english")
+            assert mock_invoke.call_count == 1
+
+
+class TestSentimentBatching:
+    def test_one_call_per_batch_and_missing_ids_retried_alone(self) -> None:
+        from python.result_cache import ResultCache
+
+        calls: list[list[str]] = []
+
+        def batch_call(request_body: str, ids: list[str]) -> tuple[dict, list[str]]:
+            calls.append(ids)
+            # The model drops the last message of every batch.
+            return {i: SENTIMENT for i in ids[:-1]}, ids[-1:]
+
+        events = [{"text": f"message {i}", "language": "english"} for i in range(5)]
+        with patch("python.bedrock_handler.RESULT_CACHE", ResultCache()), \
+                patch("python.bedrock_handler.SENTIMENT_BATCH_SIZE", 3), \
+                patch("python.bedrock_handler.invoke_sentiment_batch", side_effect=batch_call), \
+                patch("python.bedrock_handler.invoke_sentiment", return_value=SENTIMENT) as single, \
+                patch("python.bedrock_handler.invoke_embedding", return_value=[0.1]), \
+                patch("python.bedrock_handler.persist_result", return_value="r1"):
+            from python.bedrock_handler import handler
+
+            body = json.loads(handler({"events": events}, None)["body"])
+
+        assert [len(ids) for ids in calls] == [3, 2]
+        assert single.call_count == 2
+        assert len(body["results"]) == 5 and body["failures"] == []
+
+    def test_failed_batch_falls_back_to_single_calls(self) -> None:
+        from python.bedrock_handler import analyze_sentiments
+        from python.result_cache import ResultCache
+
+        cache = ResultCache()
+        cache.put(cache_key_for("cached"), {"sentiment": "positive"})
+        with patch("python.bedrock_handler.RESULT_CACHE", cache), \
+                patch("python.bedrock_handler.invoke_sentiment_batch", side_effect=ValueError("bad")), \
+                patch("python.bedrock_handler.invoke_sentiment",
+                      side_effect=[SENTIMENT, RuntimeError("boom")]):
+            results = analyze_sentiments([("cached", "english"), ("a", "english"), ("b", "english")])
+
+        assert results[0] == {"sentiment": "positive"}
+        assert results[1] == SENTIMENT
+        assert isinstance(results[2], RuntimeError)
+
+
+def cache_key_for(text: str) -> str:
+    from python.bedrock_handler import CLAUDE_HAIKU_MODEL
+    from python.result_cache import cache_key
+
+    return cache_key(text, "english", CLAUDE_HAIKU_MODEL)
+
+
+class TestSentimentStreaming:
+    def _client(self, stream):  # type: ignore[no-untyped-def]
+        from unittest.mock import MagicMock
+
+        client = MagicMock()
+        client.invoke_model_with_response_stream.return_value = {"body": stream}
+        return client
+
+    def test_stream_is_closed_once_the_object_is_complete(self) -> None:
+        from python.bedrock_handler import invoke_sentiment_stream
+        from tests.helpers import FakeSentimentStream
+
+        stream = FakeSentimentStream(
+            "Here is the analysis: " + json.dumps(SENTIMENT)
+            + "\n\nThe customer is unhappy because the transfer failed twice and they"
+            " were charged both times, which reads as a clear complaint."
+        )
+        with patch("python.bedrock_handler.BEDROCK_CLIENT", self._client(stream)):
+            assert invoke_sentiment_stream("nimechoka", "swahili") == SENTIMENT
+
+        assert stream.closed
+        assert stream.consumed < len(stream.events) // 2
+
+    def test_incomplete_stream_raises(self) -> None:
+        from python.bedrock_handler import invoke_sentiment_stream
+        from tests.helpers import FakeSentimentStream
+
+        stream = FakeSentimentStream('{"sentiment": "negative", "categ')
+        with patch("python.bedrock_handler.BEDROCK_CLIENT", self._client(stream)):
+            with pytest.raises(ValueError):
+                invoke_sentiment_stream("nimechoka", "swahili")
+        assert stream.closed and stream.consumed == len(stream.events)
+
+    def test_flag_selects_streaming_path(self) -> None:
+        from python.result_cache import ResultCache
+
+        with patch("python.bedrock_handler.RESULT_CACHE", ResultCache()), \
+                patch("python.bedrock_handler.SENTIMENT_STREAMING", True), \
+                patch("python.bedrock_handler.invoke_sentiment") as blocking, \
+                patch("python.bedrock_handler.invoke_sentiment_stream",
+                      return_value=SENTIMENT) as streaming:
+            from python.bedrock_handler import analyze_sentiment
+
+            assert analyze_sentiment("hello", "english") == SENTIMENT
+        streaming.assert_called_once_with("hello", "english")
+        blocking.assert_not_called()
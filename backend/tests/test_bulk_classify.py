@@ -0,0 +1,51 @@
+"""Tests for the streaming bulk-classification CLI."""
+import io
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from python.bulk_classify import ByteCounter, chunked, iter_csv, iter_jsonl, iter_lines, run
+from tests.helpers import ReferenceClassifier
+
+
+class TestReaders:
+    def test_mmap_lines_and_byte_count(self, tmp_path: Path) -> None:
+        path = tmp_path / "in.jsonl"
+        path.write_bytes(b'{"id": "a", "text": "hello"}\n\nno-newline')
+        counter = ByteCounter()
+
+        assert list(iter_lines(str(path), counter)) == [
+            b'{"id": "a", "text": "hello"}\n', b"\n", b"no-newline",
+        ]
+        assert counter.n == path.stat().st_size
+
+        (tmp_path / "empty.jsonl").write_bytes(b"")
+        assert list(iter_lines(str(tmp_path / "empty.jsonl"))) == []
+
+    def test_jsonl_records_and_errors(self) -> None:
+        lines = [b'{"id": "a", "text": "hi"}\n', b"\n", b"{oops\n", b'{"text": "x"}\n']
+        records = list(iter_jsonl(lines, "text", "id"))
+        assert records[0] == ("a", "hi")
+        assert records[1][0] == "3" and isinstance(records[1][1], ValueError)
+        assert records[2] == ("4", "x")
+
+    def test_csv_quoted_fields_span_lines(self) -> None:
+        lines = [b"id,message\n", b'1,"two\n', b'lines"\n', b"2,angalia salio\n"]
+        assert list(iter_csv(lines, "message", "id")) == [("1", "two\nlines"), ("2", "angalia salio")]
+
+    def test_chunked(self) -> None:
+        assert [len(c) for c in chunked(((str(i), "t") for i in range(5)), 2)] == [2, 2, 1]
+
+
+class TestRun:
+    def test_rows_are_written_in_input_order(self) -> None:
+        records = [("a", "check my balance"), ("a", "send money"), ("b", ""), ("c", "hello")]
+        out = io.StringIO()
+        with patch("voice_handler._CLASSIFIER", ReferenceClassifier()):
+            written = run(iter(records), out, workers=1, chunk_size=3, detect=False)
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert written == 4
+        assert [r["id"] for r in rows] == ["a", "a", "b", "c"]
+        assert [r.get("intent") for r in rows] == ["check_balance", "send_money", None, "greeting"]
+        assert "error" in rows[2]
@@ -0,0 +1,116 @@
+"""Tests for the confidence-gated Bedrock cascade."""
+import json
+import time
+from unittest.mock import patch
+
+from python.cascade import BEDROCK, COMPLAINT, LOCAL, LOW_INTENT_CONFIDENCE, Cascade, lexicon_sentiment
+
+CONFIDENT = {"intent": "check_balance", "confidence": 0.85}
+CLAUDE = {"sentiment": "neutral", "category": "inquiry", "confidence": 0.9}
+
+
+class TestLexicon:
+    def test_polarity_negation_and_markers(self) -> None:
+        assert lexicon_sentiment(["thanks", "wave"])["category"] == "praise"
+        assert lexicon_sentiment(["not", "good"])["sentiment"] == "negative"
+        assert lexicon_sentiment(["pesa", "haijafika"])["category"] == "complaint"
+        assert lexicon_sentiment(["send", "money", "urgent"])["category"] == "urgent"
+
+    def test_unscored_messages_lose_confidence_with_length(self) -> None:
+        assert lexicon_sentiment(["check", "balance"])["confidence"] == 0.8
+        assert lexicon_sentiment(["word"] * 20)["confidence"] == 0.5
+
+
+class TestRouting:
+    def test_tiers_and_reasons(self) -> None:
+        cascade = Cascade()
+        assert cascade.route(["angalia", "salio"], CONFIDENT).tier == LOCAL
+        assert cascade.route(["asdf"], {"intent": "unknown", "confidence": 0.0}).reason == LOW_INTENT_CONFIDENCE
+        route = cascade.route(["balance", "wrong", "again"], CONFIDENT)
+        assert (route.tier, route.reason) == (BEDROCK, COMPLAINT)
+
+        stats = cascade.stats()
+        assert stats["tiers"] == {LOCAL: 1, BEDROCK: 2}
+        assert stats["escalations"] == {LOW_INTENT_CONFIDENCE: 1, COMPLAINT: 1}
+        assert stats["local_rate"] == round(1 / 3, 4)
+
+    def test_missing_intent_is_scored_from_tokens(self) -> None:
+        cascade = Cascade(match_intent=lambda tokens: ("greeting", 0.85))
+        assert cascade.route(["jambo"], {"language": "swahili"}).tier == LOCAL
+
+    def test_agreement_by_local_label(self) -> None:
+        cascade = Cascade(shadow_rate=1.0, seed=0)
+        route = cascade.route(["check", "balance"], CONFIDENT)
+        assert route.shadow and route.needs_bedrock
+        cascade.record(route, CLAUDE)
+        cascade.record(route, {"sentiment": "negative", "category": "complaint"})
+
+        agreement = cascade.stats()["agreement"]["sentiment"]
+        assert (agreement["compared"], agreement["agreed"], agreement["rate"]) == (2, 1, 0.5)
+        assert agreement["by_label"] == {"neutral": {"compared": 2, "agreed": 1}}
+
+
+class TestBedrockHandler:
+    def test_confident_message_never_reaches_bedrock(self) -> None:
+        with patch("python.bedrock_handler.CASCADE_ENABLED", True), \
+                patch("python.bedrock_handler.CASCADE", Cascade()), \
+                patch("python.bedrock_handler.run_inference") as inference, \
+                patch("python.bedrock_handler.persist_result", return_value="r1") as persist:
+            from python.bedrock_handler import handler
+
+            event = {"detail": {"v": 2, "text": "angalia salio", "language": "swahili",
+                                "tokens": ["angalia", "salio"], **CONFIDENT}}
+            body = json.loads(handler(event, None)["body"])
+
+        inference.assert_not_called()
+        assert body["tier"] == LOCAL and body["sentiment"]["sentiment"] == "neutral"
+        assert persist.call_args.kwargs["tier"] == LOCAL
+
+    def test_shadow_call_finishes_inside_the_invocation(self) -> None:
+        import instrumentation
+
+        invocations = []
+
+        def claude(text: str, language: str) -> dict:
+            time.sleep(0.05)
+            invocations.append(instrumentation.current())
+            return CLAUDE
+
+        with patch("python.bedrock_handler.CASCADE_ENABLED", True), \
+                patch("python.bedrock_handler.CASCADE", Cascade(shadow_rate=1.0)), \
+                patch("python.bedrock_handler.analyze_sentiment", side_effect=claude), \
+                patch("python.bedrock_handler.persist_result", return_value="r1"):
+            from python.bedrock_handler import handler
+
+            event = {"detail": {"v": 2, "text": "angalia salio", "language": "swahili",
+                                "tokens": ["angalia", "salio"], **CONFIDENT}}
+            body = json.loads(handler(event, None)["body"])
+
+        assert body["tier"] == LOCAL
+        assert body["cascade"]["agreement"]["sentiment"]["compared"] == 1
+        assert invocations and invocations[0] is not None
+
+    def test_batch_sends_only_escalated_messages(self) -> None:
+        from python.intent_index import match_intent
+
+        cascade = Cascade(match_intent=match_intent)
+        events = [
+            {"text": "hello there"},
+            {"text": "hello there"},
+            {"text": "my transfer failed and I was charged twice"},
+        ]
+        with patch("python.bedrock_handler.CASCADE_ENABLED", True), \
+                patch("python.bedrock_handler.CASCADE", cascade), \
+                patch("python.bedrock_handler.analyze_sentiments",
+                      side_effect=lambda msgs: [CLAUDE] * len(msgs)) as sentiments, \
+                patch("python.bedrock_handler.generate_embedding", return_value=[0.1]), \
+                patch("python.bedrock_handler.persist_result", return_value="r1"):
+            from python.bedrock_handler import handler
+
+            body = json.loads(handler({"events": events}, None)["body"])
+
+        sentiments.assert_called_once()
+        assert [text for text, _ in sentiments.call_args.args[0]] == [events[2]["text"]]
+        assert [r["tier"] for r in body["results"]] == [LOCAL, LOCAL, BEDROCK]
+        assert body["cascade"]["tiers"] == {LOCAL: 2, BEDROCK: 1}
+        assert body["cascade"]["agreement"]["category"]["compared"] == 1
@@ -0,0 +1,67 @@
+"""Tests for compact embedding storage and the local similarity index."""
+import pytest
+
+from python.embedding_store import EmbeddingIndex, decode_embedding, encode_embedding
+
+np = pytest.importorskip("numpy")
+
+
+class TestEncoding:
+    def test_float16_round_trip(self) -> None:
+        vector = [0.125, -0.5, 0.3333, 0.0]
+        blob = encode_embedding(vector)
+        assert len(blob) == 1 + 2 * len(vector)
+        assert decode_embedding(blob) == pytest.approx(vector, abs=1e-3)
+
+    def test_int8_round_trip(self) -> None:
+        vector = [0.9, -0.45, 0.01, -0.9]
+        blob = encode_embedding(vector, "int8")
+        assert len(blob) == 1 + 4 + len(vector)
+        assert decode_embedding(blob) == pytest.approx(vector, abs=0.01)
+
+    def test_zero_vector_and_unknown_codec(self) -> None:
+        assert decode_embedding(encode_embedding([0.0, 0.0], "int8")) == [0.0, 0.0]
+        with pytest.raises(ValueError):
+            encode_embedding([1.0], "bfloat16")
+
+
+class TestEmbeddingIndex:
+    def test_top_k_orders_by_cosine(self) -> None:
+        index = EmbeddingIndex(dim=3)
+        index.add(["a", "b", "c"], [[1, 0, 0], [0.7, 0.7, 0], [0, 0, 1]])
+        hits = index.search([1, 0.1, 0], k=2)
+        assert [h[0] for h in hits] == ["a", "b"]
+        assert hits[0][1] == pytest.approx(0.995, abs=1e-3)
+
+    def test_incremental_add_grows_matrix(self) -> None:
+        index = EmbeddingIndex(dim=4)
+        rng = np.random.default_rng(0)
+        for start in range(0, 200, 50):
+            index.add([str(i) for i in range(start, start + 50)], rng.normal(size=(50, 4)))
+        assert len(index) == 200
+        target = index._matrix[123]
+        assert index.search(target, k=1)[0][0] == "123"
+
+    def test_save_and_mmap_load(self, tmp_path) -> None:
+        index = EmbeddingIndex(dim=2)
+        index.add(["x", "y"], [[1, 0], [0, 1]])
+        path = str(tmp_path / "support")
+        index.save(path)
+
+        loaded = EmbeddingIndex.load(path)
+        assert isinstance(loaded._matrix, np.memmap)
+        assert loaded.search([0, 1], k=1)[0][0] == "y"
+
+        # Adding to a read-only mapped index copies it into memory first.
+        loaded.add(["z"], [[1, 1]])
+        assert loaded.search([1, 1], k=1)[0][0] == "z"
+
+    def test_from_persisted_items(self) -> None:
+        items = [
+            {"PK": "ML#1", "embedding": encode_embedding([1.0, 0.0])},
+            {"PK": "ML#2", "embedding": encode_embedding([0.0, 1.0], "int8")},
+            {"PK": "ML#3"},
+        ]
+        index = EmbeddingIndex.from_items(items, dim=2)
+        assert index.ids == ["ML#1", "ML#2"]
+        assert index.search([0.1, 1.0], k=1)[0][0] == "ML#2"
@@ -0,0 +1,102 @@
+"""Tests for the buffered EventBridge publisher, against a local stub client."""
+from typing import Any
+
+from python.event_publisher import MAX_BYTES_PER_PUT, EventPublisher, pack_entries
+
+
+class StubEventsClient:
+    """Records PutEvents calls; fails entries whose Detail is listed in fail_details."""
+
+    def __init__(self, fail_details: dict[str, int] | None = None, raise_times: int = 0) -> None:
+        self.calls: list[list[dict[str, Any]]] = []
+        self.fail_details = dict(fail_details or {})
+        self.raise_times = raise_times
+
+    def put_events(self, Entries: list[dict[str, Any]]) -> dict[str, Any]:
+        self.calls.append(list(Entries))
+        if self.raise_times:
+            self.raise_times -= 1
+            raise ConnectionError("stub network failure")
+        results: list[dict[str, Any]] = []
+        for entry in Entries:
+            remaining = self.fail_details.get(entry["Detail"], 0)
+            if remaining:
+                self.fail_details[entry["Detail"]] = remaining - 1
+                results.append({"ErrorCode": "ThrottlingException", "ErrorMessage": "slow down"})
+            else:
+                results.append({"EventId": "evt"})
+        return {
+            "FailedEntryCount": sum(1 for r in results if "ErrorCode" in r),
+            "Entries": results,
+        }
+
+
+def entry(detail: str) -> dict[str, Any]:
+    return {"Source": "wave.voice", "DetailType": "VoiceClassification", "Detail": detail}
+
+
+class TestPacking:
+    def test_at_most_ten_entries_per_call(self) -> None:
+        chunks = list(pack_entries([entry(str(i)) for i in range(25)]))
+        assert [len(c) for c in chunks] == [10, 10, 5]
+
+    def test_byte_limit_splits_chunks(self) -> None:
+        big = "x" * (MAX_BYTES_PER_PUT // 2)
+        chunks = list(pack_entries([entry(big), entry(big), entry("small")]))
+        assert [len(c) for c in chunks] == [1, 2]
+
+    def test_oversized_entry_is_skipped(self) -> None:
+        chunks = list(pack_entries([entry("x" * MAX_BYTES_PER_PUT), entry("ok")]))
+        assert [[e["Detail"] for e in c] for c in chunks] == [["ok"]]
+
+
+class TestEventPublisher:
+    def test_retries_only_failed_entries(self) -> None:
+        client = StubEventsClient(fail_details={"b": 1})
+        publisher = EventPublisher(client, background=False, backoff_s=0)
+        publisher.publish_many([entry("a"), entry("b"), entry("c")])
+        publisher.flush()
+
+        assert [[e["Detail"] for e in call] for call in client.calls] == [["a", "b", "c"], ["b"]]
+        stats = publisher.stats()
+        assert stats["published"] == 3
+        assert stats["retried"] == 1
+        assert stats["dropped"] == 0
+
+    def test_drops_after_max_retries(self) -> None:
+        client = StubEventsClient(fail_details={"b": 10})
+        publisher = EventPublisher(client, background=False, max_retries=2, backoff_s=0)
+        publisher.publish_many([entry("a"), entry("b")])
+        publisher.flush()
+
+        stats = publisher.stats()
+        assert stats["published"] == 1
+        assert stats["retried"] == 2
+        assert stats["dropped"] == 1
+
+    def test_call_level_error_retries_whole_chunk(self) -> None:
+        client = StubEventsClient(raise_times=1)
+        publisher = EventPublisher(client, background=False, backoff_s=0)
+        publisher.publish_many([entry("a"), entry("b")])
+        publisher.flush()
+
+        assert len(client.calls) == 2
+        assert publisher.stats()["published"] == 2
+
+    def test_background_flush_drains_queue(self) -> None:
+        client = StubEventsClient()
+        publisher = EventPublisher(client, backoff_s=0)
+        publisher.publish_many([entry(str(i)) for i in range(15)])
+
+        assert publisher.flush(timeout=5)
+        assert sum(len(c) for c in client.calls) == 15
+        assert publisher.stats()["queued"] == 0
+
+    def test_queue_overflow_is_dropped_not_blocking(self) -> None:
+        client = StubEventsClient()
+        publisher = EventPublisher(client, background=False, max_queue=3)
+        publisher.publish_many([entry(str(i)) for i in range(5)])
+        publisher.flush()
+
+        assert publisher.stats()["dropped"] == 2
+        assert publisher.stats()["published"] == 3
@@ -0,0 +1,102 @@
+"""Tests for the versioned VoiceClassification payloads."""
+import base64
+import json
+from unittest.mock import patch
+
+from python.events_schema import (
+    BINARY_MARKER,
+    classification_of,
+    decode,
+    encode,
+    encode_text,
+    from_payload,
+    voice_detail,
+)
+
+RESULT = {
+    "language": "swahili",
+    "intent": "check_balance",
+    "confidence": 0.85,
+    "tokens": ["angalia", "salio", "yangu"],
+}
+DETAIL = voice_detail("angalia salio yangu", RESULT)
+
+
+class TestEncoding:
+    def test_binary_round_trip_is_smaller_than_json(self) -> None:
+        binary = encode(DETAIL, "msgpack")
+        assert binary[0] == BINARY_MARKER
+        assert len(binary) < len(encode(DETAIL, "json"))
+        assert decode(binary) == DETAIL
+
+    def test_text_transport_uses_base64_for_binary(self) -> None:
+        body = encode_text(DETAIL)
+        assert base64.b64decode(body)[0] == BINARY_MARKER
+        assert decode(body) == DETAIL
+        assert decode(encode_text(DETAIL, "json")) == DETAIL
+
+    def test_without_msgpack_encode_falls_back_to_json(self) -> None:
+        with patch.dict("sys.modules", {"msgpack": None}):
+            assert json.loads(encode(DETAIL)) == DETAIL
+
+
+class TestCompatibility:
+    def test_legacy_detail_has_no_classification(self) -> None:
+        legacy = {"text": "hello", "language": "english", "intent": "greeting",
+                  "confidence": 0.85, "token_count": 1}
+        detail = decode(json.dumps({"detail": legacy}))
+        assert detail == {"v": 1, "text": "hello", "language": "english"}
+        assert classification_of(detail) is None
+
+    def test_language_defaults(self) -> None:
+        assert from_payload({"text": "hi"})["language"] == "auto"
+        assert from_payload({"detail": {"text": "hi"}})["language"] == "english"
+        assert from_payload("hi")["text"] == "hi"
+
+    def test_v2_carries_classification(self) -> None:
+        assert classification_of(from_payload({"detail": DETAIL})) == {
+            "language": "swahili",
+            "intent": "check_balance",
+            "confidence": 0.85,
+            "tokens": ["angalia", "salio", "yangu"],
+            "token_count": 3,
+        }
+
+
+class TestBedrockSkipsReclassification:
+    def test_v2_event_is_not_classified_again(self) -> None:
+        sentiment = {"sentiment": "neutral", "category": "inquiry", "confidence": 0.9}
+        with patch("python.bedrock_handler.classify_intent_dict",
+                   return_value={"language": "english", "intent": "greeting"}) as classify, \
+                patch("python.bedrock_handler.analyze_sentiment", return_value=sentiment), \
+                patch("python.bedrock_handler.generate_embedding", return_value=[0.1]), \
+                patch("python.bedrock_handler.persist_result", return_value="abc123") as persist:
+            from python.bedrock_handler import handler
+
+            result = handler({"source": "wave.voice", "detail": DETAIL}, None)
+            classify.assert_not_called()
+            assert persist.call_args.kwargs["classification"]["intent"] == "check_balance"
+            assert json.loads(result["body"])["language"] == "swahili"
+
+            handler({"detail": {"text": "hello", "language": "english"}}, None)
+            classify.assert_called_once_with("hello")
+
+    def test_batch_classifies_only_legacy_messages(self) -> None:
+        sentiment = {"sentiment": "neutral", "category": "inquiry", "confidence": 0.9}
+        records = [
+            {"messageId": "m1", "body": encode_text(DETAIL)},
+            {"messageId": "m2", "body": json.dumps({"text": "send money", "language": "auto"})},
+            {"messageId": "m3", "body": "%%%"},
+        ]
+        with patch("python.bedrock_handler.classify_intent_batch",
+                   return_value=[{"language": "english", "intent": "send_money"}]) as classify, \
+                patch("python.bedrock_handler.analyze_sentiment", return_value=sentiment), \
+                patch("python.bedrock_handler.generate_embedding", return_value=[0.1]), \
+                patch("python.bedrock_handler.BatchWriter"), \
+                patch("python.bedrock_handler.persist_result", return_value="abc123"):
+            from python.bedrock_handler import handler
+
+            result = handler({"Records": records}, None)
+
+        classify.assert_called_once_with(["send money"])
+        assert result == {"batchItemFailures": [{"itemIdentifier": "m3"}]}
@@ -0,0 +1,185 @@
+"""Tests for the self-hosted asyncio gateway."""
+import asyncio
+import json
+import threading
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from python.gateway import Coalescer, Gateway, Overloaded
+from tests.helpers import ReferenceClassifier
+
+
+async def request(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    method: str,
+    path: str,
+    body: Any = None,
+    headers: str = "",
+) -> tuple[int, dict[str, str], Any]:
+    data = b"" if body is None else json.dumps(body).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n{headers}\r\n".encode()
+        + data
+    )
+    head = (await reader.readuntil(b"\r\n\r\n")).decode()
+    status_line, *lines = head.strip().split("\r\n")
+    response_headers = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in lines)}
+    payload = await reader.readexactly(int(response_headers["content-length"]))
+    return int(status_line.split()[1]), response_headers, json.loads(payload)
+
+
+def run(scenario: Any, **options: Any) -> Any:
+    """Run scenario(gateway, port) against a thread-only gateway."""
+
+    async def main() -> Any:
+        gateway = Gateway(workers=0, **options)
+        port = await gateway.start("127.0.0.1", 0)
+        try:
+            return await scenario(gateway, port)
+        finally:
+            await gateway.close()
+
+    with patch("voice_handler._CLASSIFIER", ReferenceClassifier()), \
+            patch("voice_handler.EVENT_PUBLISHER.publish_many") as publish:
+        return asyncio.run(main()), publish
+
+
+class TestHTTP:
+    def test_keep_alive_and_api_gateway_shapes(self) -> None:
+        async def scenario(gateway: Gateway, port: int) -> Any:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            first = await request(reader, writer, "POST", "/voice", {"text": "check my balance"})
+            batch = await request(reader, writer, "POST", "/voice", {"texts": ["hello", ""]})
+            missing = await request(reader, writer, "POST", "/voice", {"text": ""})
+            closing = await request(reader, writer, "GET", "/health", headers="Connection: close\r\n")
+            eof = await reader.read()
+            writer.close()
+            return first, batch, missing, closing, eof, gateway.stats()
+
+        (first, batch, missing, closing, eof, stats), publish = run(scenario)
+
+        assert first[0] == 200 and first[2]["intent"] == "check_balance"
+        assert first[1]["connection"] == "keep-alive"
+        assert batch[0] == 200 and batch[2]["count"] == 1 and len(batch[2]["failures"]) == 1
+        assert missing[0] == 400
+        assert closing[1]["connection"] == "close" and eof == b""
+        assert stats["requests"] == 4
+        assert publish.call_count == 2  # the coalesced single and the batch
+
+    def test_errors(self) -> None:
+        async def scenario(gateway: Gateway, port: int) -> Any:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            not_found = await request(reader, writer, "POST", "/nope", {})
+            wrong_method = await request(reader, writer, "GET", "/voice")
+            too_big = await request(reader, writer, "POST", "/voice", {"text": "x" * 100})
+            writer.close()
+            return not_found[0], wrong_method[0], too_big[0]
+
+        statuses, _ = run(scenario, max_body_bytes=64)
+        assert statuses == (404, 405, 413)
+
+
+class TestCoalescing:
+    def test_concurrent_texts_share_one_batch(self) -> None:
+        async def scenario(gateway: Gateway, port: int) -> Any:
+            async def one(text: str) -> Any:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                try:
+                    return await request(reader, writer, "POST", "/voice", {"text": text})
+                finally:
+                    writer.close()
+
+            texts = ["hello", "send money", "check balance", "help me"]
+            responses = await asyncio.gather(*(one(t) for t in texts))
+            return responses, gateway.stats()["coalesced"]
+
+        (responses, coalesced), _ = run(scenario, batch_window_ms=50)
+        assert [r[2]["intent"] for r in responses] == ["greeting", "send_money", "check_balance", "help"]
+        assert coalesced["batches"] == 1 and coalesced["texts"] == 4
+
+    def test_max_pending_is_enforced(self) -> None:
+        async def scenario() -> Any:
+            release = asyncio.Event()
+
+            async def slow_batch(texts: list[str]) -> list[dict[str, Any]]:
+                await release.wait()
+                return [{"text": t} for t in texts]
+
+            coalescer = Coalescer(slow_batch, max_batch=2, window_s=10, max_pending=1)
+            first = asyncio.ensure_future(coalescer.submit("a"))
+            await asyncio.sleep(0)
+            with pytest.raises(Overloaded):
+                await coalescer.submit("b")
+            coalescer._flush()
+            release.set()
+            return await first
+
+        assert asyncio.run(scenario()) == {"text": "a"}
+
+
+class TestBackpressure:
+    def test_requests_over_the_inflight_limit_get_503(self) -> None:
+        release = threading.Event()
+
+        def blocking_handler(module: str, event: Any, request_id: str) -> Any:
+            release.wait(5)
+            return {"statusCode": 200, "body": "{}"}
+
+        async def scenario(gateway: Gateway, port: int) -> Any:
+            slow_reader, slow_writer = await asyncio.open_connection("127.0.0.1", port)
+            slow = asyncio.ensure_future(request(slow_reader, slow_writer, "POST", "/bedrock", {"text": "hi"}))
+            await asyncio.sleep(0.05)
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            rejected = await request(reader, writer, "POST", "/bedrock", {"text": "hi"})
+            release.set()
+            accepted = await slow
+            for w in (slow_writer, writer):
+                w.close()
+            return rejected, accepted[0], gateway.stats()["rejected"]
+
+        with patch("python.gateway.invoke", blocking_handler):
+            (rejected, accepted, count), _ = run(scenario, max_inflight=1)
+        assert rejected[0] == 503 and rejected[1]["retry-after"] == "1"
+        assert accepted == 200 and count == 1
+
+
+class TestInstrumentation:
+    def test_concurrent_handlers_emit_their_own_stages(self) -> None:
+        import bedrock_handler
+        from instrumentation import BEDROCK_SENTIMENT, INTENT_MATCH, Invocation, stage
+
+        both_running = threading.Barrier(2)
+
+        def sentiment(text: str, language: str) -> dict[str, Any]:
+            # Runs on bedrock_handler's executor, not the handler's thread.
+            with stage(BEDROCK_SENTIMENT):
+                both_running.wait(5)
+            return {"sentiment": "neutral", "category": "inquiry", "confidence": 0.9}
+
+        async def scenario(gateway: Gateway, port: int) -> Any:
+            async def send(text: str) -> Any:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                response = await request(reader, writer, "POST", "/bedrock", {"text": text})
+                writer.close()
+                return response
+
+            return await asyncio.gather(send("hello"), send("tuma pesa"))
+
+        records: list[Invocation] = []
+        with patch.object(bedrock_handler, "CASCADE_ENABLED", False), \
+                patch.object(bedrock_handler, "ROLLUPS_ENABLED", False), \
+                patch.object(bedrock_handler, "analyze_sentiment", sentiment), \
+                patch.object(bedrock_handler, "generate_embedding", return_value=[0.1]), \
+                patch.object(bedrock_handler, "persist_result", return_value="r1"), \
+                patch("instrumentation.emit", records.append):
+            responses, _ = run(scenario)
+
+        assert [r[0] for r in responses] == [200, 200]
+        assert len(records) == 2
+        assert records[0].properties["RequestId"] != records[1].properties["RequestId"]
+        for record in records:
+            assert set(record.stages_ms) == {BEDROCK_SENTIMENT, INTENT_MATCH}
+        assert [r.cold_start for r in records].count(True) <= 1
@@ -5,6 +5,9 @@ from datetime import datetime, timezone
 
 import pytest
 
+from python.idempotency import IdempotencyStore
+from tests.helpers import FakeConditionalTable, ReferenceClassifier
+
 
 class TestHandlerMissingToken:
     """Verify graceful failure when token is missing."""
@@ -14,7 +17,8 @@ class TestHandlerMissingToken:
         with patch.dict("os.environ", {"TABLE_NAME": "TestTable"}):
             with patch("handler.submit_resume") as mock_submit:
                 mock_submit.side_effect = ValueError("token must not be empty")
-                with patch("handler.table"):
+                store = IdempotencyStore(FakeConditionalTable())
+                with patch("python.handler.get_table"), patch("python.handler.IDEMPOTENCY", store):
                     from python.handler import handler
 
                     result = handler(
@@ -31,7 +35,8 @@ class TestRecordSubmissionFormat:
 
     def test_record_submission_format(self) -> None:
         """record_submission should produce a well-formed item."""
-        with patch("python.handler.table") as mock_table:
+        with patch("python.handler.get_table") as mock_get_table:
+            mock_table = mock_get_table.return_value
             mock_table.put_item = MagicMock()
             from python.handler import record_submission
 
@@ -50,12 +55,8 @@ class TestVoiceClassifySwahili:
     """Voice classification for Swahili input."""
 
     def test_voice_classify_swahili(self) -> None:
-        with patch("python.voice_handler.classify_intent") as mock_classify:
-            mock_classify.return_value = json.dumps({
-                "language": "swahili",
-                "tokens": ["angalia", "salio"],
-                "token_count": 2,
-            })
+        classifier = ReferenceClassifier("swahili", ["angalia", "salio"])
+        with patch("python.voice_handler._CLASSIFIER", classifier):
             from python.voice_handler import classify_and_respond
 
             result = classify_and_respond("angalia salio")
@@ -67,12 +68,8 @@ class TestVoiceClassifyEnglish:
     """Voice classification for English input."""
 
     def test_voice_classify_english(self) -> None:
-        with patch("python.voice_handler.classify_intent") as mock_classify:
-            mock_classify.return_value = json.dumps({
-                "language": "english",
-                "tokens": ["send", "money", "to", "John"],
-                "token_count": 4,
-            })
+        classifier = ReferenceClassifier("english", ["send", "money", "to", "John"])
+        with patch("python.voice_handler._CLASSIFIER", classifier):
             from python.voice_handler import classify_and_respond
 
             result = classify_and_respond("send money to John")
@@ -84,12 +81,8 @@ class TestVoiceUnknownIntent:
     """Voice classification with no matching intent."""
 
     def test_voice_unknown_intent(self) -> None:
-        with patch("python.voice_handler.classify_intent") as mock_classify:
-            mock_classify.return_value = json.dumps({
-                "language": "english",
-                "tokens": ["something", "random", "here"],
-                "token_count": 3,
-            })
+        classifier = ReferenceClassifier("english", ["something", "random", "here"])
+        with patch("python.voice_handler._CLASSIFIER", classifier):
             from python.voice_handler import classify_and_respond
 
             result = classify_and_respond("something random here")
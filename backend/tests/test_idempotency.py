@@ -0,0 +1,197 @@
+"""Tests for idempotent submission reservations and the batch submit path."""
+import json
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from python.idempotency import COMPLETED, FAILED, UNCONFIRMED, IdempotencyStore, payload_digest
+from python.persistence import BatchWriter
+from tests.helpers import FakeConditionalTable
+
+
+class RecordingResource:
+    """batch_write_item sink for BatchWriter."""
+
+    def __init__(self) -> None:
+        self.items: list[dict[str, Any]] = []
+
+    def batch_write_item(self, RequestItems: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+        for requests in RequestItems.values():
+            self.items.extend(r["PutRequest"]["Item"] for r in requests)
+        return {"UnprocessedItems": {}}
+
+
+class TestPayloadDigest:
+    def test_key_order_and_encoding_do_not_matter(self) -> None:
+        assert payload_digest({"a": 1, "b": [2]}) == payload_digest('{"b": [2], "a": 1}')
+        assert payload_digest({"a": 1}) != payload_digest({"a": 2})
+
+
+class TestIdempotencyStore:
+    def test_second_reservation_sees_first(self) -> None:
+        store = IdempotencyStore(FakeConditionalTable())
+        assert store.reserve("s-1", "d") is None
+        assert store.reserve("s-1", "d")["status"] == "in_progress"
+        # Same id, different payload is a different submission.
+        assert store.reserve("s-1", "other") is None
+
+    def test_completed_record_is_served_from_memory(self) -> None:
+        table = FakeConditionalTable()
+        store = IdempotencyStore(table)
+        store.reserve("s-1", "d")
+        item = store.record("s-1", "d", {"status_code": 200}, ok=True)
+        table.put_item(Item=item)
+
+        table.items.clear()  # a DynamoDB round trip would now find nothing
+        assert store.reserve("s-1", "d")["status"] == COMPLETED
+        assert store.stats()["hits"] == 1
+
+    def test_failed_and_stale_claims_can_be_taken_over(self) -> None:
+        table = FakeConditionalTable()
+        store = IdempotencyStore(table, in_progress_s=60)
+
+        store.reserve("s-1", "d")
+        table.put_item(Item=store.record("s-1", "d", {"status_code": 503}, ok=False))
+        assert table.items[("SUBMISSION#s-1", "PAYLOAD#d")]["status"] == FAILED
+        assert store.reserve("s-1", "d") is None
+
+        store.reserve("s-2", "d")
+        table.items[("SUBMISSION#s-2", "PAYLOAD#d")]["reserved_at"] = int(time.time()) - 120
+        assert store.reserve("s-2", "d") is None
+
+
+class TestHandlerIdempotency:
+    def test_duplicate_submission_skips_the_api(self) -> None:
+        store = IdempotencyStore(FakeConditionalTable())
+        event = {"payload": {"name": "Eric"}, "token": "t", "submission_id": "s-1"}
+        with patch("python.handler.IDEMPOTENCY", store), \
+                patch("python.handler.get_table") as mock_get_table, \
+                patch("python.handler.submit_resume", return_value=(201, "{}")) as submit:
+            from python.handler import handler
+
+            first = handler(event, None)
+            second = handler(event, None)
+
+        assert submit.call_count == 1
+        assert first["statusCode"] == second["statusCode"] == 201
+        assert json.loads(second["body"])["duplicate"] is True
+        written = mock_get_table.return_value.put_item.call_args.kwargs["Item"]
+        assert written["status"] == COMPLETED and written["PK"] == "SUBMISSION#s-1"
+
+    def test_submission_in_flight_is_a_conflict(self) -> None:
+        store = IdempotencyStore(FakeConditionalTable())
+        store.reserve("s-1", payload_digest({"name": "Eric"}))
+        with patch("python.handler.IDEMPOTENCY", store), \
+                patch("python.handler.submit_resume") as submit:
+            from python.handler import handler
+
+            result = handler({"payload": {"name": "Eric"}, "token": "t", "submission_id": "s-1"}, None)
+
+        submit.assert_not_called()
+        assert result["statusCode"] == 409
+
+    def _submit_twice(self, error: Exception) -> tuple[Any, Any, Any, FakeConditionalTable]:
+        table = FakeConditionalTable()
+        event = {"payload": {"name": "Eric"}, "token": "t", "submission_id": "s-1"}
+        with patch("python.handler.IDEMPOTENCY", IdempotencyStore(table)), \
+                patch("python.handler.get_table", return_value=table), \
+                patch("python.handler.submit_resume", side_effect=[error, (201, "{}")]) as submit:
+            from python.handler import handler
+
+            first = handler(event, None)
+            retry = handler(event, None)
+        return first, retry, submit, table
+
+    def test_timed_out_submission_is_not_posted_again(self) -> None:
+        first, retry, submit, table = self._submit_twice(TimeoutError("no response: timed out"))
+
+        assert submit.call_count == 1
+        assert first["statusCode"] == 504 and retry["statusCode"] == 409
+        (record,) = table.items.values()
+        assert record["status"] == UNCONFIRMED and record["status_code"] == 0
+
+    def test_unsent_submission_is_retried(self) -> None:
+        first, retry, submit, table = self._submit_twice(ConnectionError("request failed: refused"))
+
+        assert submit.call_count == 2
+        assert first["statusCode"] == 502 and retry["statusCode"] == 201
+        (record,) = table.items.values()
+        assert record["status"] == COMPLETED
+
+    def test_rejected_input_releases_the_claim(self) -> None:
+        first, retry, submit, table = self._submit_twice(ValueError("token must not be empty"))
+
+        assert submit.call_count == 2
+        assert first["statusCode"] == 422 and retry["statusCode"] == 201
+
+    def test_unexpected_error_does_not_leave_the_claim_in_progress(self) -> None:
+        table = FakeConditionalTable()
+        event = {"payload": {"name": "Eric"}, "token": "t", "submission_id": "s-1"}
+        with patch("python.handler.IDEMPOTENCY", IdempotencyStore(table)), \
+                patch("python.handler.get_table", return_value=table), \
+                patch("python.handler.submit_resume", side_effect=RuntimeError("boom")):
+            from python.handler import handler
+
+            with pytest.raises(RuntimeError):
+                handler(event, None)
+
+        (record,) = table.items.values()
+        assert record["status"] == FAILED
+
+
+class TestBatchHandler:
+    def _run(self, event: dict[str, Any], responses: list[tuple[int, str]]) -> tuple[Any, Any, Any]:
+        store = IdempotencyStore(FakeConditionalTable())
+        resource = RecordingResource()
+        with patch("python.handler.IDEMPOTENCY", store), \
+                patch("python.handler.BatchWriter", lambda name: BatchWriter(name, resource=resource)), \
+                patch("python.handler.submit_many", return_value=responses) as submit:
+            from python.handler import handler
+
+            result = handler(event, None)
+        return result, submit, resource
+
+    def test_submits_unique_payloads_once(self) -> None:
+        event = {
+            "token": "t",
+            "submissions": [
+                {"submission_id": "a", "payload": {"n": 1}},
+                {"submission_id": "b", "payload": {"n": 2}},
+                {"submission_id": "a", "payload": {"n": 1}},
+                {"submission_id": "c"},
+            ],
+        }
+        result, submit, resource = self._run(event, [(201, "{}"), (0, "connection refused")])
+
+        payloads, token, _ = submit.call_args.args
+        assert [json.loads(p) for p in payloads] == [{"n": 1}, {"n": 2}]
+        assert token == "t"
+        body = json.loads(result["body"])
+        assert [(r["id"], r["duplicate"]) for r in body["results"]] == [("0", False), ("2", True)]
+        assert body["failures"] == {"1": "connection refused", "3": "missing payload"}
+        assert [i["status"] for i in resource.items] == [COMPLETED, FAILED]
+
+    def test_sqs_reports_only_retryable_failures(self) -> None:
+        records = [
+            {"messageId": "m1", "body": json.dumps({"submission_id": "a", "payload": {"n": 1}, "token": "t"})},
+            {"messageId": "m2", "body": json.dumps({"submission_id": "b", "payload": {"n": 2}, "token": "t"})},
+            {"messageId": "m3", "body": json.dumps({"submission_id": "c", "payload": "{", "token": "t"})},
+        ]
+        result, _, _ = self._run(
+            {"Records": records},
+            [(200, "{}"), (503, "busy"), (0, "invalid JSON payload: EOF")],
+        )
+        assert result == {"batchItemFailures": [{"itemIdentifier": "m2"}]}
+
+    def test_unanswered_batch_items_are_not_redelivered(self) -> None:
+        records = [
+            {"messageId": "m1", "body": json.dumps({"submission_id": "a", "payload": {"n": 1}, "token": "t"})},
+            {"messageId": "m2", "body": json.dumps({"submission_id": "b", "payload": {"n": 2}, "token": "t"})},
+        ]
+        result, _, resource = self._run(
+            {"Records": records}, [(0, "no response: timed out"), (0, "request failed: refused")]
+        )
+        assert result == {"batchItemFailures": [{"itemIdentifier": "m2"}]}
+        assert [i["status"] for i in resource.items] == [UNCONFIRMED, FAILED]
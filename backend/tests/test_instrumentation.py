@@ -0,0 +1,111 @@
+"""Tests for per-stage timers and EMF output."""
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from unittest.mock import patch
+
+from python import instrumentation
+from python.instrumentation import bind, instrumented, invocation, stage
+
+
+def emitted(capsys: Any) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+class TestStageTimers:
+    def test_stages_are_summed_per_invocation(self, capsys: Any) -> None:
+        @stage("decorated")
+        def work() -> int:
+            return 1
+
+        with invocation("test") as record:
+            with stage("block"):
+                pass
+            assert work() + work() == 2
+
+        assert set(record.stages_ms) == {"block", "decorated"}
+        assert record.total_ms >= record.stages_ms["decorated"]
+
+        (line,) = emitted(capsys)
+        directive = line["_aws"]["CloudWatchMetrics"][0]
+        assert {m["Name"] for m in directive["Metrics"]} == {"block_ms", "decorated_ms", "total_ms"}
+        assert all(name in line for name in ("block_ms", "decorated_ms", "total_ms"))
+        assert line["Handler"] == "test"
+
+    def test_worker_threads_record_into_the_bound_invocation(self, capsys: Any) -> None:
+        def work(name: str) -> None:
+            with stage(name):
+                pass
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            with invocation("test") as record:
+                pool.submit(bind(work), "bound").result()
+                pool.submit(work, "unbound").result()
+            pool.submit(bind(work), "late").result()
+
+        assert set(record.stages_ms) == {"bound"}
+        assert len(emitted(capsys)) == 1
+
+    def test_concurrent_invocations_keep_separate_records(self, capsys: Any) -> None:
+        both_running = threading.Barrier(2)
+
+        def run(name: str) -> Any:
+            with invocation(name) as record:
+                both_running.wait(5)
+                with stage(name):
+                    both_running.wait(5)
+            return record
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first, second = pool.map(run, ["first", "second"])
+
+        assert set(first.stages_ms) == {"first"} and set(second.stages_ms) == {"second"}
+        assert [line["ColdStart"] for line in emitted(capsys)].count("true") <= 1
+
+    def test_timers_outside_an_invocation_are_no_ops(self, capsys: Any) -> None:
+        with stage("orphan"):
+            pass
+        assert instrumentation.current() is None
+        assert capsys.readouterr().out == ""
+
+
+class TestInstrumentedHandler:
+    def test_first_call_is_cold_then_warm(self, capsys: Any) -> None:
+        class Context:
+            aws_request_id = "req-1"
+
+        @instrumented("demo")
+        def handler(event: Any, context: Any) -> str:
+            return "ok"
+
+        with patch.object(instrumentation, "_cold_start", True):
+            assert handler({}, Context()) == "ok"
+            assert handler({}, None) == "ok"
+
+        first, second = emitted(capsys)
+        assert (first["ColdStart"], second["ColdStart"]) == ("true", "false")
+        assert first["RequestId"] == "req-1"
+
+    def test_line_is_emitted_when_handler_raises(self, capsys: Any) -> None:
+        @instrumented("demo")
+        def handler(event: Any, context: Any) -> None:
+            raise RuntimeError("boom")
+
+        try:
+            handler({}, None)
+        except RuntimeError:
+            pass
+        assert len(emitted(capsys)) == 1
+        assert instrumentation.current() is None
+
+    def test_voice_handler_reports_its_stages(self, capsys: Any) -> None:
+        from python import voice_handler
+        from tests.helpers import ReferenceClassifier
+
+        with patch.object(voice_handler, "_CLASSIFIER", ReferenceClassifier()), \
+                patch.object(voice_handler.EVENT_PUBLISHER, "publish_many"):
+            voice_handler.handler({"body": json.dumps({"text": "check balance"})}, None)
+
+        (line,) = emitted(capsys)
+        assert {"json_parse_ms", "intent_match_ms", "eventbridge_publish_ms"} <= set(line)
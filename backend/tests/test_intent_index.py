@@ -0,0 +1,90 @@
+"""Tests for the precompiled intent keyword index."""
+import json
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from python.intent_index import IntentIndex, load_intent_keywords, match_intent
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "python")
+
+
+def legacy_match(keywords: dict[str, list[str]], tokens: list[str]) -> tuple[str, int]:
+    """The original linear scan from voice_handler.match_intent."""
+    lower_tokens = [t.lower() for t in tokens]
+    best_intent, best_score = "unknown", 0
+    for intent, kws in keywords.items():
+        hits = sum(1 for kw in kws if kw in lower_tokens)
+        if hits > best_score:
+            best_intent, best_score = intent, hits
+    return best_intent, best_score
+
+
+KEYWORDS = {
+    "check_balance": ["balance", "salio", "angalia", "check", "how much"],
+    "send_money": ["send", "tuma", "kutuma", "transfer", "pesa"],
+    "help": ["help", "msaada", "support"],
+}
+
+
+class TestIntentIndex:
+    def test_multi_word_trigger_matches(self) -> None:
+        index = IntentIndex(KEYWORDS)
+        assert index.best(["how", "much", "is", "left"]) == ("check_balance", 1)
+
+    def test_multi_word_trigger_needs_adjacent_tokens(self) -> None:
+        index = IntentIndex(KEYWORDS)
+        assert index.best(["how", "very", "much"]) == ("unknown", 0)
+
+    def test_tie_goes_to_first_listed_intent(self) -> None:
+        index = IntentIndex(KEYWORDS)
+        assert index.best(["send", "balance"]) == ("check_balance", 1)
+
+    def test_repeated_trigger_counts_once(self) -> None:
+        index = IntentIndex(KEYWORDS)
+        assert index.scores(["tuma", "TUMA", "tuma"]) == {"send_money": 1}
+
+    def test_agrees_with_linear_scan_on_single_word_triggers(self) -> None:
+        vocab = [kw for kws in KEYWORDS.values() for kw in kws if " " not in kw]
+        vocab += ["yangu", "money", "please", "the"]
+        rng = random.Random(7)
+        index = IntentIndex(KEYWORDS)
+        for _ in range(500):
+            tokens = [rng.choice(vocab).upper() if rng.random() < 0.2 else rng.choice(vocab)
+                      for _ in range(rng.randint(0, 8))]
+            assert index.best(tokens) == legacy_match(KEYWORDS, tokens)
+
+
+class TestIntentKeywordConfig:
+    def test_load_intent_keywords_from_json(self, tmp_path) -> None:  # type: ignore[no-untyped-def]
+        path = tmp_path / "intents.json"
+        path.write_text(json.dumps({"pay_bill": ["lipa", "pay bill"]}))
+        assert load_intent_keywords(str(path)) == {"pay_bill": ["lipa", "pay bill"]}
+
+    def test_load_intent_keywords_rejects_bad_shape(self, tmp_path) -> None:  # type: ignore[no-untyped-def]
+        path = tmp_path / "intents.json"
+        path.write_text(json.dumps({"pay_bill": "lipa"}))
+        with pytest.raises(ValueError):
+            load_intent_keywords(str(path))
+
+
+
+class TestMatchIntent:
+    def test_scores_against_the_deployed_table(self) -> None:
+        assert match_intent(["tuma", "pesa"]) == ("send_money", 0.9)
+        assert match_intent(["asante"]) == ("unknown", 0.4)
+
+    def test_bedrock_cascade_does_not_load_voice_handler(self) -> None:
+        code = (
+            f"import sys; sys.path.insert(0, {PYTHON_DIR!r}); "
+            "import bedrock_handler; bedrock_handler.CASCADE.match_intent(['salio']); "
+            "print('voice_handler' in sys.modules)"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "WAVE_PREWARM"}
+        out = subprocess.run(
+            [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+        )
+        assert out.stdout.strip() == "False"
@@ -0,0 +1,100 @@
+"""Tests for the shared DynamoDB persistence layer."""
+from typing import Any
+
+from python.persistence import BatchWriter, get_table
+
+
+class FakeResource:
+    """Stand-in for a DynamoDB service resource's batch_write_item.
+
+    unprocessed_rounds: how many calls in a row hand back the last item
+    of the request as unprocessed.
+    """
+
+    def __init__(self, unprocessed_rounds: int = 0) -> None:
+        self.calls: list[list[dict[str, Any]]] = []
+        self.unprocessed_rounds = unprocessed_rounds
+
+    def batch_write_item(self, RequestItems: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+        ((table, requests),) = RequestItems.items()
+        self.calls.append(requests)
+        if self.unprocessed_rounds:
+            self.unprocessed_rounds -= 1
+            return {"UnprocessedItems": {table: requests[-1:]}}
+        return {"UnprocessedItems": {}}
+
+
+def item(i: int) -> dict[str, Any]:
+    return {"PK": f"ML#{i}", "SK": "RESULT#0", "value": i}
+
+
+class TestBatchWriter:
+    def test_writes_in_groups_of_25(self) -> None:
+        resource = FakeResource()
+        with BatchWriter("t", resource=resource) as writer:
+            for i in range(60):
+                writer.put(item(i))
+
+        assert [len(c) for c in resource.calls] == [25, 25, 10]
+        assert writer.stats()["written"] == 60
+
+    def test_retries_unprocessed_items(self) -> None:
+        resource = FakeResource(unprocessed_rounds=2)
+        writer = BatchWriter("t", resource=resource, backoff_s=0)
+        writer.put(item(1))
+        writer.put(item(2))
+        writer.flush()
+
+        assert [len(c) for c in resource.calls] == [2, 1, 1]
+        assert writer.stats() == {"written": 2, "retried": 2, "failed": 0, "calls": 3, "buffered": 0}
+
+    def test_gives_up_after_max_retries(self) -> None:
+        resource = FakeResource(unprocessed_rounds=10)
+        writer = BatchWriter("t", resource=resource, max_retries=1, backoff_s=0)
+        writer.put(item(1))
+        writer.flush()
+
+        assert writer.failed_items == [item(1)]
+        assert writer.stats()["failed"] == 1
+
+    def test_duplicate_keys_collapse_to_last_write(self) -> None:
+        resource = FakeResource()
+        writer = BatchWriter("t", resource=resource)
+        writer.put({**item(1), "value": "old"})
+        writer.put({**item(1), "value": "new"})
+        writer.flush()
+
+        assert resource.calls == [[{"PutRequest": {"Item": {**item(1), "value": "new"}}}]]
+
+    def test_background_flush_waits_for_in_flight_batches(self) -> None:
+        resource = FakeResource()
+        writer = BatchWriter("t", resource=resource, background=True)
+        for i in range(30):
+            writer.put(item(i))
+        writer.flush()
+
+        assert sum(len(c) for c in resource.calls) == 30
+
+    def test_flush_stops_the_background_thread(self) -> None:
+        import threading
+
+        def writer_threads() -> int:
+            return sum(t.name.startswith("ddb-writer") for t in threading.enumerate())
+
+        before = writer_threads()
+        for _ in range(5):
+            writer = BatchWriter("t", resource=FakeResource(), background=True)
+            for i in range(30):
+                writer.put(item(i))
+            writer.flush()
+        assert writer_threads() == before
+
+        # A flushed writer can still be used.
+        writer.put(item(99))
+        writer.flush()
+        assert writer.stats()["written"] == 31
+
+
+class TestGetTable:
+    def test_table_handle_is_cached(self) -> None:
+        assert get_table("wave-ml-results", "us-east-1") is get_table("wave-ml-results", "us-east-1")
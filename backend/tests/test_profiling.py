@@ -0,0 +1,74 @@
+"""Tests for on-demand handler profiling."""
+import json
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import profiling
+from python.instrumentation import RUST_FFI, instrumented, stage
+
+
+def reports(capsys: Any) -> list[dict[str, Any]]:
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return [line for line in lines if "profile" in line]
+
+
+@instrumented("test")
+def slow_handler(event: Any, context: Any) -> str:
+    with stage(RUST_FFI):
+        time.sleep(0.05)  # native code called from the stage's frame
+    return json.dumps({"ok": True})
+
+
+class TestSwitch:
+    def test_env_and_event_flags(self) -> None:
+        assert profiling.requested({"text": "hi"}) is None
+        assert profiling.requested({"wave_profile": True}) == profiling.SAMPLE
+        assert profiling.requested({"wave_profile": "cprofile"}) == profiling.CPROFILE
+        with patch("profiling.MODE", profiling.CPROFILE):
+            assert profiling.requested("not a dict") == profiling.CPROFILE
+            assert profiling.requested({"wave_profile": "bogus"}) == profiling.CPROFILE
+
+    def test_off_is_silent(self, capsys: Any) -> None:
+        assert slow_handler({}, None) == '{"ok": true}'
+        assert reports(capsys) == []
+        assert not profiling.TRACKING
+
+
+class TestSampling:
+    def test_stage_samples_are_attributed_to_rust(self, capsys: Any) -> None:
+        slow_handler({"wave_profile": "sample"}, None)
+
+        (report,) = reports(capsys)
+        assert report["profile"] == "test" and report["mode"] == "sample"
+        assert report["samples"] > 0
+        assert report["categories_ms"].get("rust_ffi", 0) > 0
+        leaf_stacks = [line for line in report["collapsed"].splitlines() if "[rust_ffi]" in line]
+        assert leaf_stacks and "test_profiling:slow_handler;[rust_ffi]" in leaf_stacks[0]
+        assert not profiling.TRACKING and profiling._stages == {}
+
+    def test_collapsed_stacks_written_to_directory(self, capsys: Any, tmp_path: Path) -> None:
+        with patch("profiling.OUTPUT", str(tmp_path)):
+            slow_handler({"wave_profile": "sample"}, None)
+
+        (report,) = reports(capsys)
+        assert "collapsed" not in report
+        lines = Path(report["path"]).read_text().splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+@instrumented("test")
+def json_handler(event: Any, context: Any) -> str:
+    # Enough encoding that its own time never rounds down to 0.0 ms.
+    return json.dumps([{"i": i, "text": "habari"} for i in range(20000)])
+
+
+class TestCProfile:
+    def test_prof_file_and_categories(self, capsys: Any, tmp_path: Path) -> None:
+        with patch("profiling.OUTPUT", str(tmp_path)):
+            json_handler({"wave_profile": "cprofile"}, None)
+
+        (report,) = reports(capsys)
+        assert Path(report["path"]).suffix == ".prof" and Path(report["path"]).exists()
+        assert report["categories_ms"].get("json", 0) > 0
@@ -0,0 +1,89 @@
+"""Tests for the content-addressed Bedrock result cache."""
+import time
+from typing import Any
+from unittest.mock import patch
+
+from python.result_cache import ResultCache, cache_key
+
+
+class FakeTable:
+    """In-memory stand-in for a DynamoDB Table resource."""
+
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+
+    def get_item(self, Key: dict[str, str]) -> dict[str, Any]:
+        item = self.items.get((Key["PK"], Key["SK"]))
+        return {"Item": item} if item else {}
+
+    def put_item(self, Item: dict[str, Any]) -> None:
+        self.items[(Item["PK"], Item["SK"])] = Item
+
+
+class TestCacheKey:
+    def test_normalizes_case_and_whitespace(self) -> None:
+        assert cache_key(" Send  MONEY ", "english", "m") == cache_key("send money", "english", "m")
+
+    def test_language_and_model_are_part_of_the_key(self) -> None:
+        base = cache_key("salio", "swahili", "m1")
+        assert base != cache_key("salio", "english", "m1")
+        assert base != cache_key("salio", "swahili", "m2")
+
+
+class TestResultCache:
+    def test_lru_eviction(self) -> None:
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self) -> None:
+        cache = ResultCache(ttl_s=10)
+        cache.put("a", 1)
+        with patch("python.result_cache.time.time", return_value=time.time() + 11):
+            assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_empty_results_are_not_cached(self) -> None:
+        cache = ResultCache()
+        calls = []
+        for _ in range(2):
+            cache.get_or_compute("k", lambda: calls.append(1) or [])
+        assert len(calls) == 2
+
+    def test_dynamodb_tier_shared_between_processes(self) -> None:
+        table = FakeTable()
+        ResultCache(table=table).put("k", {"sentiment": "positive"})
+
+        cold = ResultCache(table=table)
+        assert cold.get("k") == {"sentiment": "positive"}
+        stats = cold.stats()
+        assert stats["dynamodb_hits"] == 1
+        assert stats["hits"] == 1
+        # Promoted to the local tier: the next read doesn't touch DynamoDB.
+        cold.get("k")
+        assert cold.stats()["dynamodb_hits"] == 1
+
+    def test_expired_dynamodb_item_is_a_miss(self) -> None:
+        table = FakeTable()
+        table.put_item(Item={"PK": "CACHE#k", "SK": "CACHE", "value": "1", "ExpiresAt": 1})
+        cache = ResultCache(table=table)
+        assert cache.get("k") is None
+        assert cache.stats()["dynamodb_misses"] == 1
+
+
+class TestBedrockCaching:
+    def test_repeated_message_invokes_model_once(self) -> None:
+        sentiment = {"sentiment": "neutral", "category": "inquiry", "confidence": 0.8}
+        with patch("python.bedrock_handler.RESULT_CACHE", ResultCache()), \
+                patch("python.bedrock_handler.invoke_sentiment", return_value=sentiment) as mock_invoke:
+            from python.bedrock_handler import analyze_sentiment
+
+            assert analyze_sentiment("Angalia salio", "swahili") == sentiment
+            assert analyze_sentiment("angalia  salio", "swahili") == sentiment
+            mock_invoke.assert_called_once()
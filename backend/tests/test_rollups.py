@@ -0,0 +1,182 @@
+"""Tests for the write-time analytics rollups."""
+import json
+import random
+from unittest.mock import patch
+
+import pytest
+
+from python.rollups import DAY, HOUR, LatencySketch, RollupBuffer, bucket_key, query
+
+# 2026-10-17T14:20:00Z
+NOW = 1792246800
+
+
+def result(language: str = "swahili", intent: str = "check_balance", sentiment: str = "neutral",
+           latency_ms: int = 120, timestamp: int = NOW) -> dict:
+    return {
+        "PK": f"ML#{random.getrandbits(32):08x}",
+        "language": language,
+        "intent": intent,
+        "sentiment": sentiment,
+        "latency_ms": latency_ms,
+        "stage_latency_ms": {"sentiment": latency_ms - 20},
+        "timestamp": timestamp,
+    }
+
+
+class TestLatencySketch:
+    def test_quantiles_within_relative_accuracy(self) -> None:
+        rng = random.Random(0)
+        values = sorted(rng.lognormvariate(4, 1.5) for _ in range(5000))
+        sketch = LatencySketch(accuracy=0.02)
+        for v in values:
+            sketch.add(v)
+
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            assert abs(sketch.quantile(q) - exact) / exact <= 0.02  # type: ignore[operator]
+
+    def test_merge_equals_one_sketch_of_everything(self) -> None:
+        a, b, both = LatencySketch(), LatencySketch(), LatencySketch()
+        for v in range(1, 500):
+            (a if v % 3 else b).add(v)
+            both.add(v)
+        a.merge(b)
+        assert a.summary() == both.summary()
+
+    def test_attributes_round_trip(self) -> None:
+        sketch = LatencySketch()
+        for v in (3, 40, 40, 900):
+            sketch.add(v)
+        restored = LatencySketch.from_attributes(
+            {"PK": "x", "SK": "LATENCY", "ExpiresAt": 1, **sketch.attributes("total")}
+        )
+        assert list(restored) == ["total"]
+        assert restored["total"].summary() == sketch.summary()
+
+
+class TestRollupBuffer:
+    def test_flushes_one_update_per_touched_item(self) -> None:
+        from tests.helpers import FakeRollupTable
+
+        table = FakeRollupTable()
+        rollups = RollupBuffer(granularities=(HOUR, DAY))
+        for _ in range(10):
+            rollups.add(result())
+        rollups.add(result(language="english", sentiment="negative"))
+        failed_write = result(language="english", sentiment="negative")
+        rollups.add(failed_write)
+        rollups.remove(failed_write)
+
+        assert rollups.flush(table) == 0
+        # (2 counter items + 1 latency item) per granularity.
+        assert table.updates == 6
+        counter = table.items[(bucket_key(NOW, HOUR), "COUNT#english#check_balance#negative")]
+        assert counter["n"] == 1
+        assert rollups.updates() == []
+
+    def test_failed_updates_are_counted_not_raised(self) -> None:
+        from tests.helpers import FakeRollupTable
+
+        rollups = RollupBuffer(granularities=(HOUR,))
+        rollups.add(result())
+        assert rollups.flush(FakeRollupTable(fail=True)) == 2
+        assert rollups.errors == 2
+
+
+class TestQuery:
+    def test_merges_buckets_written_by_separate_invocations(self) -> None:
+        from tests.helpers import FakeRollupTable
+
+        table = FakeRollupTable()
+        for hour, (language, sentiment, latency) in enumerate(
+            [("swahili", "neutral", 100), ("swahili", "negative", 400), ("english", "neutral", 200)]
+        ):
+            rollups = RollupBuffer(granularities=(HOUR, DAY))
+            for _ in range(hour + 1):
+                rollups.add(result(language, sentiment=sentiment, latency_ms=latency,
+                                   timestamp=NOW + hour * 3600))
+            rollups.flush(table)
+
+        report = query(NOW, NOW + 3 * 3600, table=table)
+        # The edges round out to whole hours.
+        assert report["granularity"] == HOUR and report["buckets"] == 4
+        assert report["messages"] == 6
+        assert report["languages"] == {"english": 3, "swahili": 3}
+        assert report["sentiments"] == {"neutral": 4, "negative": 2}
+        assert [b["messages"] for b in report["series"]] == [1, 2, 3, 0]
+        assert report["latency_ms"]["total"]["count"] == 6
+        assert abs(report["latency_ms"]["total"]["max"] - 400) <= 8
+
+        week = query(NOW - 6 * 86400, NOW + 86400, table=table)
+        assert week["granularity"] == DAY and week["messages"] == 6
+
+    def test_reads_do_not_grow_with_message_volume(self) -> None:
+        from tests.helpers import FakeRollupTable
+
+        table = FakeRollupTable()
+        rollups = RollupBuffer(granularities=(HOUR,))
+        for i in range(2000):
+            rollups.add(result(sentiment=("neutral", "positive")[i % 2], latency_ms=50 + i % 300))
+        rollups.flush(table)
+
+        report = query(NOW, NOW + 1, table=table)
+        assert report["messages"] == 2000
+        assert report["items_read"] == 3
+
+    def test_handler_validates_range(self) -> None:
+        from tests.helpers import FakeRollupTable
+
+        with patch("python.rollups.ROLLUP_TABLE", FakeRollupTable()):
+            from python.rollups import handler
+
+            ok = handler({"queryStringParameters": {"hours": "6"}}, None)
+            assert ok["statusCode"] == 200 and json.loads(ok["body"])["buckets"] in (6, 7)
+            for params in (
+                {"start": "10", "end": "5"}, {"hours": "x"}, {"granularity": "week"},
+                {"start": "0", "end": "1e15"}, {"end": "inf"}, {"hours": "1e308"},
+                {"start": "nan"},
+            ):
+                assert handler({"queryStringParameters": params}, None)["statusCode"] == 400
+        with pytest.raises(ValueError):
+            query(0, NOW, granularity=HOUR)
+
+    def test_oversized_range_is_rejected_before_building_buckets(self) -> None:
+        with pytest.raises(ValueError, match="buckets"):
+            query(0, 1e300, granularity=HOUR)
+
+
+class TestBedrockHandler:
+    def test_batch_counts_only_written_results(self) -> None:
+        from tests.helpers import FakeRollupTable
+
+        class Writer:
+            """BatchWriter stand-in that refuses the first item."""
+
+            def __init__(self, *args, **kwargs) -> None:  # type: ignore[no-untyped-def]
+                self.failed_items: list[dict] = []
+
+            def put(self, item: dict) -> None:
+                if not self.failed_items:
+                    self.failed_items.append(item)
+
+            def flush(self) -> None:
+                pass
+
+        table = FakeRollupTable()
+        sentiment = {"sentiment": "neutral", "category": "inquiry", "confidence": 0.9}
+        events = [{"text": f"hello {i}"} for i in range(3)]
+        with patch("python.bedrock_handler.CASCADE_ENABLED", False), \
+                patch("python.bedrock_handler.BatchWriter", Writer), \
+                patch("python.bedrock_handler.analyze_sentiments",
+                      lambda pairs: [sentiment] * len(pairs)), \
+                patch("python.bedrock_handler.invoke_embedding", return_value=[0.1]), \
+                patch("rollups.ROLLUP_TABLE", table):
+            from python.bedrock_handler import handler
+
+            body = json.loads(handler({"events": events}, None)["body"])
+
+        assert len(body["failures"]) == 1
+        counters = [i for (_, sk), i in table.items.items() if sk.startswith("COUNT#")]
+        assert {i["PK"].split("#")[1] for i in counters} == {HOUR, DAY}
+        assert all(i["n"] == 2 for i in counters)
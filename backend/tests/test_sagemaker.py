@@ -0,0 +1,103 @@
+"""Tests for the langdetect language detection handler."""
+import json
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("langdetect")
+
+from python import sagemaker_handler  # noqa: E402
+from python.sagemaker_handler import detect_language, detect_languages, handler  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():  # type: ignore[no-untyped-def]
+    sagemaker_handler.DETECTION_CACHE._entries.clear()
+    yield
+
+
+class TestDetection:
+    def test_detects_french(self) -> None:
+        result = detect_language("Bonjour, je veux envoyer de l'argent à ma mère")
+        assert result["detected_language"] == "fr"
+        assert result["all_predictions"][0]["label"] == "fr"
+
+    def test_seeded_detection_is_deterministic(self) -> None:
+        text = "ok sawa"
+        first = sagemaker_handler._predict(text)
+        assert all(sagemaker_handler._predict(text) == first for _ in range(5))
+
+    def test_repeated_text_hits_cache(self) -> None:
+        with patch("python.sagemaker_handler._predict", wraps=sagemaker_handler._predict) as spy:
+            detect_language("Habari yako, nataka kutuma pesa")
+            detect_language("  habari YAKO, nataka kutuma   pesa ")
+        assert spy.call_count == 1
+
+    def test_undetectable_text_is_unknown(self) -> None:
+        assert detect_language("12345")["detected_language"] == "unknown"
+
+
+class TestFastPath:
+    def test_confident_fast_result_skips_langdetect(self) -> None:
+        fast = {"language": "wolof", "code": "wo", "confidence": 0.8}
+        with patch("python.sagemaker_handler.identify_language", return_value=fast), \
+                patch("python.sagemaker_handler._predict") as predict:
+            result = detect_language("dama bëgg yónni xaalis")
+        predict.assert_not_called()
+        assert result["detected_language"] == "wo"
+        assert result["detector"] == "fast"
+
+    def test_unsure_fast_result_falls_back(self) -> None:
+        fast = {"language": "luganda", "code": "lg", "confidence": 0.2}
+        with patch("python.sagemaker_handler.identify_language", return_value=fast):
+            result = detect_language("Bonjour, je veux envoyer de l'argent à ma mère")
+        assert result["detected_language"] == "fr"
+        assert result["detector"] == "langdetect"
+
+    def test_batch_mixes_fast_and_fallback(self) -> None:
+        fast = [{"language": "hausa", "code": "ha", "confidence": 0.9}, None]
+        with patch("python.sagemaker_handler.identify_language_batch", return_value=fast):
+            results = detect_languages(["ina son aika kuɗi", "Hello, how are you today my friend"])
+        assert [r["detected_language"] for r in results] == ["ha", "en"]
+        assert [r["detector"] for r in results] == ["fast", "langdetect"]
+
+
+class TestBatch:
+    def test_batch_dedupes_and_preserves_order(self) -> None:
+        texts = ["Hello, how are you today my friend", "Bonjour, je veux envoyer de l'argent"] * 3
+        with patch("python.sagemaker_handler._predict", wraps=sagemaker_handler._predict) as spy:
+            results = detect_languages(texts)
+        assert spy.call_count == 2
+        assert [r["detected_language"] for r in results] == ["en", "fr"] * 3
+
+    def test_pool_unavailable_falls_back_to_serial(self) -> None:
+        texts = [f"Hello number {i}, how are you doing today" for i in range(4)]
+        with patch.object(sagemaker_handler, "PARALLEL_THRESHOLD", 1), \
+                patch.object(sagemaker_handler, "MAX_WORKERS", 2), \
+                patch.object(sagemaker_handler, "_POOL", None), \
+                patch.object(sagemaker_handler, "_POOL_UNAVAILABLE", False), \
+                patch("python.sagemaker_handler.ProcessPoolExecutor", side_effect=OSError(38, "no /dev/shm")):
+            results = detect_languages(texts)
+            assert sagemaker_handler._POOL_UNAVAILABLE
+        assert all(r["detected_language"] == "en" for r in results)
+
+    def test_pool_workers_are_not_forked(self) -> None:
+        with patch.object(sagemaker_handler, "MAX_WORKERS", 2), \
+                patch.object(sagemaker_handler, "_POOL", None), \
+                patch.object(sagemaker_handler, "_POOL_UNAVAILABLE", False), \
+                patch("python.sagemaker_handler.ProcessPoolExecutor") as pool:
+            sagemaker_handler._get_pool()
+        context = pool.call_args.kwargs["mp_context"]
+        assert context.get_start_method() != "fork"
+
+    def test_handler_batch_request(self) -> None:
+        result = handler({"body": json.dumps({"texts": ["Hello, how are you today my friend"]})}, None)
+        assert result["statusCode"] == 200
+        body = json.loads(result["body"])
+        assert body["count"] == 1
+        assert body["results"][0]["detected_language"] == "en"
+
+    def test_handler_rejects_bad_batch(self) -> None:
+        assert handler({"texts": "not a list"}, None)["statusCode"] == 400
+        with patch.object(sagemaker_handler, "MAX_BATCH_SIZE", 1):
+            assert handler({"texts": ["a", "b"]}, None)["statusCode"] == 413
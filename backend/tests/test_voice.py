@@ -2,18 +2,14 @@
 import json
 from unittest.mock import patch
 
-import pytest
+from tests.helpers import ReferenceClassifier
 
 
 class TestClassifyCheckBalanceSwahili:
     def test_classify_check_balance_swahili(self) -> None:
         """Swahili balance check should map to check_balance intent."""
-        with patch("python.voice_handler.classify_intent") as mock_classify:
-            mock_classify.return_value = json.dumps({
-                "language": "swahili",
-                "tokens": ["angalia", "salio", "yangu"],
-                "token_count": 3,
-            })
+        classifier = ReferenceClassifier("swahili", ["angalia", "salio", "yangu"])
+        with patch("python.voice_handler._CLASSIFIER", classifier):
             from python.voice_handler import classify_and_respond
 
             result = classify_and_respond("angalia salio yangu")
@@ -25,12 +21,8 @@ class TestClassifyCheckBalanceSwahili:
 class TestClassifySendMoneyEnglish:
     def test_classify_send_money_english(self) -> None:
         """English send/transfer should map to send_money intent."""
-        with patch("python.voice_handler.classify_intent") as mock_classify:
-            mock_classify.return_value = json.dumps({
-                "language": "english",
-                "tokens": ["transfer", "money", "to", "my", "friend"],
-                "token_count": 5,
-            })
+        classifier = ReferenceClassifier("english", ["transfer", "money", "to", "my", "friend"])
+        with patch("python.voice_handler._CLASSIFIER", classifier):
             from python.voice_handler import classify_and_respond
 
             result = classify_and_respond("transfer money to my friend")
@@ -41,7 +33,7 @@ class TestClassifySendMoneyEnglish:
 class TestEmptyText:
     def test_empty_text(self) -> None:
         """Empty text should return 400 from the handler."""
-        with patch("python.voice_handler.classify_intent"):
+        with patch("python.voice_handler._CLASSIFIER", ReferenceClassifier()):
             from python.voice_handler import handler
 
             result = handler({"text": "", "source_language": "auto"}, None)
@@ -51,7 +43,7 @@ class TestEmptyText:
 
     def test_whitespace_only(self) -> None:
         """Whitespace-only text should also return 400."""
-        with patch("python.voice_handler.classify_intent"):
+        with patch("python.voice_handler._CLASSIFIER", ReferenceClassifier()):
             from python.voice_handler import handler
 
             result = handler({"text": "   ", "source_language": "auto"}, None)
@@ -61,12 +53,8 @@ class TestEmptyText:
 class TestResponseFormat:
     def test_response_format(self) -> None:
         """Verify all expected keys are present in a successful response."""
-        with patch("python.voice_handler.classify_intent") as mock_classify:
-            mock_classify.return_value = json.dumps({
-                "language": "english",
-                "tokens": ["hello", "there"],
-                "token_count": 2,
-            })
+        classifier = ReferenceClassifier("english", ["hello", "there"])
+        with patch("python.voice_handler._CLASSIFIER", classifier):
             from python.voice_handler import classify_and_respond
 
             result = classify_and_respond("hello there")
@@ -78,3 +66,84 @@ class TestResponseFormat:
             assert isinstance(result["tokens"], list)
             assert isinstance(result["confidence"], float)
             assert isinstance(result["latency_ms"], int)
+
+
+class TestBatchClassification:
+    def test_texts_batch_reports_per_item_results_and_failures(self) -> None:
+        """A texts batch classifies every item and reports bad ones individually."""
+        with patch("python.voice_handler._CLASSIFIER", ReferenceClassifier()), \
+                patch("python.voice_handler.EVENT_PUBLISHER") as mock_events:
+            from python.voice_handler import handler
+
+            result = handler({"texts": ["send money", "", "check balance", 42]}, None)
+            assert result["statusCode"] == 200
+            body = json.loads(result["body"])
+            assert [r["id"] for r in body["results"]] == ["0", "2"]
+            assert [r["intent"] for r in body["results"]] == ["send_money", "check_balance"]
+            assert [f["id"] for f in body["failures"]] == ["1", "3"]
+            mock_events.publish_many.assert_called_once()
+            assert len(mock_events.publish_many.call_args.args[0]) == 2
+
+    def test_sqs_batch_returns_partial_failures(self) -> None:
+        with patch("python.voice_handler._CLASSIFIER", ReferenceClassifier()), \
+                patch("python.voice_handler.EVENT_PUBLISHER"):
+            from python.voice_handler import handler
+
+            event = {"Records": [
+                {"eventSource": "aws:sqs", "messageId": "m1", "body": json.dumps({"text": "tuma pesa"})},
+                {"eventSource": "aws:sqs", "messageId": "m2", "body": "not json"},
+            ]}
+            result = handler(event, None)
+            assert result == {"batchItemFailures": [{"itemIdentifier": "m2"}]}
+
+    def test_texts_must_be_a_list(self) -> None:
+        with patch("python.voice_handler._CLASSIFIER", ReferenceClassifier()):
+            from python.voice_handler import handler
+
+            result = handler({"texts": "hello"}, None)
+            assert result["statusCode"] == 400
+
+
+class TestEventDelivery:
+    def _publisher(self, delay_s: float):  # type: ignore[no-untyped-def]
+        import time
+        from unittest.mock import MagicMock
+
+        from python.event_publisher import EventPublisher
+
+        client = MagicMock()
+
+        def put_events(Entries):  # type: ignore[no-untyped-def]
+            time.sleep(delay_s)
+            return {"FailedEntryCount": 0, "Entries": [{"EventId": "e"}] * len(Entries)}
+
+        client.put_events.side_effect = put_events
+        return EventPublisher(client, backoff_s=0), client
+
+    def test_events_are_delivered_before_a_lambda_handler_returns(self) -> None:
+        publisher, client = self._publisher(0.05)
+        with patch("python.voice_handler._CLASSIFIER", ReferenceClassifier()), \
+                patch("python.voice_handler.EVENT_PUBLISHER", publisher), \
+                patch("python.voice_handler.FLUSH_BEFORE_RETURN", True):
+            from python.voice_handler import handler
+
+            assert handler({"text": "send money"}, None)["statusCode"] == 200
+            assert handler({"texts": ["hi", "check balance"]}, None)["statusCode"] == 200
+        stats = publisher.stats()
+        assert (stats["published"], stats["queued"]) == (3, 0)
+        assert client.put_events.call_count == 2
+
+    def test_flush_is_bounded(self) -> None:
+        import time
+
+        publisher, _ = self._publisher(1.0)
+        with patch("python.voice_handler._CLASSIFIER", ReferenceClassifier()), \
+                patch("python.voice_handler.EVENT_PUBLISHER", publisher), \
+                patch("python.voice_handler.FLUSH_BEFORE_RETURN", True), \
+                patch("python.voice_handler.EVENT_FLUSH_TIMEOUT_S", 0.05):
+            from python.voice_handler import handler
+
+            start = time.monotonic()
+            assert handler({"text": "send money"}, None)["statusCode"] == 200
+            assert time.monotonic() - start < 0.5
+
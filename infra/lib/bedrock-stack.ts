@@ -1,6 +1,8 @@
 import * as cdk from "aws-cdk-lib";
 import * as dynamodb from "aws-cdk-lib/aws-dynamodb";
 import * as lambda from "aws-cdk-lib/aws-lambda";
+import * as apigwv2 from "aws-cdk-lib/aws-apigatewayv2";
+import * as integrations from "aws-cdk-lib/aws-apigatewayv2-integrations";
 import * as ecr_assets from "aws-cdk-lib/aws-ecr-assets";
 import * as events from "aws-cdk-lib/aws-events";
 import * as targets from "aws-cdk-lib/aws-events-targets";
@@ -59,7 +61,7 @@ export class WaveBedrockStack extends cdk.Stack {
     // Bedrock permissions: Claude 3 Haiku + Titan Embeddings V2
     sentimentFn.addToRolePolicy(
       new iam.PolicyStatement({
-        actions: ["bedrock:InvokeModel"],
+        actions: ["bedrock:InvokeModel", "bedrock:InvokeModelWithResponseStream"],
         resources: [
           `arn:aws:bedrock:us-east-1::foundation-model/anthropic.claude-3-haiku-20240307-v1:0`,
           `arn:aws:bedrock:us-east-1::foundation-model/amazon.titan-embed-text-v2:0`,
@@ -67,6 +69,55 @@ export class WaveBedrockStack extends cdk.Stack {
       })
     );
 
+    // Analytics API: reads the rollup items bedrock_handler maintains, never
+    // the raw results, so its cost doesn't grow with message volume.
+    const analyticsFn = new lambda.DockerImageFunction(
+      this,
+      "MlAnalyticsHandler",
+      {
+        functionName: "wave-ml-analytics",
+        code: lambda.DockerImageCode.fromEcr(
+          this.dockerImage.repository,
+          {
+            tagOrDigest: this.dockerImage.imageTag,
+            cmd: ["rollups.handler"],
+          }
+        ),
+        memorySize: 256,
+        timeout: cdk.Duration.seconds(30),
+        environment: {
+          ML_RESULTS_TABLE: mlTable.tableName,
+        },
+      }
+    );
+
+    mlTable.grantReadData(analyticsFn);
+
+    const analyticsApi = new apigwv2.HttpApi(this, "MlAnalyticsApi", {
+      apiName: "wave-ml-analytics-api",
+      corsPreflight: {
+        allowOrigins: [
+          "https://wave-apply.ericgitangu.com",
+          "http://localhost:3000",
+        ],
+        allowMethods: [
+          apigwv2.CorsHttpMethod.GET,
+          apigwv2.CorsHttpMethod.OPTIONS,
+        ],
+        allowHeaders: ["Content-Type", "Authorization"],
+        maxAge: cdk.Duration.hours(1),
+      },
+    });
+
+    analyticsApi.addRoutes({
+      path: "/analytics",
+      methods: [apigwv2.HttpMethod.GET],
+      integration: new integrations.HttpLambdaIntegration(
+        "MlAnalyticsIntegration",
+        analyticsFn
+      ),
+    });
+
     // Custom EventBridge bus for ML events
     this.eventBus = new events.EventBus(this, "MlEventBus", {
       eventBusName: "wave-ml-events",
@@ -99,6 +150,11 @@ export class WaveBedrockStack extends cdk.Stack {
       stringValue: this.eventBus.eventBusArn,
     });
 
+    new ssm.StringParameter(this, "AnalyticsApiUrlParam", {
+      parameterName: "/wave/analytics-api-url",
+      stringValue: analyticsApi.apiEndpoint,
+    });
+
     new cdk.CfnOutput(this, "MlTableName", {
       value: mlTable.tableName,
     });
@@ -106,5 +162,9 @@ export class WaveBedrockStack extends cdk.Stack {
     new cdk.CfnOutput(this, "BedrockLambdaArn", {
       value: sentimentFn.functionArn,
     });
+
+    new cdk.CfnOutput(this, "AnalyticsApiEndpoint", {
+      value: analyticsApi.apiEndpoint,
+    });
   }
 }